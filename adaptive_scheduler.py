@@ -0,0 +1,274 @@
+"""
+Adaptive Refresh Scheduler
+Learns how often each search query turns up new postings, then refreshes
+busy queries often and quiet ones rarely without going over a daily request
+budget. Stats are kept in query_stats.json between runs.
+"""
+
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+import schedule
+
+from posting_index import SeenPostings, posting_key
+from production_scraper import get_scraper, run_refresh
+from refresh_jobs import RefreshLock
+from scrape_pipeline import JsonSnapshotSink, drain
+from scraper_config import SCRAPING_CONFIG
+from snapshot_meta import read_meta
+
+STATS_FILE = "query_stats.json"
+
+
+def hours_between(earlier, later):
+    return (later - datetime.fromisoformat(earlier)).total_seconds() / 3600
+
+
+class QueryStats:
+    """Per query: new postings per hour (smoothed), pages per refresh and last run; plus requests spent"""
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        self.queries = data.get("queries", {})
+        self.requests = data.get("requests", [])  # [timestamp, search pages] per refresh
+        self.last_full_refresh = data.get("last_full_refresh")
+
+    def save(self):
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"queries": self.queries, "requests": self.requests,
+                       "last_full_refresh": self.last_full_refresh}, f, indent=2)
+        os.replace(tmp_file, self.path)
+
+    def entry(self, query, role):
+        return self.queries.setdefault(query, {"role": role, "rate": None, "pages": 1.0, "runs": 0,
+                                               "new_postings": 0, "requests": 0, "last_run": None})
+
+    def record_refresh(self, query, role, new_postings, pages, since_hours, now, smoothing):
+        """Fold one refresh into the query's churn rate and page cost"""
+        entry = self.entry(query, role)
+        observed = new_postings / max(since_hours, 1 / 60)
+        if entry["rate"] is None:
+            entry["rate"] = observed
+        else:
+            entry["rate"] = smoothing * observed + (1 - smoothing) * entry["rate"]
+        if pages:
+            entry["pages"] = pages if not entry["runs"] else smoothing * pages + (1 - smoothing) * entry["pages"]
+        entry["runs"] += 1
+        entry["new_postings"] += new_postings
+        entry["requests"] += pages
+        entry["last_run"] = now.isoformat()
+        self.spend(pages, now)
+
+    def spend(self, pages, now):
+        self.requests.append([now.isoformat(), pages])
+
+    def spent(self, now):
+        """Search page requests in the last 24 hours (older entries are dropped)"""
+        self.requests = [entry for entry in self.requests if hours_between(entry[0], now) < 24]
+        return sum(pages for _, pages in self.requests)
+
+
+def failed_refresh(status, error, scraper=None):
+    """A full refresh result for a run that raised: {"status", "error", "metrics"}
+
+    The metrics cover the requests the run's scraper made before it stopped;
+    None if the scraper was never built.
+    """
+    metrics = scraper.pipeline.metrics.report()["summary"] if scraper else None
+    return {"status": status, "error": str(error), "metrics": metrics}
+
+
+def run_full_refresh(scraper=None):
+    """Full scrape in this process, with the scheduler's warm scraper; returns run_refresh's result"""
+    try:
+        scraper = scraper or get_scraper()
+        return run_refresh(scraper, trigger="scheduler")
+    except Exception as e:
+        print(f"❌ Full refresh failed: {e}")
+        return failed_refresh("failed", e, scraper)
+
+
+class AdaptiveScheduler:
+    """Each tick refreshes the queries with the most expected new postings per request
+
+    A query's expected new postings is its smoothed rate times the hours
+    since it was last refreshed. Queries are never refreshed within
+    min_interval_hours and always within max_interval_hours (budget
+    permitting). A full refresh every full_refresh_hours drops postings that
+    were taken down, which query refreshes (new postings only) cannot see.
+    Query refreshes are skipped while another refresh holds the refresh lock,
+    and are recorded in the query stats, not the refresh ledger.
+    
+    full_refresh returns a run_refresh result (see failed_refresh for runs
+    that raised): its metrics' request count is charged to the budget, and
+    only a "done" run counts as the full refresh.
+    """
+
+    def __init__(self, scraper=None, stats=None, snapshot_file="edjoin_jobs.json", config=None,
+                 full_refresh=None, lock=None):
+        self.config = {**SCRAPING_CONFIG["adaptive_schedule"], **(config or {})}
+        self._scraper = scraper
+        self.stats = stats or QueryStats()
+        self.snapshot_file = snapshot_file
+        self.full_refresh = full_refresh or (lambda: run_full_refresh(self.scraper))
+        self.lock = lock or RefreshLock()
+
+    @property
+    def scraper(self):
+        if self._scraper is None:
+            self._scraper = get_scraper()
+        return self._scraper
+
+    def queries(self):
+        """(query, role) for every search the full scrape makes"""
+        return [(query, role) for role in SCRAPING_CONFIG["target_roles"]
+                for query in self.scraper.role_queries(role)]
+
+    def hours_since_refresh(self, query, now):
+        """Hours since the query's postings were last fetched (by it, or by a full scrape)"""
+        runs = [self.stats.queries.get(query, {}).get("last_run"), self.stats.last_full_refresh]
+        if not any(runs):
+            published_at = (read_meta(self.snapshot_file) or {}).get("published_at")
+            runs = [published_at] if published_at else []
+        if not any(runs):
+            return self.config["max_interval_hours"]
+        return hours_between(max(run for run in runs if run), now)
+
+    def expected_new(self, query, now):
+        """New postings waiting for a query; inf when it must run, 0 when it ran too recently"""
+        since = self.hours_since_refresh(query, now)
+        if since < self.config["min_interval_hours"]:
+            return 0
+        rate = self.stats.queries.get(query, {}).get("rate")
+        if rate is None or since >= self.config["max_interval_hours"]:
+            return math.inf
+        return rate * since
+
+    def cost(self, query):
+        return max(1, round(self.stats.queries.get(query, {}).get("pages", 1.0)))
+
+    def full_refresh_cost(self):
+        """Estimated search pages for a full refresh; a query never refreshed may take max_pages"""
+        return sum(self.cost(query) if self.stats.queries.get(query, {}).get("runs") else self.config["max_pages"]
+                   for query, _ in self.queries())
+
+    def plan(self, now, budget_left):
+        """Queries to refresh now, most expected new postings per request first, within budget"""
+        candidates = []
+        for query, role in self.queries():
+            expected = self.expected_new(query, now)
+            if expected == math.inf or expected >= self.config["min_expected_new"]:
+                candidates.append((expected / self.cost(query), query, role))
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        picks = []
+        for _, query, role in candidates:
+            if self.cost(query) <= budget_left:
+                picks.append((query, role))
+                budget_left -= self.cost(query)
+        return picks
+
+    def full_refresh_due(self, now):
+        last = self.stats.last_full_refresh
+        return last is None or hours_between(last, now) >= self.config["full_refresh_hours"]
+
+    def tick(self, now=None):
+        """One scheduling round; returns what was refreshed"""
+        now = now or datetime.now()
+        budget_left = self.config["daily_request_budget"] - self.stats.spent(now)
+        summary = {"full_refresh": False, "queries": [], "new_postings": 0, "requests": 0,
+                   "budget_left": budget_left}
+
+        if self.full_refresh_due(now):
+            cost = self.full_refresh_cost()
+            if cost <= budget_left:
+                print(f"🗓️ Full refresh due (about {cost} requests)")
+                result = self.full_refresh() or {}
+                # Charge the requests the run made; only a completed run resets the full refresh clock
+                # (an attached run was another trigger's, and spent nothing of this budget)
+                requests = (result.get("metrics") or {}).get("requests", 0)
+                done = result.get("status") == "done"
+                if done:
+                    self.stats.last_full_refresh = now.isoformat()
+                self.stats.spend(requests, now)
+                summary.update(full_refresh=done, requests=requests, budget_left=budget_left - requests)
+            else:
+                # Hold the budget back until the full refresh fits
+                print(f"🗓️ Full refresh due but only {budget_left} of {cost} requests left today, waiting")
+            self.stats.save()
+            return summary
+
+        picks = self.plan(now, budget_left)
+        if picks and not self.lock.acquire("adaptive"):
+            # The running refresh publishes these queries' postings anyway
+            print("🔒 A refresh is already running, skipping this tick")
+            picks = []
+        if picks:
+            try:
+                fresh, requests, refreshed = self.refresh_queries(picks, now, budget_left)
+            finally:
+                self.lock.release()
+            summary.update(queries=refreshed, new_postings=len(fresh), requests=requests,
+                           budget_left=budget_left - requests)
+            print(f"🗓️ Refreshed {len(refreshed)} queries: {len(fresh)} new postings for {requests} requests "
+                  f"({summary['budget_left']} left today)")
+        self.stats.save()
+        return summary
+
+    def refresh_queries(self, picks, now, budget_left):
+        """Scrape the picked queries for postings not in the snapshot and publish them
+
+        Page costs are estimates, so pages are capped at what is left of the
+        budget; returns (new postings, requests spent, queries refreshed).
+        """
+        pipeline = self.scraper.pipeline
+        previous = self.scraper.load_snapshot(self.snapshot_file)
+        seen = SeenPostings(posting_key(job) for job in previous)
+
+        fresh = []
+        requests = 0
+        refreshed = []
+        for query, role in picks:
+            if budget_left - requests < self.cost(query):
+                continue
+            since = self.hours_since_refresh(query, now)
+            pages_before = pipeline.timings.stages.get("fetch", {}).get("count", 0)
+            max_pages = min(self.config["max_pages"], budget_left - requests)
+            new_jobs = list(pipeline.scrape_query(query, role, seen, max_pages))
+            pages = pipeline.timings.stages.get("fetch", {}).get("count", 0) - pages_before
+            self.stats.record_refresh(query, role, len(new_jobs), pages, since, now,
+                                      self.config["churn_smoothing"])
+            fresh.extend(new_jobs)
+            requests += pages
+            refreshed.append(query)
+
+        if fresh:
+            # Newest first, as the full scrape orders them
+            drain(iter(fresh + previous), [JsonSnapshotSink(self.snapshot_file)])
+        return fresh, requests, refreshed
+
+
+def main():
+    """Run the adaptive scheduler"""
+    scheduler = AdaptiveScheduler()
+    minutes = scheduler.config["tick_minutes"]
+    print(f"⏰ Adaptive refresh every {minutes} minutes, "
+          f"{scheduler.config['daily_request_budget']} requests per day")
+    scheduler.tick()
+    schedule.every(minutes).minutes.do(scheduler.tick)
+    while True:
+        schedule.run_pending()
+        time.sleep(60)
+
+
+if __name__ == "__main__":
+    main()
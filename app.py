@@ -3,15 +3,20 @@ Flask Web Application for Job Sourcing Dashboard
 Displays scraped EdJoin positions and allows resume uploads
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, session
+import hmac
 import json
 import os
 from datetime import datetime
 import uuid
-from candidate_matching import CandidateMatcher
-from google_forms_integration import GoogleFormsSubmitter
-from resume_handling import GoogleFormsWithResume, create_resume_upload_route
-from functools import wraps
+from resume_handling import create_resume_upload_route
+from posting_normalizer import dedupe_postings
+from refresh_jobs import load_progress, submit_refresh
+from refresh_ledger import RefreshLedger
+from scrape_metrics import prometheus_text, read_latest
+from scraper_config import ADVANCED_CONFIG
+from snapshot_store import SnapshotStore
+from functools import cache, wraps
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'
@@ -21,16 +26,34 @@ JOBS_FILE = "edjoin_jobs.json"
 UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
+# Admin refreshes run this scraper script as a separate process (None: in a thread of this worker)
+REFRESH_SCRIPT = ADVANCED_CONFIG.get("admin_refresh_script")
+if REFRESH_SCRIPT:
+    REFRESH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), REFRESH_SCRIPT)
+
 # Admin Authentication
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')  # Change this password!
+# Bearer token the Prometheus scraper sends for /metrics (unset: admin login only)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Initialize candidate matcher and Google Forms submitter
-candidate_matcher = CandidateMatcher()
-google_forms_submitter = GoogleFormsSubmitter()
-resume_handler = GoogleFormsWithResume()
+# Integrations are built on first use, so a booting worker only imports Flask and the job store
+@cache
+def get_candidate_matcher():
+    from candidate_matching import CandidateMatcher
+    return CandidateMatcher()
+
+@cache
+def get_google_forms_submitter():
+    from google_forms_integration import GoogleFormsSubmitter
+    return GoogleFormsSubmitter()
+
+@cache
+def get_resume_handler():
+    from resume_handling import GoogleFormsWithResume
+    return GoogleFormsWithResume()
 
 # Add resume upload route
 app = create_resume_upload_route(app)
@@ -48,31 +71,45 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def metrics_access_required(f):
+    """Decorator for /metrics: the METRICS_TOKEN bearer token or an admin login"""
+    admin_view = admin_required(f)
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = request.headers.get('Authorization', '')
+        if METRICS_TOKEN and hmac.compare_digest(token.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return f(*args, **kwargs)
+        return admin_view(*args, **kwargs)
+    return decorated_function
+
+JOBS_PATHS = [
+    JOBS_FILE,
+    f"./{JOBS_FILE}",
+    f"/app/{JOBS_FILE}",
+    f"/app/app/{JOBS_FILE}"
+]
+
+def snapshot_path():
+    """The first jobs file that exists (JOBS_FILE if none does)"""
+    return next((path for path in JOBS_PATHS if os.path.exists(path)), JOBS_FILE)
+
+def read_jobs_file(file_path):
+    """Read a jobs file, each posting once (no file yet means no jobs)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            jobs = dedupe_postings(json.load(f))
+    except FileNotFoundError:
+        print(f"DEBUG: File not found: {file_path}")
+        return []
+    print(f"DEBUG: Successfully loaded {len(jobs)} jobs from {file_path}")
+    return jobs
+
+# The published snapshot, held in memory and swapped in the background on each publish
+job_store = SnapshotStore(snapshot_path, read_jobs_file)
+
 def load_jobs():
-    """Load jobs from JSON file with multiple fallback paths"""
-    possible_paths = [
-        JOBS_FILE,
-        f"./{JOBS_FILE}",
-        f"/app/{JOBS_FILE}",
-        f"/app/app/{JOBS_FILE}"
-    ]
-    
-    for file_path in possible_paths:
-        try:
-            print(f"DEBUG: Trying to load jobs from {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                jobs = json.load(f)
-                print(f"DEBUG: Successfully loaded {len(jobs)} jobs from {file_path}")
-                return jobs
-        except FileNotFoundError:
-            print(f"DEBUG: File not found: {file_path}")
-            continue
-        except Exception as e:
-            print(f"DEBUG: Error loading from {file_path}: {e}")
-            continue
-    
-    print("DEBUG: No jobs file found in any location")
-    return []
+    """Jobs of the current snapshot (no file read on the request path)"""
+    return job_store.current().jobs
 
 def save_application(application_data):
     """Save job application to file"""
@@ -97,38 +134,22 @@ def save_application(application_data):
 @app.route('/')
 def index():
     """Main dashboard page - displays all jobs directly"""
-    jobs = load_jobs()
+    snapshot = job_store.current()
     
     # Debug: Print job count
-    print(f"DEBUG: Loading {len(jobs)} jobs for main route")
+    print(f"DEBUG: Loading {len(snapshot.jobs)} jobs for main route")
     
-    # Group jobs by role
-    jobs_by_role = {}
-    for job in jobs:
-        role = job.get('role', 'Other')
-        if role not in jobs_by_role:
-            jobs_by_role[role] = []
-        jobs_by_role[role].append(job)
-    
-    return render_template('index.html', jobs=jobs, jobs_by_role=jobs_by_role)
+    return render_template('index.html', jobs=snapshot.jobs, jobs_by_role=snapshot.jobs_by_role)
 
 @app.route('/educationedjoin2')
 def educationedjoin2():
     """Main working route - displays all jobs"""
-    jobs = load_jobs()
+    snapshot = job_store.current()
     
     # Debug: Print job count
-    print(f"DEBUG: Loading {len(jobs)} jobs for educationedjoin2 route")
+    print(f"DEBUG: Loading {len(snapshot.jobs)} jobs for educationedjoin2 route")
     
-    # Group jobs by role
-    jobs_by_role = {}
-    for job in jobs:
-        role = job.get('role', 'Other')
-        if role not in jobs_by_role:
-            jobs_by_role[role] = []
-        jobs_by_role[role].append(job)
-    
-    return render_template('index.html', jobs=jobs, jobs_by_role=jobs_by_role)
+    return render_template('index.html', jobs=snapshot.jobs, jobs_by_role=snapshot.jobs_by_role)
 
 @app.route('/api/jobs')
 def api_jobs():
@@ -154,9 +175,7 @@ def debug():
 @app.route('/api/jobs/<role>')
 def api_jobs_by_role(role):
     """API endpoint for jobs filtered by role"""
-    jobs = load_jobs()
-    filtered_jobs = [job for job in jobs if job.get('role', '').lower() == role.lower()]
-    return jsonify(filtered_jobs)
+    return jsonify(job_store.current().jobs_for_role(role))
 
 @app.route('/job/<int:job_index>')
 def job_detail(job_index):
@@ -296,12 +315,12 @@ def candidate_register():
         }
         
         # Save candidate and find matches
-        candidate_id = candidate_matcher.save_candidate(candidate_data)
-        matches = candidate_matcher.find_matches(candidate_id)
+        candidate_id = get_candidate_matcher().save_candidate(candidate_data)
+        matches = get_candidate_matcher().find_matches(candidate_id)
         
         # Handle resume upload and submit to Google Forms
         resume_file = request.files.get('resume')
-        success, resume_url = resume_handler.submit_candidate_with_resume(candidate_data, resume_file)
+        success, resume_url = get_resume_handler().submit_candidate_with_resume(candidate_data, resume_file)
         
         if success:
             flash(f'Registration successful! We found {len(matches)} matching positions for you.', 'success')
@@ -315,8 +334,8 @@ def candidate_register():
 @app.route('/candidate/<candidate_id>')
 def candidate_dashboard(candidate_id):
     """Candidate dashboard showing their matches"""
-    matches = candidate_matcher.get_candidate_matches(candidate_id)
-    candidates = candidate_matcher.load_candidates()
+    matches = get_candidate_matcher().get_candidate_matches(candidate_id)
+    candidates = get_candidate_matcher().load_candidates()
     candidate = next((c for c in candidates if c.get('id') == candidate_id), None)
     
     if not candidate:
@@ -328,19 +347,19 @@ def candidate_dashboard(candidate_id):
 @app.route('/api/candidate-matches/<candidate_id>')
 def api_candidate_matches(candidate_id):
     """API endpoint for candidate matches"""
-    matches = candidate_matcher.get_candidate_matches(candidate_id)
+    matches = get_candidate_matcher().get_candidate_matches(candidate_id)
     return jsonify(matches)
 
 @app.route('/api/job-candidates/<path:job_url>')
 def api_job_candidates(job_url):
     """API endpoint for top candidates for a specific job"""
-    candidates = candidate_matcher.get_top_candidates_for_job(job_url)
+    candidates = get_candidate_matcher().get_top_candidates_for_job(job_url)
     return jsonify(candidates)
 
 @app.route('/api/candidates')
 def api_candidates():
     """API endpoint to get all candidates"""
-    candidates = candidate_matcher.load_candidates()
+    candidates = get_candidate_matcher().load_candidates()
     return jsonify(candidates)
 
 @app.route('/admin/login', methods=['GET', 'POST'])
@@ -423,8 +442,8 @@ def admin_applications():
 @admin_required
 def admin_candidates():
     """Admin page to view all candidates and matches"""
-    candidates = candidate_matcher.load_candidates()
-    matches = candidate_matcher.load_matches()
+    candidates = get_candidate_matcher().load_candidates()
+    matches = get_candidate_matcher().load_matches()
     
     # Fallback if template doesn't exist
     try:
@@ -474,56 +493,72 @@ def admin_candidates():
 @app.route('/admin/refresh-jobs', methods=['POST'])
 @admin_required
 def refresh_jobs():
-    """Manually refresh job positions"""
+    """Start a background job refresh and return its job ID"""
     try:
-        import subprocess
-        import sys
-        
-        # Run the production scraper
-        result = subprocess.run(
-            [sys.executable, 'production_scraper.py'], 
-            capture_output=True, 
-            text=True, 
-            timeout=1800  # 30 minute timeout
-        )
-        
-        if result.returncode == 0:
-            # Reload jobs from updated file
-            jobs = load_jobs()
-            flash(f'Jobs refreshed successfully! Found {len(jobs)} positions.', 'success')
-        else:
-            flash(f'Error refreshing jobs: {result.stderr}', 'error')
-            
-    except subprocess.TimeoutExpired:
-        flash('Job refresh timed out after 30 minutes', 'error')
+        job_id, started = submit_refresh(script=REFRESH_SCRIPT)
     except Exception as e:
-        flash(f'Error refreshing jobs: {str(e)}', 'error')
+        return jsonify({'error': str(e), 'status': 'error'}), 500
+    
+    return jsonify({
+        'job_id': job_id,
+        'started': started,  # False when a refresh was already running
+        'progress_url': url_for('refresh_job_progress', job_id=job_id),
+        'status': 'success'
+    }), 202
+
+@app.route('/admin/refresh-jobs/<job_id>')
+@admin_required
+def refresh_job_progress(job_id):
+    """Progress of a background refresh: roles and pages done, postings found, ETA"""
+    progress = load_progress(job_id)
+    if progress is None:
+        return jsonify({'error': 'Unknown refresh job', 'status': 'error'}), 404
+    return jsonify(progress)
+
+@app.route('/admin/refresh-history')
+@admin_required
+def admin_refresh_history():
+    """Admin page with past refresh runs: duration trend, outcomes, demo fallbacks and regressions"""
+    ledger = RefreshLedger()
+    try:
+        runs = ledger.runs(limit=request.args.get('limit', 100, type=int))
+        summary = ledger.summary(runs)
+    finally:
+        ledger.close()
+    
+    # Oldest first for the chart; only runs that scraped count towards the trend
+    chart = [{
+        'label': run['started_at'][:16].replace('T', ' '),
+        'duration': run['duration_seconds'],
+        'baseline': run['baseline_seconds'],
+        'postings': run['total_postings'],
+        'regression': run['regression'],
+        'fallback': run['fallback']
+    } for run in reversed(runs) if run['status'] in ('done', 'failed', 'cancelled')]
     
-    return redirect(url_for('admin_applications'))
+    if request.args.get('format') == 'json':
+        return jsonify({'summary': summary, 'runs': runs, 'status': 'success'})
+    return render_template('admin_refresh_history.html', runs=runs, summary=summary, chart=chart)
 
 @app.route('/api/refresh-status')
 def refresh_status():
-    """Get current refresh status"""
+    """Get current refresh status from the in-memory snapshot's metadata"""
     try:
-        jobs = load_jobs()
-        last_update = None
-        
-        if jobs:
-            # Get the most recent scraping timestamp
-            timestamps = [job.get('scraped_at') for job in jobs if job.get('scraped_at')]
-            if timestamps:
-                last_update = max(timestamps)
-        
-        return jsonify({
-            'total_positions': len(jobs),
-            'last_update': last_update,
-            'status': 'success'
-        })
+        return jsonify({**job_store.current().meta, 'status': 'success'})
     except Exception as e:
         return jsonify({
             'error': str(e),
             'status': 'error'
         }), 500
 
+@app.route('/metrics')
+@metrics_access_required
+def scrape_metrics():
+    """Metrics of the latest scrape run in Prometheus text format"""
+    report = read_latest()
+    if report is None:
+        return Response("# No scrape run recorded yet\n", mimetype='text/plain')
+    return Response(prometheus_text(report), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -5,13 +5,17 @@ Refreshes job positions automatically on a schedule
 
 import schedule
 import time
-import subprocess
 import sys
 import logging
+import threading
 from datetime import datetime
 import os
 import json
 
+from adaptive_scheduler import AdaptiveScheduler, failed_refresh
+from production_scraper import RefreshCancelled, get_scraper, run_refresh
+from refresh_ledger import open_ledger
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,58 +28,59 @@ logging.basicConfig(
 
 class JobRefreshScheduler:
     def __init__(self):
-        self.scraper_script = "production_scraper.py"
+        self.timeout_seconds = 1800  # 30 minutes per run
         self.jobs_file = "edjoin_jobs.json"
-        self.last_refresh = None
+        # Every run is recorded in the refresh ledger, so the last refresh survives a restart
+        self.ledger = open_ledger()
+        self.last_refresh = self.ledger.last_success() if self.ledger else None
         
     def run_job_scraper(self):
-        """Run the job scraper and update positions"""
+        """Run the job scraper in this process and update positions; returns the refresh result"""
+        # Cancel a run that goes past the timeout (the next run resumes from its checkpoint)
+        cancel = threading.Event()
+        timer = threading.Timer(self.timeout_seconds, cancel.set)
+        timer.start()
+        scraper = None
         try:
             logging.info("🔄 Starting scheduled job refresh...")
             
-            # Run the production scraper
-            result = subprocess.run(
-                [sys.executable, self.scraper_script], 
-                capture_output=True, 
-                text=True, 
-                timeout=1800  # 30 minute timeout
-            )
+            # Same process every time, so the scraper's session and caches stay warm
+            scraper = get_scraper()
+            result = run_refresh(scraper, trigger="auto_refresh", cancel=cancel, ledger=self.ledger)
+            position_count = result["total"]
+            role_counts = result["role_counts"]
+            
+            logging.info(f"✅ Job refresh completed successfully!")
+            logging.info(f"📊 Found {position_count} total positions")
+            if result["fallback"]:
+                logging.warning("🎭 No live postings were scraped; the snapshot holds demo data")
+            
+            # Log position breakdown
+            for role, count in role_counts.items():
+                logging.info(f"   {role}: {count} positions")
+            
+            # Where the time went (full per-request metrics are in scrape_metrics/)
+            metrics = result["metrics"]
+            if metrics:
+                logging.info(f"📈 {metrics['requests']} requests ({metrics['errors']} failed, "
+                             f"{metrics['retries']} retries), {metrics['bytes']} bytes, "
+                             f"p95 latency {metrics['latency_ms_p95']} ms, parsing {metrics['parse_ms']} ms, "
+                             f"{metrics['cards']} cards")
+            
+            self.last_refresh = datetime.now().isoformat()
             
-            if result.returncode == 0:
-                # Count new positions
-                try:
-                    with open(self.jobs_file, 'r', encoding='utf-8') as f:
-                        jobs = json.load(f)
-                    position_count = len(jobs)
-                    
-                    logging.info(f"✅ Job refresh completed successfully!")
-                    logging.info(f"📊 Found {position_count} total positions")
-                    
-                    # Log position breakdown
-                    role_counts = {}
-                    for job in jobs:
-                        role = job.get('role', 'Unknown')
-                        role_counts[role] = role_counts.get(role, 0) + 1
-                    
-                    for role, count in role_counts.items():
-                        logging.info(f"   {role}: {count} positions")
-                    
-                    self.last_refresh = datetime.now().isoformat()
-                    
-                    # Send notification (optional)
-                    self.send_refresh_notification(position_count, role_counts)
-                    
-                except Exception as e:
-                    logging.error(f"Error reading updated jobs file: {e}")
-                    
-            else:
-                logging.error(f"❌ Job scraper failed with return code {result.returncode}")
-                logging.error(f"Error output: {result.stderr}")
+            # Send notification (optional)
+            self.send_refresh_notification(position_count, role_counts)
+            return result
                 
-        except subprocess.TimeoutExpired:
-            logging.error("⏰ Job scraper timed out after 30 minutes")
+        except RefreshCancelled as e:
+            logging.error("⏰ Job scraper timed out after 30 minutes (next run resumes from its checkpoint)")
+            return failed_refresh("cancelled", e, scraper)
         except Exception as e:
             logging.error(f"❌ Error running job scraper: {e}")
+            return failed_refresh("failed", e, scraper)
+        finally:
+            timer.cancel()
     
     def send_refresh_notification(self, position_count, role_counts):
         """Send notification about refresh results (optional)"""
@@ -93,8 +98,11 @@ class JobRefreshScheduler:
         """Set up the scheduling system"""
         logging.info("⏰ Setting up job refresh schedule...")
         
-        # Schedule job refresh every 24 hours at 6 AM
-        schedule.every().day.at("06:00").do(self.run_job_scraper)
+        # Refresh busy queries often and quiet ones rarely, within the daily
+        # request budget; run_job_scraper does the periodic full refresh
+        self.adaptive = AdaptiveScheduler(snapshot_file=self.jobs_file, full_refresh=self.run_job_scraper)
+        minutes = self.adaptive.config["tick_minutes"]
+        schedule.every(minutes).minutes.do(self.adaptive.tick)
         
         # Alternative schedules (uncomment to use):
         # schedule.every(12).hours.do(self.run_job_scraper)  # Every 12 hours
@@ -107,7 +115,9 @@ class JobRefreshScheduler:
         # schedule.every().friday.at("06:00").do(self.run_job_scraper)  # Every Friday
         
         logging.info("✅ Schedule configured:")
-        logging.info("   - Daily at 06:00 AM")
+        logging.info(f"   - Adaptive query refresh every {minutes} minutes")
+        logging.info(f"   - At most {self.adaptive.config['daily_request_budget']} search requests per day")
+        logging.info(f"   - Full refresh every {self.adaptive.config['full_refresh_hours']} hours")
         logging.info("   - 30-minute timeout per run")
         logging.info("   - Automatic error handling")
     
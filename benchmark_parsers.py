@@ -0,0 +1,111 @@
+"""
+Parser Backend Benchmark
+Verifies every backend against the legacy html.parser extraction on saved
+search pages and reports job cards parsed per second
+"""
+
+import argparse
+import glob
+import json
+import time
+
+from job_parsers import BeautifulSoupParser, PARSER_BACKENDS, available_backends, get_parser
+
+DEFAULT_PAGES = "fixtures/search_pages/*.html"
+
+
+def load_pages(pattern):
+    """Load saved search pages as (path, html) pairs"""
+    pages = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+    return pages
+
+
+def verify_backend(parser, pages, reference):
+    """Return the pages where a backend's cards differ from the reference"""
+    mismatches = []
+    for path, html in pages:
+        for link_fallback in (True, False):
+            if parser.parse_cards(html, link_fallback) != reference.parse_cards(html, link_fallback):
+                mismatches.append(path)
+                break
+    return mismatches
+
+
+def benchmark_backend(parser, pages, iterations):
+    """Parse every page `iterations` times and measure throughput"""
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for _, html in pages:
+            cards += len(parser.parse_cards(html))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": parser.name,
+        "pages": len(pages) * iterations,
+        "cards": cards,
+        "seconds": round(elapsed, 4),
+        "cards_per_second": round(cards / elapsed, 1) if elapsed else None,
+        "ms_per_page": round(elapsed * 1000 / (len(pages) * iterations), 3) if pages else None
+    }
+
+
+def run_benchmark(pattern=DEFAULT_PAGES, iterations=200, backends=None):
+    """Verify and benchmark each installed backend"""
+    pages = load_pages(pattern)
+    if not pages:
+        raise FileNotFoundError(f"No saved pages match {pattern}")
+
+    # The legacy extraction: html.parser over the whole document
+    reference = BeautifulSoupParser("html.parser", strain=False)
+    results = []
+
+    for name in backends or available_backends():
+        parser = get_parser(name)
+        result = benchmark_backend(parser, pages, iterations)
+        mismatches = verify_backend(parser, pages, reference)
+        result["identical_output"] = not mismatches
+        result["mismatched_pages"] = mismatches
+        results.append(result)
+
+    # Baseline row for comparison
+    baseline = benchmark_backend(reference, pages, iterations)
+    baseline["backend"] = "html.parser (full document)"
+    baseline["identical_output"] = True
+    baseline["mismatched_pages"] = []
+    results.insert(0, baseline)
+
+    return results
+
+
+def main():
+    """Main function"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark job-card parser backends")
+    arg_parser.add_argument("--pages", default=DEFAULT_PAGES, help="Glob of saved search pages")
+    arg_parser.add_argument("--iterations", type=int, default=200, help="Passes over the page set")
+    arg_parser.add_argument("--backend", action="append", choices=list(PARSER_BACKENDS),
+                            help="Backend to benchmark (repeatable, default: all installed)")
+    arg_parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = arg_parser.parse_args()
+
+    results = run_benchmark(args.pages, args.iterations, args.backend)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("⏱️ Job-card parser benchmark")
+    print("=" * 50)
+    for result in results:
+        status = "✅" if result["identical_output"] else "❌ output differs"
+        print(f"{result['backend']:<28} {result['cards_per_second']:>10} cards/s "
+              f"{result['ms_per_page']:>8} ms/page  {status}")
+        for path in result["mismatched_pages"]:
+            print(f"    mismatch: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Startup Benchmark
+Measures a cold start of the web app and the scraper entry points, each in a
+fresh interpreter: wall time, the per-module import tree (python -X importtime)
+and, for the app, building the integrations, loading the snapshot and serving
+the first requests. The JSON report is meant to be diffed across commits.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+TARGETS = ["app", "production_scraper", "enhanced_scraper", "edjoin_scraper", "scrape_workers",
+           "adaptive_scheduler"]
+FIRST_REQUESTS = ["/", "/api/refresh-status", "/"]
+INTEGRATIONS = ["get_candidate_matcher", "get_google_forms_submitter", "get_resume_handler"]
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter; app.py logs to stdout, so the report is the last line
+APP_PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+result = {"import_ms": round((time.perf_counter() - started) * 1000, 2), "requests": [], "integrations": {}}
+client = app.app.test_client()
+for path in %(requests)r:
+    started = time.perf_counter()
+    response = client.get(path)
+    result["requests"].append({"path": path, "status": response.status_code,
+                               "ms": round((time.perf_counter() - started) * 1000, 2)})
+started = time.perf_counter()
+app.job_store.reload(force=True)
+result["snapshot_load_ms"] = round((time.perf_counter() - started) * 1000, 2)
+result["snapshot_jobs"] = len(app.job_store.current().jobs)
+for name in %(integrations)r:
+    started = time.perf_counter()
+    getattr(app, name)()
+    result["integrations"][name] = round((time.perf_counter() - started) * 1000, 2)
+print(json.dumps(result))
+"""
+
+
+def run_python(args):
+    """Run a fresh interpreter in the repo; returns (wall ms, completed process)"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, capture_output=True, text=True, cwd=REPO_DIR, check=True)
+    return round((time.perf_counter() - started) * 1000, 2), result
+
+
+def parse_importtime(output):
+    """-X importtime output as trees of {module, self_ms, cumulative_ms, imports}
+
+    A module is reported after everything it imports, one indent level
+    deeper, so each line adopts the pending lines one level below it.
+    """
+    pending = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        pending.setdefault(depth, []).append({
+            "module": name.strip(),
+            "self_ms": round(int(self_us) / 1000, 2),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+            "imports": pending.pop(depth + 1, [])
+        })
+    return pending.get(0, [])
+
+
+def prune(node, min_ms):
+    """The tree without imports under min_ms (their time stays in the parent's cumulative)"""
+    return {**node, "imports": [prune(child, min_ms) for child in node["imports"]
+                                if child["cumulative_ms"] >= min_ms]}
+
+
+def flatten(node):
+    yield node
+    for child in node["imports"]:
+        yield from flatten(child)
+
+
+def profile_import(target, min_ms=1.0, top=10):
+    """Wall time and import tree of `import target` in a fresh interpreter"""
+    wall_ms, result = run_python(["-X", "importtime", "-c", f"import {target}"])
+    root = next(node for node in parse_importtime(result.stderr) if node["module"] == target)
+    modules = list(flatten(root))
+    slowest = sorted(modules, key=lambda node: -node["self_ms"])[:top]
+    return {
+        "wall_ms": wall_ms,
+        "import_ms": root["cumulative_ms"],
+        "modules": len(modules),
+        "slowest_modules": [{"module": node["module"], "self_ms": node["self_ms"]} for node in slowest],
+        "tree": prune(root, min_ms)
+    }
+
+
+def profile_app_boot():
+    """Import, first requests, snapshot load and integrations of a freshly booted app"""
+    wall_ms, result = run_python(["-c", APP_PROBE % {"requests": FIRST_REQUESTS, "integrations": INTEGRATIONS}])
+    boot = json.loads(result.stdout.strip().splitlines()[-1])
+    boot["wall_ms"] = wall_ms
+    boot["first_request_ms"] = boot["requests"][0]["ms"]
+    return boot
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=REPO_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(targets=None, iterations=3, min_ms=1.0):
+    """Profile every target; each figure is from the fastest of the iterations"""
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "iterations": iterations,
+        "interpreter_ms": min(run_python(["-c", "pass"])[0] for _ in range(iterations)),
+        "targets": {}
+    }
+    for target in targets or TARGETS:
+        runs = [profile_import(target, min_ms) for _ in range(iterations)]
+        report["targets"][target] = min(runs, key=lambda run: run["import_ms"])
+    if "app" in (targets or TARGETS):
+        boots = [profile_app_boot() for _ in range(iterations)]
+        report["app_boot"] = min(boots, key=lambda boot: boot["wall_ms"])
+    return report
+
+
+def compare(previous, current):
+    """Lines of what changed between two reports (positive = slower)"""
+    lines = [f"Startup {previous.get('commit')} -> {current.get('commit')}"]
+    for target, profile in current["targets"].items():
+        before = previous.get("targets", {}).get(target)
+        if before:
+            lines.append(f"  {target}: import {profile['import_ms'] - before['import_ms']:+.1f} ms, "
+                         f"modules {profile['modules'] - before['modules']:+d}")
+    if "app_boot" in current and "app_boot" in previous:
+        delta = current["app_boot"]["first_request_ms"] - previous["app_boot"]["first_request_ms"]
+        lines.append(f"  app first request: {delta:+.1f} ms")
+    return lines
+
+
+def main():
+    """Main function"""
+    arg_parser = argparse.ArgumentParser(description="Profile cold start of the app and scraper entry points")
+    arg_parser.add_argument("--target", action="append", choices=TARGETS,
+                            help="Module to profile (repeatable; default: all)")
+    arg_parser.add_argument("--iterations", type=int, default=3, help="Runs per target; the fastest is reported")
+    arg_parser.add_argument("--min-ms", type=float, default=1.0,
+                            help="Leave imports faster than this out of the tree")
+    arg_parser.add_argument("--output", help="Also write the JSON report to this file")
+    arg_parser.add_argument("--compare", metavar="REPORT", help="Print changes against an earlier report")
+    args = arg_parser.parse_args()
+
+    result = run_benchmark(args.target, args.iterations, args.min_ms)
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print("\n".join(compare(json.load(f), result)), file=sys.stderr)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import re
 from datetime import datetime
 from typing import List, Dict, Tuple
 
+from posting_normalizer import dedupe_postings
+
 class CandidateMatcher:
     def __init__(self):
         self.jobs_file = "edjoin_jobs.json"
@@ -18,7 +20,7 @@ class CandidateMatcher:
         """Load job positions from JSON file"""
         try:
             with open(self.jobs_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return dedupe_postings(json.load(f))
         except FileNotFoundError:
             return []
     
@@ -131,7 +133,7 @@ class CandidateMatcher:
                         'candidate_id': candidate.get('id'),
                         'candidate_name': candidate.get('name'),
                         'candidate_email': candidate.get('email'),
-                        'job_id': job.get('url', '').split('/')[-1],
+                        'job_id': job.get('posting_id') or job.get('url', '').split('/')[-1],
                         'job_title': job.get('title'),
                         'job_role': job.get('role'),
                         'job_location': job.get('location'),
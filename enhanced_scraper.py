@@ -2,28 +2,32 @@
 Enhanced EdJoin.org Scraper with Better Error Handling and Demo Data
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
-import time
-import random
 from datetime import datetime, timedelta
-import os
+from http_client import ResilientSession
+from job_parsers import get_parser
+from posting_index import SeenPostings
+from posting_normalizer import tag_source
+from scrape_pipeline import JsonSnapshotSink, ScrapePipeline, drain
+from scraper_config import ADVANCED_CONFIG
 
 class EnhancedEdJoinScraper:
-    def __init__(self):
+    link_fallback = True  # cards without a title element fall back to their first link
+    
+    def __init__(self, parser=None, parse_workers=None, session=None):
         self.base_url = "https://www.edjoin.org"
         self.search_url = f"{self.base_url}/search"
-        self.session = requests.Session()
+        self.session = session or ResilientSession()
+        self.parser = get_parser(parser or ADVANCED_CONFIG.get("html_parser"))
+        self.request_delay = (2, 4)  # random delay range (seconds) to avoid rate limiting
+        self.pipeline = ScrapePipeline(self, parse_workers=parse_workers)
         
         # Enhanced headers to mimic real browser
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Sec-Fetch-Dest': 'document',
             'Sec-Fetch-Mode': 'navigate',
@@ -32,7 +36,7 @@ class EnhancedEdJoinScraper:
         })
         
         # Demo data for testing
-        self.demo_positions = self.create_demo_data()
+        self.demo_positions = tag_source(self.create_demo_data(), "demo")
     
     def create_demo_data(self):
         """Create realistic demo data for testing"""
@@ -148,97 +152,38 @@ class EnhancedEdJoinScraper:
         ]
         return positions
     
-    def scrape_with_retry(self, keyword, max_pages=5, use_demo=False):
-        """Scrape jobs with retry logic and demo fallback"""
+    def demo_jobs(self, keyword):
+        return [job for job in self.demo_positions if job['role'].lower() == keyword.lower()]
+    
+    def iter_with_retry(self, keyword, max_pages=5, use_demo=False, seen=None):
+        """Yield jobs for a keyword as they are parsed, with demo fallback"""
         if use_demo:
             print(f"🎭 Using demo data for '{keyword}' (EdJoin.org is currently unavailable)")
-            return [job for job in self.demo_positions if job['role'].lower() == keyword.lower()]
-        
-        jobs = []
-        page = 1
+            yield from self.demo_jobs(keyword)
+            return
         
-        while page <= max_pages:
-            print(f"Scraping '{keyword}' - page {page}...")
-            
-            try:
-                # Add random delay to avoid rate limiting
-                time.sleep(random.uniform(2, 4))
-                
-                params = {
-                    "keywords": keyword,
-                    "page": page,
-                    "sort": "date"
-                }
-                
-                response = self.session.get(self.search_url, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Look for job listings with multiple selectors
-                    job_cards = soup.find_all("div", class_=["job-info", "job-listing", "search-result", "result-item"])
-                    
-                    if not job_cards:
-                        # Try alternative selectors
-                        job_cards = soup.find_all("div", class_="card")
-                        if not job_cards:
-                            job_cards = soup.find_all("article")
-                    
-                    if not job_cards:
-                        print(f"No more jobs found for '{keyword}' on page {page}")
-                        break
-                    
-                    page_jobs = 0
-                    for job in job_cards:
-                        job_data = self.extract_job_data(job, keyword)
-                        if job_data:
-                            jobs.append(job_data)
-                            page_jobs += 1
-                    
-                    if page_jobs == 0:
-                        print(f"No valid jobs found for '{keyword}' on page {page}")
-                        break
-                    
-                    print(f"Found {page_jobs} jobs on page {page}")
-                    page += 1
-                    
-                elif response.status_code == 500:
-                    print(f"⚠️ EdJoin.org returned 500 error for '{keyword}' - using demo data")
-                    return [job for job in self.demo_positions if job['role'].lower() == keyword.lower()]
-                else:
-                    print(f"Error: HTTP {response.status_code} for '{keyword}' page {page}")
-                    break
-                    
-            except requests.RequestException as e:
-                print(f"Network error for '{keyword}' page {page}: {e}")
-                break
-            except Exception as e:
-                print(f"Unexpected error for '{keyword}' page {page}: {e}")
-                break
+        count = 0
+        for job in self.pipeline.scrape_query(keyword, keyword, seen, max_pages):
+            count += 1
+            yield job
         
-        return jobs
+        if not count and self.pipeline.last_status == 500:
+            print(f"⚠️ EdJoin.org returned 500 error for '{keyword}' - using demo data")
+            yield from self.demo_jobs(keyword)
+    
+    def scrape_with_retry(self, keyword, max_pages=5, use_demo=False):
+        """Scrape jobs with retry logic and demo fallback"""
+        return list(self.iter_with_retry(keyword, max_pages, use_demo))
     
-    def extract_job_data(self, job_element, role_keyword):
-        """Extract job data from a job element"""
+    def extract_job_data(self, job_card, role_keyword):
+        """Extract job data from a parsed job card (see job_parsers)"""
         try:
-            # Try different selectors for job title and link
-            title_elem = job_element.find("a", class_=["job-title", "title", "position-title"])
-            if not title_elem:
-                title_elem = job_element.find("h3")
-            if not title_elem:
-                title_elem = job_element.find("h4")
-            if not title_elem:
-                title_elem = job_element.find("a")
-            
-            if not title_elem:
-                return None
-                
-            title = title_elem.get_text(strip=True)
+            title = job_card.get("title")
             if not title or len(title) < 5:
                 return None
                 
             # Get job URL
-            href = title_elem.get('href', '')
+            href = job_card.get("href", "")
             if href.startswith('/'):
                 url = f"{self.base_url}{href}"
             elif href.startswith('http'):
@@ -247,24 +192,9 @@ class EnhancedEdJoinScraper:
                 url = f"{self.base_url}/{href}"
             
             # Extract additional info
-            location = ""
-            district = ""
-            date_posted = ""
-            
-            # Try to find location
-            location_elem = job_element.find("span", class_=["location", "city", "district"])
-            if location_elem:
-                location = location_elem.get_text(strip=True)
-            
-            # Try to find district
-            district_elem = job_element.find("div", class_=["district", "employer"])
-            if district_elem:
-                district = district_elem.get_text(strip=True)
-            
-            # Try to find date
-            date_elem = job_element.find("span", class_=["date", "posted"])
-            if date_elem:
-                date_posted = date_elem.get_text(strip=True)
+            location = job_card.get("location", "")
+            district = job_card.get("district", "")
+            date_posted = job_card.get("date_posted", "")
             
             return {
                 "role": role_keyword.title(),
@@ -272,7 +202,7 @@ class EnhancedEdJoinScraper:
                 "url": url,
                 "location": location or "Location not specified",
                 "district": district or "District not specified",
-                "date_posted": date_posted or datetime.now().strftime('%Y-%m-%d'),
+                "date_posted": date_posted,
                 "scraped_at": datetime.now().isoformat()
             }
             
@@ -280,17 +210,22 @@ class EnhancedEdJoinScraper:
             print(f"Error extracting job data: {e}")
             return None
     
-    def run_full_scrape(self, use_demo=False):
-        """Run scraper for all roles"""
+    def iter_full_scrape(self, use_demo=False):
+        """Yield postings for all roles as they are parsed, de-duplicated across roles"""
         roles = ["director", "assistant director", "dean", "principal", "superintendent"]
-        all_jobs = []
+        seen = SeenPostings()
         
         for role in roles:
             print(f"\n=== Scraping {role.upper()} positions ===")
-            jobs = self.scrape_with_retry(role, max_pages=3, use_demo=use_demo)
-            all_jobs.extend(jobs)
-            print(f"Found {len(jobs)} {role} positions")
-        
+            count = 0
+            for job in self.iter_with_retry(role, max_pages=3, use_demo=use_demo, seen=seen):
+                count += 1
+                yield job
+            print(f"Found {count} {role} positions")
+    
+    def run_full_scrape(self, use_demo=False):
+        """Run scraper for all roles"""
+        all_jobs = list(self.iter_full_scrape(use_demo))
         print(f"\nTotal jobs found: {len(all_jobs)}")
         return all_jobs
     
@@ -307,26 +242,28 @@ def main():
     print("🚀 Enhanced EdJoin.org Job Scraper")
     print("=" * 50)
     
-    # Try real scraping first
+    # Try real scraping first, streaming postings into the snapshot as they are parsed
     print("Attempting to scrape real data from EdJoin.org...")
-    jobs = scraper.run_full_scrape(use_demo=False)
+    snapshot = JsonSnapshotSink()
+    total = drain(scraper.iter_full_scrape(use_demo=False), [snapshot])
     
     # If no jobs found, use demo data
-    if not jobs:
+    if not total:
         print("\n🎭 EdJoin.org is currently unavailable. Using demo data for demonstration...")
-        jobs = scraper.run_full_scrape(use_demo=True)
+        snapshot = JsonSnapshotSink()
+        total = drain(scraper.iter_full_scrape(use_demo=True), [snapshot])
+    scraper.pipeline.publish_metrics(total)
     
-    if jobs:
-        scraper.save_to_json(jobs)
-        print(f"\n✅ Scraping completed! Found {len(jobs)} total positions.")
+    if total:
+        print(f"\n✅ Scraping completed! Found {total} total positions.")
         
         # Show sample jobs
         print("\n📋 Sample positions found:")
-        for i, job in enumerate(jobs[:5], 1):
+        for i, job in enumerate(snapshot.samples, 1):
             print(f"{i}. {job['title']} ({job['role']}) - {job['location']}")
         
-        if len(jobs) > 5:
-            print(f"... and {len(jobs) - 5} more positions")
+        if total > len(snapshot.samples):
+            print(f"... and {total - len(snapshot.samples)} more positions")
     else:
         print("❌ No jobs found.")
 
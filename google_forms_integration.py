@@ -3,7 +3,6 @@ Google Forms Integration for Candidate Data
 Automatically submits candidate registrations to Google Forms
 """
 
-import requests
 import json
 from datetime import datetime
 import os
@@ -53,7 +52,8 @@ class GoogleFormsSubmitter:
             form_data[timestamp_entry] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Submit to Google Forms
-            response = requests.post(self.forms_url, data=form_data, timeout=10)
+            from http_client import get_session  # requests is only needed to submit
+            response = get_session().post(self.forms_url, data=form_data, timeout=10)
             
             if response.status_code == 200:
                 print(f"✅ Successfully submitted candidate {candidate_data.get('name')} to Google Forms")
@@ -0,0 +1,129 @@
+"""
+HTTP Archive
+Records every response a scraper receives to a gzip-compressed JSON-lines
+archive, and replays the archive through the same session interface so full
+scraper runs are deterministic and offline
+"""
+
+import base64
+import gzip
+import io
+import json
+import threading
+from datetime import datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_client import ResilientSession
+
+ARCHIVE_FILE = "http_archive.jsonl.gz"
+
+# Response headers worth keeping; bodies are stored already decoded
+KEPT_HEADERS = ["Content-Type", "Retry-After", "Location"]
+
+
+class ReplayMissError(requests.ConnectionError):
+    """Raised when a replayed run asks for a request that was never recorded"""
+
+
+def request_key(method, url, params=None):
+    """Canonical METHOD + URL (query parameters sorted) identifying a request"""
+    prepared = requests.Request(method.upper(), url, params=params).prepare()
+    base, _, query = prepared.url.partition("?")
+    if query:
+        base = f"{base}?{'&'.join(sorted(query.split('&')))}"
+    return f"{prepared.method} {base}"
+
+
+def archive_entry(key, response):
+    """Archive record for one response"""
+    return {
+        "key": key,
+        "status": response.status_code,
+        "reason": response.reason,
+        "url": response.url,
+        "encoding": response.encoding,
+        "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        "body": base64.b64encode(response.content).decode("ascii"),
+        "recorded_at": datetime.now().isoformat()
+    }
+
+
+def load_archive(path=ARCHIVE_FILE):
+    """Recorded entries grouped by request key, in recording order"""
+    entries = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries.setdefault(entry["key"], []).append(entry)
+    return entries
+
+
+class RecordingSession(ResilientSession):
+    """ResilientSession that appends every final response to an archive"""
+
+    def __init__(self, path=ARCHIVE_FILE, **kwargs):
+        super().__init__(**kwargs)
+        self.archive_path = path
+        self.recorded = 0
+        self._archive = gzip.open(path, 'wt', encoding='utf-8')
+        self._archive_lock = threading.Lock()  # detail pages are fetched from worker threads
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        entry = archive_entry(request_key(method, url, kwargs.get("params")), response)
+        with self._archive_lock:
+            self._archive.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.recorded += 1
+        return response
+
+    def close(self):
+        with self._archive_lock:
+            if not self._archive.closed:
+                self._archive.close()
+                print(f"📼 Recorded {self.recorded} responses to {self.archive_path}")
+        super().close()
+
+
+class ReplaySession(requests.Session):
+    """Serves recorded responses; nothing is sent over the network
+
+    A request recorded several times is answered in recording order, the last
+    response repeating once they are used up.
+    """
+
+    offline = True  # scrapers skip polite delays and Selenium when replaying
+
+    def __init__(self, path=ARCHIVE_FILE):
+        super().__init__()
+        self.archive_path = path
+        self.entries = load_archive(path)
+        self.served = {}
+        self.misses = []
+        self._lock = threading.Lock()
+        print(f"📼 Replaying {sum(map(len, self.entries.values()))} responses from {path}")
+
+    def request(self, method, url, params=None, **kwargs):
+        key = request_key(method, url, params)
+        with self._lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                self.misses.append(key)
+                raise ReplayMissError(f"No recorded response for {key}")
+            index = self.served.get(key, 0)
+            self.served[key] = index + 1
+        entry = recorded[min(index, len(recorded) - 1)]
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.url = entry["url"]
+        response.encoding = entry["encoding"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        response._content_consumed = True
+        response.raw = io.BytesIO(response._content)  # so close() and stream=True callers work
+        response.request = requests.Request(method.upper(), url, params=params).prepare()
+        return response
@@ -0,0 +1,298 @@
+"""
+Shared HTTP Client
+Pooled keep-alive requests.Session with bounded exponential backoff, jitter
+and a per-host circuit breaker, used for every outbound call in the project
+"""
+
+import os
+import random
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+from urllib3.util.request import ACCEPT_ENCODING as URLLIB3_ACCEPT_ENCODING
+
+from scraper_config import ADVANCED_CONFIG
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Only idempotent requests are retried; a POST (form submission) is sent once
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Encodings urllib3 can decode in this environment ("br" only when brotli is
+# installed), so the server never sends a body we cannot read
+ACCEPT_ENCODING = ", ".join(URLLIB3_ACCEPT_ENCODING.split(","))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after sustained failures, probes again after a cool-down"""
+
+    def __init__(self, host, failure_threshold=None, reset_seconds=None):
+        self.host = host
+        self.failure_threshold = failure_threshold or ADVANCED_CONFIG.get("circuit_failure_threshold", 5)
+        self.reset_seconds = reset_seconds or ADVANCED_CONFIG.get("circuit_reset_seconds", 300)
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False  # a half-open probe is in flight
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """Open (rejecting requests) until the cool-down has passed"""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            return time.monotonic() - self.opened_at < self.reset_seconds
+
+    def allow_request(self):
+        """Closed: allow. Open: reject. Cooled down (half-open): allow one probe, reject the rest until it ends"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def release_probe(self):
+        """The probe ended without telling us anything about the host; let the next request probe"""
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"⚡ Circuit opened for {self.host} after {self.failures} consecutive failures")
+                # A failed half-open probe restarts the cool-down
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit(url):
+    """The shared circuit breaker for a URL's host"""
+    host = urlsplit(url).netloc.lower()
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def backoff_delay(attempt, base=None, maximum=None):
+    """Full-jitter exponential backoff: uniform(0, min(max, base * 2**attempt))"""
+    base = base if base is not None else ADVANCED_CONFIG.get("retry_backoff_base", 1.0)
+    maximum = maximum if maximum is not None else ADVANCED_CONFIG.get("retry_backoff_max", 30)
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+def retry_after_seconds(response, maximum=None):
+    """Seconds requested by a Retry-After header, capped; None if absent"""
+    maximum = maximum if maximum is not None else ADVANCED_CONFIG.get("retry_backoff_max", 30)
+    value = response.headers.get("Retry-After", "")
+    if value.isdigit():
+        return min(int(value), maximum)
+    return None
+
+
+class HTTPXRaw:
+    """What requests expects of Response.raw (stream, read, close, release_conn), over an httpx response"""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    def stream(self, chunk_size=None, decode_content=True):
+        yield from self.upstream.iter_bytes(chunk_size)
+
+    def read(self, amt=None, decode_content=True):
+        # Only used by requests to drain a body, so the rest of it is read at once
+        return self.upstream.read()
+
+    def close(self):
+        self.upstream.close()
+
+    def release_conn(self):
+        self.upstream.close()
+
+
+def ssl_context(verify, cert):
+    """An SSL context for requests-style verify (bool or CA bundle/dir path) and cert (path or (cert, key))"""
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        context = ssl.create_default_context(cafile=None if os.path.isdir(verify) else verify,
+                                             capath=verify if os.path.isdir(verify) else None)
+    else:
+        context = ssl.create_default_context()
+    if cert:
+        context.load_cert_chain(*cert) if isinstance(cert, tuple) else context.load_cert_chain(cert)
+    return context
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Transport adapter that sends requests over HTTP/2 with httpx (optional)
+
+    httpx fixes TLS and proxy settings per client, so there is one pooled
+    client per (verify, cert, proxy) combination the session uses.
+    """
+
+    def __init__(self, pool_maxsize=10):
+        super().__init__()
+        import httpx  # needs httpx[http2]
+
+        self.limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self.clients = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, verify, cert, proxy):
+        import httpx
+
+        key = (verify, cert, proxy)
+        with self._lock:
+            if key not in self.clients:
+                # requests has already resolved proxies from the environment
+                self.clients[key] = httpx.Client(http2=True, limits=self.limits, follow_redirects=False,
+                                                 verify=ssl_context(verify, cert), proxy=proxy, trust_env=False)
+            return self.clients[key]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        import httpx
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        client = self.get_client(verify, cert, select_proxy(request.url, proxies))
+        try:
+            upstream = client.send(client.build_request(request.method, request.url, headers=dict(request.headers),
+                                                        content=request.body, timeout=timeout), stream=True)
+            if not stream:
+                upstream.read()
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers)
+        response.headers.pop("Content-Encoding", None)  # httpx decodes the body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = str(upstream.url)
+        response.raw = HTTPXRaw(upstream)
+        response.request = request
+        response.connection = self
+        if not stream:
+            response._content = upstream.content
+            response._content_consumed = True
+            upstream.close()
+        return response
+
+    def close(self):
+        with self._lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients = {}
+
+
+class ResilientSession(requests.Session):
+    """Session whose requests retry transient failures and respect host circuits
+
+    Connections are pooled and kept alive per host; pool sizes and HTTP/2 come
+    from ADVANCED_CONFIG unless given.
+    """
+
+    def __init__(self, max_retries=None, pool_connections=None, pool_maxsize=None, http2=None):
+        super().__init__()
+        self.max_retries = max_retries if max_retries is not None else ADVANCED_CONFIG.get("max_retries", 3)
+        self.sleep = time.sleep
+
+        pool_connections = pool_connections or ADVANCED_CONFIG.get("pool_connections", 10)
+        pool_maxsize = pool_maxsize or ADVANCED_CONFIG.get("pool_maxsize", 10)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+        if http2 if http2 is not None else ADVANCED_CONFIG.get("http2", False):
+            try:
+                self.mount("https://", HTTP2Adapter(pool_maxsize))
+            except ImportError:
+                print("⚠️ HTTP/2 needs httpx[http2], using HTTP/1.1 keep-alive")
+
+        self.headers.update({
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+        })
+
+    def request(self, method, url, *args, **kwargs):
+        breaker = get_circuit(url)
+        attempt = 0
+        max_retries = self.max_retries if method.upper() in RETRY_METHODS else 0
+
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(f"Circuit open for {breaker.host}, not sending {method} {url}")
+
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    e.retries = attempt  # for the scrape metrics
+                    raise
+            except BaseException:
+                breaker.release_probe()
+                raise
+                delay = backoff_delay(attempt)
+                print(f"Retrying {url} in {delay:.1f}s after {type(e).__name__} "
+                      f"(attempt {attempt + 1}/{max_retries})")
+            else:
+                response.retries = attempt  # for the scrape metrics
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    return response
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                print(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code} "
+                      f"(attempt {attempt + 1}/{max_retries})")
+                response.close()
+
+            attempt += 1
+            self.sleep(delay)
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide pooled session for calls outside the scrapers"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = ResilientSession()
+        return _shared_session
@@ -0,0 +1,209 @@
+"""
+HTML Parser Backends for EdJoin.org Search Pages
+Extracts raw job-card fields with html.parser, lxml or selectolax
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Card selectors, tried in order (same cascade the scrapers always used)
+CARD_CLASSES = ["job-info", "job-listing", "search-result", "result-item"]
+FALLBACK_CARD_CLASS = "card"
+TITLE_CLASSES = ["job-title", "title", "position-title"]
+LOCATION_CLASSES = ["location", "city", "district"]
+DISTRICT_CLASSES = ["district", "employer"]
+DATE_CLASSES = ["date", "posted"]
+
+# Preferred backend order when none is requested
+BACKEND_PREFERENCE = ["selectolax", "lxml", "html.parser"]
+
+
+def _class_list(value):
+    """Normalize a class attribute (string or list) to a list of class names"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return list(value)
+
+
+def is_card_container(name, attrs):
+    """SoupStrainer filter: keep only elements that can hold a job card"""
+    if name == "article":
+        return True
+    if name != "div":
+        return False
+    classes = _class_list(attrs.get("class"))
+    return any(c in CARD_CLASSES or c == FALLBACK_CARD_CLASS for c in classes)
+
+
+class BeautifulSoupParser:
+    """BeautifulSoup backend (html.parser or lxml tree builder)"""
+
+    def __init__(self, features="html.parser", strain=True):
+        self.name = features
+        self.features = features
+        self.parse_only = SoupStrainer(is_card_container) if strain else None
+
+    def parse_cards(self, html, link_fallback=True):
+        """Return a raw field dict for every job card on a search page"""
+        soup = BeautifulSoup(html, self.features, parse_only=self.parse_only)
+
+        job_cards = soup.find_all("div", class_=CARD_CLASSES)
+        if not job_cards:
+            job_cards = soup.find_all("div", class_=FALLBACK_CARD_CLASS)
+        if not job_cards:
+            job_cards = soup.find_all("article")
+
+        return [self.parse_card(card, link_fallback) for card in job_cards]
+
+    def parse_card(self, job_element, link_fallback=True):
+        """Extract title, link and metadata text from one card element"""
+        title_elem = job_element.find("a", class_=TITLE_CLASSES)
+        if not title_elem:
+            title_elem = job_element.find("h3")
+        if not title_elem:
+            title_elem = job_element.find("h4")
+        if not title_elem and link_fallback:
+            title_elem = job_element.find("a")
+
+        card = {
+            "title": None,
+            "href": "",
+            "location": "",
+            "district": "",
+            "date_posted": ""
+        }
+
+        if title_elem:
+            card["title"] = title_elem.get_text(strip=True)
+            card["href"] = title_elem.get('href', '') or ''
+
+        location_elem = job_element.find("span", class_=LOCATION_CLASSES)
+        if location_elem:
+            card["location"] = location_elem.get_text(strip=True)
+
+        district_elem = job_element.find("div", class_=DISTRICT_CLASSES)
+        if district_elem:
+            card["district"] = district_elem.get_text(strip=True)
+
+        date_elem = job_element.find("span", class_=DATE_CLASSES)
+        if date_elem:
+            card["date_posted"] = date_elem.get_text(strip=True)
+
+        return card
+
+
+class SelectolaxParser:
+    """selectolax (lexbor) backend - C parser, same card semantics as BeautifulSoup"""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_class = LexborHTMLParser
+
+    def parse_cards(self, html, link_fallback=True):
+        """Return a raw field dict for every job card on a search page"""
+        tree = self._parser_class(html)
+
+        selector = ", ".join(f"div.{cls}" for cls in CARD_CLASSES)
+        job_cards = tree.css(selector)
+        if not job_cards:
+            job_cards = tree.css(f"div.{FALLBACK_CARD_CLASS}")
+        if not job_cards:
+            job_cards = tree.css("article")
+
+        return [self.parse_card(card, link_fallback) for card in job_cards]
+
+    @staticmethod
+    def _find(job_element, tag, classes=None):
+        """Mirror of Tag.find(): first matching descendant in document order"""
+        nodes = job_element.traverse(include_text=False)
+        next(nodes, None)  # traverse() yields the card itself first
+        for node in nodes:
+            if node.tag != tag:
+                continue
+            if classes is None:
+                return node
+            if any(c in classes for c in _class_list(node.attributes.get("class"))):
+                return node
+        return None
+
+    def parse_card(self, job_element, link_fallback=True):
+        """Extract title, link and metadata text from one card node"""
+        title_elem = self._find(job_element, "a", TITLE_CLASSES)
+        if not title_elem:
+            title_elem = self._find(job_element, "h3")
+        if not title_elem:
+            title_elem = self._find(job_element, "h4")
+        if not title_elem and link_fallback:
+            title_elem = self._find(job_element, "a")
+
+        card = {
+            "title": None,
+            "href": "",
+            "location": "",
+            "district": "",
+            "date_posted": ""
+        }
+
+        if title_elem:
+            card["title"] = title_elem.text(strip=True)
+            card["href"] = title_elem.attributes.get('href') or ''
+
+        location_elem = self._find(job_element, "span", LOCATION_CLASSES)
+        if location_elem:
+            card["location"] = location_elem.text(strip=True)
+
+        district_elem = self._find(job_element, "div", DISTRICT_CLASSES)
+        if district_elem:
+            card["district"] = district_elem.text(strip=True)
+
+        date_elem = self._find(job_element, "span", DATE_CLASSES)
+        if date_elem:
+            card["date_posted"] = date_elem.text(strip=True)
+
+        return card
+
+
+def _lxml_parser():
+    import lxml  # noqa: F401 - fail early if the tree builder is missing
+    return BeautifulSoupParser("lxml")
+
+
+PARSER_BACKENDS = {
+    "html.parser": lambda: BeautifulSoupParser("html.parser"),
+    "lxml": _lxml_parser,
+    "selectolax": SelectolaxParser
+}
+
+
+def available_backends():
+    """List the parser backends that can be constructed in this environment"""
+    names = []
+    for name, factory in PARSER_BACKENDS.items():
+        try:
+            factory()
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def get_parser(name=None):
+    """Get a parser backend by name, or the fastest one installed"""
+    if name:
+        if name not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend '{name}'. Choose from: {', '.join(PARSER_BACKENDS)}")
+        try:
+            return PARSER_BACKENDS[name]()
+        except ImportError:
+            print(f"⚠️ Parser backend '{name}' is not installed, falling back to html.parser")
+            return BeautifulSoupParser("html.parser")
+
+    for candidate in BACKEND_PREFERENCE:
+        try:
+            return PARSER_BACKENDS[candidate]()
+        except ImportError:
+            continue
+    return BeautifulSoupParser("html.parser")
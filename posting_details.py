@@ -0,0 +1,200 @@
+"""
+Posting Detail Fetcher
+Opens each posting's DistrictJobPosting page once, with a bounded worker pool,
+and caches the parsed details by posting ID
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from posting_index import posting_id
+from scraper_config import ADVANCED_CONFIG
+
+DETAILS_CACHE_FILE = "posting_details.json"
+
+# Detail field produced by each ADVANCED_CONFIG["features"] flag
+FEATURE_FIELDS = {
+    "extract_salary": "salary",
+    "extract_requirements": "requirements",
+    "extract_description": "description"
+}
+
+# Fields on a search card that, when changed, mean the posting was re-posted/edited
+FINGERPRINT_FIELDS = ["title", "district", "location", "date_posted"]
+
+SALARY_PATTERN = re.compile(
+    r"\$\s?\d[\d,]*(?:\.\d{2})?(?:\s*(?:-|–|to)\s*\$?\s?\d[\d,]*(?:\.\d{2})?)?"
+    r"(?:\s*(?:per|/)\s*(?:year|annum|month|day|hour|yr|mo|hr))?",
+    re.IGNORECASE
+)
+REQUIREMENTS_HEADING = re.compile(r"requirements|qualifications", re.IGNORECASE)
+DESCRIPTION_HEADING = re.compile(r"description|about the position|job summary", re.IGNORECASE)
+
+
+def fingerprint(job):
+    """Short hash of the card fields; a new value means the posting changed"""
+    raw = "|".join(str(job.get(field, "")) for field in FINGERPRINT_FIELDS)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _text(element):
+    """Element text with whitespace collapsed"""
+    return " ".join(element.get_text(" ", strip=True).split())
+
+
+def _section_after_heading(soup, pattern):
+    """The element that follows the first heading matching `pattern`"""
+    for heading in soup.find_all(["h1", "h2", "h3", "h4", "h5", "strong", "b", "dt"]):
+        if pattern.search(heading.get_text(" ", strip=True)):
+            sibling = heading.find_next_sibling()
+            if sibling:
+                return sibling
+    return None
+
+
+def parse_detail_page(html, features=None):
+    """Extract salary, requirements and description from a posting page"""
+    features = features or ADVANCED_CONFIG["features"]
+    soup = BeautifulSoup(html, "html.parser")
+    detail = {}
+
+    if features.get("extract_salary"):
+        salary = ""
+        salary_elem = soup.find(class_=re.compile(r"salary", re.IGNORECASE))
+        if salary_elem:
+            salary = _text(salary_elem)
+        else:
+            match = SALARY_PATTERN.search(soup.get_text(" ", strip=True))
+            if match:
+                salary = match.group(0)
+        detail["salary"] = salary
+
+    if features.get("extract_requirements"):
+        requirements = []
+        section = soup.find(class_=re.compile(r"requirement|qualification", re.IGNORECASE))
+        if not section:
+            section = _section_after_heading(soup, REQUIREMENTS_HEADING)
+        if section:
+            items = section.find_all("li")
+            requirements = [_text(item) for item in items if _text(item)]
+            if not requirements:
+                requirements = [_text(section)]
+        detail["requirements"] = requirements
+
+    if features.get("extract_description"):
+        description = ""
+        section = soup.find(class_=re.compile(r"job-description|description", re.IGNORECASE))
+        if not section:
+            section = _section_after_heading(soup, DESCRIPTION_HEADING)
+        if section:
+            description = _text(section)
+        detail["description"] = description
+
+    return detail
+
+
+class PostingDetailFetcher:
+    """Fetch detail pages for new or changed postings, skipping cached ones"""
+
+    def __init__(self, session, cache_file=DETAILS_CACHE_FILE, max_workers=None, features=None):
+        self.session = session
+        self.cache_file = cache_file
+        self.max_workers = max_workers or ADVANCED_CONFIG.get("detail_workers", 4)
+        self.features = features if features is not None else ADVANCED_CONFIG["features"]
+        self.request_delay = (0.5, 1.5)  # per-worker pause before each detail request
+        self.timeout = ADVANCED_CONFIG.get("request_timeout", 10)
+        self.cache = self.load_cache()
+
+    def enabled_fields(self):
+        """Detail fields switched on in ADVANCED_CONFIG['features']"""
+        return [field for flag, field in FEATURE_FIELDS.items() if self.features.get(flag)]
+
+    def load_cache(self):
+        """Load cached details keyed by posting ID"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """Write the cache atomically so a crash never leaves half a file"""
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    def needs_fetch(self, job):
+        """A posting is fetched when it is new or its card fields changed"""
+        job_id = posting_id(job.get("url"))
+        if not job_id:
+            return False
+        cached = self.cache.get(job_id)
+        if not cached or cached.get("fingerprint") != fingerprint(job):
+            return True
+        # A feature switched on since the last fetch also needs the page
+        return any(field not in cached for field in self.enabled_fields())
+
+    def fetch_detail(self, job):
+        """Fetch and parse one posting page (runs in a worker thread)"""
+        time.sleep(random.uniform(*self.request_delay))
+        response = self.session.get(job["url"], timeout=self.timeout)
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}")
+        return parse_detail_page(response.text, self.features)
+
+    @staticmethod
+    def stamp(detail, job):
+        """Cache entry for a fetched detail page"""
+        detail["fingerprint"] = fingerprint(job)
+        detail["fetched_at"] = datetime.now().isoformat()
+        return detail
+
+    def enrich(self, jobs):
+        """Add detail fields to jobs, fetching only new or changed postings"""
+        fields = self.enabled_fields()
+        if not fields:
+            return jobs
+
+        pending = {}
+        for job in jobs:
+            if self.needs_fetch(job):
+                pending.setdefault(posting_id(job["url"]), job)
+
+        print(f"📄 Fetching {len(pending)} posting pages "
+              f"({len(jobs) - len(pending)} cached) with {self.max_workers} workers...")
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.fetch_detail, job): job_id
+                           for job_id, job in pending.items()}
+                for future in as_completed(futures):
+                    job_id = futures[future]
+                    try:
+                        detail = future.result()
+                    except Exception as e:
+                        print(f"Error fetching posting {job_id}: {e}")
+                        continue
+                    self.cache[job_id] = self.stamp(detail, pending[job_id])
+            self.save_cache()
+
+        return self.apply_cached(jobs)
+
+    def apply_cached(self, jobs):
+        """Copy cached detail fields onto jobs without fetching anything"""
+        fields = self.enabled_fields()
+        for job in jobs:
+            cached = self.cache.get(posting_id(job.get("url")) or "")
+            if cached:
+                for field in fields:
+                    if field in cached:
+                        job[field] = cached[field]
+        return jobs
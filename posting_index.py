@@ -0,0 +1,54 @@
+"""
+Posting Index
+Run-scoped record of the EdJoin postings already seen, shared by every query
+"""
+
+import re
+from urllib.parse import urlsplit
+
+POSTING_ID_PATTERN = re.compile(r"DistrictJobPosting/(\d+)", re.IGNORECASE)
+
+
+def posting_id(url):
+    """Numeric EdJoin posting ID from a posting URL, or None"""
+    match = POSTING_ID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def posting_key(job):
+    """Stable identity for a job record: the posting ID when the URL has one"""
+    url = job.get("url", "")
+    job_id = posting_id(url)
+    if job_id:
+        return job_id
+
+    # No posting ID (e.g. a card without a link) - the URL alone is not unique
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}|{job.get('title', '').lower()}"
+
+
+class SeenPostings:
+    """Set of posting keys seen during one scrape run"""
+
+    def __init__(self, known_keys=None):
+        self.keys = set(known_keys or [])
+        self.repeats = 0  # how often an already-seen posting came back
+
+    def __contains__(self, job):
+        return posting_key(job) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, job):
+        """Mark a job as seen; returns False if it was already known"""
+        key = posting_key(job)
+        if key in self.keys:
+            self.repeats += 1
+            return False
+        self.keys.add(key)
+        return True
+
+    def filter_new(self, jobs):
+        """Keep only jobs not seen before, marking them as seen"""
+        return [job for job in jobs if self.add(job)]
@@ -0,0 +1,137 @@
+"""
+Posting Normalizer
+Canonical posting ID, URL, district and city for every scraped record, role
+assigned from the title, hash-indexed de-duplication, and content hashes
+"""
+
+import hashlib
+import json
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from posting_index import SeenPostings, posting_id
+from scraper_config import SCRAPING_CONFIG
+
+EDJOIN_ORIGIN = "https://www.edjoin.org"
+POSTING_PATH = "/Home/DistrictJobPosting/{}"
+PLACEHOLDERS = {"Location not specified", "District not specified"}
+
+# Words the card markup glues together ("UnifiedSchool District")
+JOINED_WORDS = re.compile(r"\b(Unified|Union|Elementary|High|City|County|Joint|Community)"
+                          r"(School|High|Elementary|District|College|Office)\b")
+DISTRICT_ABBREVIATIONS = [
+    (re.compile(r"\bUHSD$"), "Union High School District"),
+    (re.compile(r"\bJUSD$"), "Joint Unified School District"),
+    (re.compile(r"\bUSD$"), "Unified School District"),
+    (re.compile(r"\bESD$"), "Elementary School District"),
+    (re.compile(r"\bSD$"), "School District"),
+    (re.compile(r"\bCOE$"), "County Office of Education")
+]
+VOLATILE_FIELDS = ("scraped_at", "content_hash", "source")  # left out of the content hash
+STATE = "CA"  # EdJoin.org lists California postings
+STATE_NAMES = re.compile(r",?\s*\b(CA|Calif\.?|California)\b\.?(\s+\d{5}(-\d{4})?)?$", re.IGNORECASE)
+ZIP_CODE = re.compile(r"\s+\d{5}(-\d{4})?$")
+
+
+def _collapse(text):
+    return " ".join((text or "").split())
+
+
+def _fix_case(text):
+    """Title-case text that arrived all upper or all lower case"""
+    if text.isupper() or text.islower():
+        return " ".join(word if len(word) <= 3 and word.isupper() and "." not in word else word.capitalize()
+                        for word in text.split())
+    return text
+
+
+def canonical_url(url):
+    """One URL per posting: EdJoin posting links become https://www.edjoin.org/Home/DistrictJobPosting/<id>"""
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower()
+    job_id = posting_id(url)
+    if job_id:
+        origin = EDJOIN_ORIGIN if not host or host.endswith("edjoin.org") else f"{parts.scheme}://{host}"
+        return f"{origin}{POSTING_PATH.format(job_id)}"
+    return urlunsplit((parts.scheme.lower(), host, parts.path, parts.query, ""))
+
+
+def canonical_district(name):
+    """District name with glued words split and common abbreviations spelled out"""
+    name = _collapse(name)
+    if not name or name in PLACEHOLDERS:
+        return name
+    name = _fix_case(name)
+    name = JOINED_WORDS.sub(r"\1 \2", name)
+    for pattern, replacement in DISTRICT_ABBREVIATIONS:
+        name = pattern.sub(replacement, name)
+    return name
+
+
+def canonical_city(location):
+    """'City, CA' whatever state spelling, case or ZIP code the card used"""
+    location = _collapse(location)
+    if not location or location in PLACEHOLDERS:
+        return location
+    city = STATE_NAMES.sub("", location)
+    city = ZIP_CODE.sub("", city).strip(" ,")
+    if not city:
+        return location
+    return f"{_fix_case(city)}, {STATE}"
+
+
+def _title_phrases():
+    """(pattern, role) for every role and search variation, longest phrase first"""
+    phrases = {}
+    for role in SCRAPING_CONFIG["target_roles"]:
+        phrases.setdefault(role, role)
+        for variation in SCRAPING_CONFIG["role_variations"].get(role, []):
+            phrases.setdefault(variation, role)
+    return [(re.compile(rf"\b{re.escape(phrase)}\b", re.IGNORECASE), role.title())
+            for phrase, role in sorted(phrases.items(), key=lambda item: -len(item[0]))]
+
+
+TITLE_PHRASES = _title_phrases()  # compiled once; role_from_title runs for every posting
+
+
+def role_from_title(title, fallback=None):
+    """The target role a title names (most specific phrase wins), else the fallback"""
+    for pattern, role in TITLE_PHRASES:
+        if pattern.search(title or ""):
+            return role
+    return fallback
+
+
+def normalize_posting(job):
+    """Canonicalize a record in place: posting_id, url, district, location, role
+
+    Records without a source are tagged "live" (parsed from EdJoin.org responses).
+    """
+    job["url"] = canonical_url(job.get("url", ""))
+    job_id = posting_id(job["url"])
+    if job_id:
+        job["posting_id"] = job_id
+    job["district"] = canonical_district(job.get("district", ""))
+    job["location"] = canonical_city(job.get("location", ""))
+    job["role"] = role_from_title(job.get("title"), job.get("role"))
+    job.setdefault("source", "live")
+    return job
+
+
+def tag_source(jobs, source):
+    """Mark where records came from: live, selenium or demo"""
+    for job in jobs:
+        job["source"] = source
+    return jobs
+
+
+def dedupe_postings(jobs):
+    """Each posting once, first occurrence kept (posting keys in a hash set)"""
+    return SeenPostings().filter_new(jobs)
+
+
+def content_hash(job):
+    """Hash of a posting's content; changes only when a field other than scraped_at does"""
+    content = {key: value for key, value in job.items() if key not in VOLATILE_FIELDS}
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()[:16]
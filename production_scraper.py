@@ -3,34 +3,59 @@ Production EdJoin.org Scraper
 Handles real data scraping with fallback to demo data
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
+import argparse
 import time
 import random
 from datetime import datetime, timedelta
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import sqlite3
+import tempfile
+from http_archive import RecordingSession, ReplaySession
+from http_client import ResilientSession, get_circuit
+from job_parsers import get_parser
+from posting_details import DETAILS_CACHE_FILE, PostingDetailFetcher
+from posting_index import SeenPostings, posting_key
+from posting_normalizer import normalize_posting, tag_source
+from refresh_jobs import REFRESH_DIR, RefreshLock, RefreshProgress, new_progress_file
+from refresh_ledger import ATTACHED, CANCELLED, DONE, FAILED, open_ledger
+from scrape_checkpoint import CHECKPOINT_FILE, ScrapeCheckpoint
+from scrape_metrics import METRICS_DIR
+from scrape_pipeline import GoogleSheetsSink, JsonSnapshotSink, ScrapePipeline, SQLiteSink, drain
+from scraper_config import ADVANCED_CONFIG, SCRAPING_CONFIG
+from snapshot_meta import read_meta
 
 class ProductionEdJoinScraper:
-    def __init__(self):
+    link_fallback = True  # cards without a title element fall back to their first link
+    
+    def __init__(self, parser=None, parse_workers=None, session=None, output_dir=None):
         self.base_url = "https://www.edjoin.org"
         self.search_url = f"{self.base_url}/search"
-        self.session = requests.Session()
+        self.session = session or ResilientSession()
+        self.parser = get_parser(parser or ADVANCED_CONFIG.get("html_parser"))
+        self.request_delay = (1, 3)  # polite pause range (seconds) before each search request
+        
+        # Replayed archives are served from disk - no need to be polite. A
+        # replay never touches live state: its snapshot, detail cache, metrics
+        # and run history go to output_dir, which it must be given
+        self.offline = getattr(self.session, "offline", False)
+        if self.offline and not output_dir:
+            raise ValueError("An offline (replaying) scraper needs an output_dir for what its runs write")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.detail_fetcher = PostingDetailFetcher(self.session, cache_file=self.state_path(DETAILS_CACHE_FILE))
+        if self.offline:
+            self.request_delay = (0, 0)
+            self.detail_fetcher.request_delay = (0, 0)
+        self.pipeline = ScrapePipeline(self, parse_workers=parse_workers)
         
         # Enhanced headers
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Sec-Fetch-Dest': 'document',
             'Sec-Fetch-Mode': 'navigate',
@@ -39,8 +64,12 @@ class ProductionEdJoinScraper:
         })
         
         # Demo data for fallback
-        self.demo_positions = self.create_comprehensive_demo_data()
+        self.demo_positions = tag_source(self.create_comprehensive_demo_data(), "demo")
     
+    def state_path(self, name):
+        """Where this scraper's run keeps a state file: under output_dir if set, else the live file"""
+        return os.path.join(self.output_dir, name) if self.output_dir else name
+
     def create_comprehensive_demo_data(self):
         """Create comprehensive demo data representing real EdJoin.org positions"""
         positions = []
@@ -173,6 +202,14 @@ class ProductionEdJoinScraper:
     def scrape_with_selenium(self, keyword, max_pages=3):
         """Use Selenium for JavaScript-heavy sites"""
         try:
+            # Imported on first use: Selenium is only the fallback and is slow to import
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            from webdriver_manager.chrome import ChromeDriverManager
+            
             chrome_options = Options()
             chrome_options.add_argument("--headless")
             chrome_options.add_argument("--no-sandbox")
@@ -228,6 +265,8 @@ class ProductionEdJoinScraper:
     
     def extract_job_data_selenium(self, job_element, role_keyword):
         """Extract job data from Selenium WebElement"""
+        from selenium.webdriver.common.by import By
+        
         try:
             # Find title and link
             title_elem = None
@@ -276,85 +315,32 @@ class ProductionEdJoinScraper:
                 "url": url,
                 "location": location or "Location not specified",
                 "district": district or "District not specified", 
-                "date_posted": date_posted or datetime.now().strftime('%Y-%m-%d'),
-                "scraped_at": datetime.now().isoformat()
+                "date_posted": date_posted,
+                "scraped_at": datetime.now().isoformat(),
+                "source": "selenium"
             }
             
         except Exception as e:
             return None
     
-    def scrape_with_requests(self, keyword, max_pages=3):
-        """Use requests for simple scraping"""
-        jobs = []
+    def scrape_with_requests(self, keyword, max_pages=3, seen=None, role=None, start_page=1, on_page=None):
+        """Use requests for simple scraping
         
-        for page in range(1, max_pages + 1):
-            print(f"Scraping '{keyword}' - page {page} with requests...")
-            
-            try:
-                time.sleep(random.uniform(1, 3))
-                
-                params = {
-                    "keywords": keyword,
-                    "page": page,
-                    "sort": "date"
-                }
-                
-                response = self.session.get(self.search_url, params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Try multiple selectors
-                    job_cards = soup.find_all("div", class_=["job-info", "job-listing", "search-result", "result-item"])
-                    if not job_cards:
-                        job_cards = soup.find_all("div", class_="card")
-                    if not job_cards:
-                        job_cards = soup.find_all("article")
-                    
-                    if not job_cards:
-                        break
-                    
-                    page_jobs = 0
-                    for job in job_cards:
-                        job_data = self.extract_job_data_requests(job, keyword)
-                        if job_data:
-                            jobs.append(job_data)
-                            page_jobs += 1
-                    
-                    if page_jobs == 0:
-                        break
-                    
-                    print(f"Found {page_jobs} jobs on page {page}")
-                    
-                else:
-                    print(f"HTTP {response.status_code} for page {page}")
-                    break
-                    
-            except Exception as e:
-                print(f"Error scraping page {page}: {e}")
-                break
-        
-        return jobs
+        When a run-scoped SeenPostings index is passed, postings already found
+        by an earlier query are skipped and pagination stops at the first page
+        that yields nothing new. on_page(page, new_jobs) is called after every
+        page that produced jobs (used for checkpointing).
+        """
+        return list(self.pipeline.scrape_query(keyword, role, seen, max_pages, start_page, on_page))
     
-    def extract_job_data_requests(self, job_element, role_keyword):
-        """Extract job data from BeautifulSoup element"""
+    def extract_job_data_requests(self, job_card, role_keyword):
+        """Extract job data from a parsed job card (see job_parsers)"""
         try:
-            title_elem = job_element.find("a", class_=["job-title", "title", "position-title"])
-            if not title_elem:
-                title_elem = job_element.find("h3")
-            if not title_elem:
-                title_elem = job_element.find("h4")
-            if not title_elem:
-                title_elem = job_element.find("a")
-            
-            if not title_elem:
-                return None
-            
-            title = title_elem.get_text(strip=True)
+            title = job_card.get("title")
             if not title or len(title) < 5:
                 return None
             
-            href = title_elem.get('href', '')
+            href = job_card.get("href", "")
             if href.startswith('/'):
                 url = f"{self.base_url}{href}"
             elif href.startswith('http'):
@@ -363,21 +349,9 @@ class ProductionEdJoinScraper:
                 url = f"{self.base_url}/{href}"
             
             # Extract additional info
-            location = ""
-            district = ""
-            date_posted = ""
-            
-            location_elem = job_element.find("span", class_=["location", "city", "district"])
-            if location_elem:
-                location = location_elem.get_text(strip=True)
-            
-            district_elem = job_element.find("div", class_=["district", "employer"])
-            if district_elem:
-                district = district_elem.get_text(strip=True)
-            
-            date_elem = job_element.find("span", class_=["date", "posted"])
-            if date_elem:
-                date_posted = date_elem.get_text(strip=True)
+            location = job_card.get("location", "")
+            district = job_card.get("district", "")
+            date_posted = job_card.get("date_posted", "")
             
             return {
                 "role": role_keyword.title(),
@@ -385,42 +359,173 @@ class ProductionEdJoinScraper:
                 "url": url,
                 "location": location or "Location not specified",
                 "district": district or "District not specified",
-                "date_posted": date_posted or datetime.now().strftime('%Y-%m-%d'),
+                "date_posted": date_posted,
                 "scraped_at": datetime.now().isoformat()
             }
             
         except Exception as e:
             return None
     
-    def run_production_scrape(self, use_demo=False):
+    extract_job_data = extract_job_data_requests  # the hook ScrapePipeline.parse calls
+    
+    def role_queries(self, role):
+        """Search terms for a role: the role itself plus its configured variations"""
+        queries = [role]
+        for variation in SCRAPING_CONFIG["role_variations"].get(role, []):
+            if variation not in queries:
+                queries.append(variation)
+        return queries
+    
+    def load_snapshot(self, filename="edjoin_jobs.json"):
+        """Load the previously published jobs, if any"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+    
+    def run_production_scrape(self, use_demo=False, incremental=False, snapshot_file="edjoin_jobs.json",
+                              max_pages=2, checkpoint=None):
         """Run production scraper with multiple fallback methods"""
-        roles = ["director", "assistant director", "dean", "principal", "superintendent"]
-        all_jobs = []
-        
         if use_demo:
             print("🎭 Using comprehensive demo data...")
             return self.demo_positions
         
+        return list(self.iter_production_scrape(incremental, snapshot_file, max_pages, checkpoint))
+    
+    @staticmethod
+    def check_cancelled(cancel):
+        if cancel is not None and cancel.is_set():
+            raise RefreshCancelled("Refresh cancelled")
+    
+    def iter_production_scrape(self, incremental=False, snapshot_file="edjoin_jobs.json", max_pages=2,
+                               checkpoint=None, progress=None, cancel=None):
+        """Yield every posting of the run as soon as it is parsed
+        
+        In incremental mode the index is seeded with the postings from the last
+        snapshot. Results are sorted by date, so each query stops at the first
+        page holding only known postings, and the role's known postings are
+        carried over from the snapshot. Only postings scraped within
+        max_age_days are carried, so one taken down drops out after that at the
+        latest; a full run drops it at once.
+        
+        With a ScrapeCheckpoint, progress is saved after every page and role,
+        and a run with the same options resumes from the saved cursor (the
+        postings kept by the interrupted run are yielded first).
+        
+        A RefreshProgress, if given, is updated after every page and role.
+        Setting cancel (a threading.Event) raises RefreshCancelled after the
+        current page, once the checkpoint has saved it.
+        """
+        roles = SCRAPING_CONFIG["target_roles"]
+        
+        previous_jobs = self.load_snapshot(snapshot_file) if incremental else []
+        if incremental:
+            # ISO timestamps compare as strings; postings without one are too old to trust
+            cutoff = (datetime.now() - timedelta(days=SCRAPING_CONFIG.get("max_age_days", 30))).isoformat()
+            expired = len(previous_jobs)
+            previous_jobs = [job for job in previous_jobs if job.get('scraped_at', '') >= cutoff]
+            expired -= len(previous_jobs)
+            print(f"🔁 Incremental mode: {len(previous_jobs)} known postings in {snapshot_file}"
+                  f"{f', {expired} past max_age_days dropped' if expired else ''}")
+        
+        checkpoint = checkpoint or ScrapeCheckpoint(path=None)
+        options = {"roles": roles, "incremental": incremental, "max_pages": max_pages}
+        resumed = checkpoint.start(options)
+        state = checkpoint.state
+        
+        # One index for the whole run, so overlapping queries are nearly free
+        seen = SeenPostings(posting_key(job) for job in previous_jobs)
+        if resumed:
+            print(f"⏯️ Resuming run from {state['started_at']}: "
+                  f"{len(state['completed_roles'])}/{len(roles)} roles done, {len(state['jobs'])} positions kept")
+            # No seen_keys yet means the run was killed before its first page: keep the snapshot seed
+            if state["seen_keys"] is not None:
+                seen = SeenPostings(state["seen_keys"])
+                seen.repeats = state["repeats"]
+        
+        carried_keys = {posting_key(job) for job in state["jobs"]}
+        if progress:
+            progress.begin(roles, max_pages, roles_done=len(state["completed_roles"]),
+                           postings_found=len(state["jobs"]) + len(state["role_jobs"]))
+        yield from list(state["jobs"])
+        
+        # Every query still to run starts at page 1, except the one being resumed;
+        # with a parse pool the pipeline fetches and parses those pages ahead
+        self.pipeline.plan([(query, role) for role in roles if role not in state["completed_roles"]
+                            for query in self.role_queries(role)
+                            if role != state["role"] or (query not in state["completed_queries"]
+                                                         and checkpoint.start_page(query) == 1)])
+        
         for role in roles:
+            if role in state["completed_roles"]:
+                continue
+            
+            self.check_cancelled(cancel)
             print(f"\n=== Scraping {role.upper()} positions ===")
+            checkpoint.begin_role(role, seen.repeats)
+            if progress:
+                progress.begin_role(role)
+            repeats_before = state["role_repeats_before"]
+            found = len(state["role_jobs"])
+            yield from list(state["role_jobs"])
             
             # Try requests first (faster)
-            jobs = self.scrape_with_requests(role, max_pages=2)
+            for query in self.role_queries(role):
+                if query in state["completed_queries"]:
+                    continue
+                
+                def save_page(page, new_jobs, query=query):
+                    checkpoint.record_page(query, page, new_jobs, seen)
+                    if progress:
+                        progress.page_done(len(new_jobs))
+                    self.check_cancelled(cancel)
+                
+                for job in self.pipeline.scrape_query(query, role, seen, max_pages,
+                                                      checkpoint.start_page(query), save_page):
+                    found += 1
+                    yield job
+                checkpoint.record_query(query)
+            
+            # Postings settled once the role's queries are done
+            extra = []
+            
+            # Reached known postings - keep the role's postings from the last snapshot
+            if incremental and seen.repeats > repeats_before:
+                for job in previous_jobs:
+                    key = posting_key(job)
+                    if job.get('role', '').lower() == role.lower() and key not in carried_keys:
+                        carried_keys.add(key)
+                        extra.append(job)
+                print(f"Found {found} new {role} positions, kept {len(extra)} known ones")
+                if extra:
+                    self.detail_fetcher.enrich(extra)
             
-            # If no jobs found, try Selenium
-            if not jobs:
+            # Nothing came back at all (not even known postings) - try Selenium,
+            # unless EdJoin.org itself is down
+            nothing_found = not found and not extra and seen.repeats == repeats_before
+            if nothing_found and self.offline:
+                print(f"Replaying an archive, skipping Selenium for {role}")
+            elif nothing_found and get_circuit(self.base_url).is_open():
+                print(f"EdJoin.org circuit is open, skipping Selenium for {role}")
+            elif nothing_found:
                 print(f"Trying Selenium for {role}...")
-                jobs = self.scrape_with_selenium(role, max_pages=2)
+                extra = seen.filter_new(normalize_posting(job) for job in
+                                       self.scrape_with_selenium(role, max_pages=max_pages))
+                if extra:
+                    self.detail_fetcher.enrich(extra)
             
             # If still no jobs, use demo data for this role
-            if not jobs:
+            used_demo = nothing_found and not extra
+            if used_demo:
                 print(f"Using demo data for {role}...")
-                jobs = [job for job in self.demo_positions if job['role'].lower() == role.lower()]
+                extra = [job for job in self.demo_positions if job['role'].lower() == role.lower()]
             
-            all_jobs.extend(jobs)
-            print(f"Found {len(jobs)} {role} positions")
-        
-        return all_jobs
+            checkpoint.finish_role(role, state["role_jobs"] + extra, seen, used_demo)
+            if progress:
+                progress.role_done(len(extra))
+            yield from extra
+            print(f"Found {found + len(extra)} {role} positions")
     
     def save_to_json(self, jobs, filename="edjoin_jobs.json"):
         """Save jobs to JSON file"""
@@ -428,9 +533,179 @@ class ProductionEdJoinScraper:
             json.dump(jobs, f, indent=2, ensure_ascii=False)
         print(f"Saved {len(jobs)} jobs to {filename}")
 
+class RefreshCancelled(Exception):
+    """A refresh stopped because its cancel event was set"""
+
+
+def make_sinks(sqlite=False, sheets=False, snapshot_file="edjoin_jobs.json"):
+    """Sinks for a refresh; the JSON snapshot is always written"""
+    sinks = [JsonSnapshotSink(snapshot_file)]
+    if sqlite:
+        sinks.append(SQLiteSink())
+    if sheets:
+        sinks.append(GoogleSheetsSink())
+    return sinks
+
+_warm_scraper = None
+
+def get_scraper():
+    """This process's long-lived scraper (session, parser and detail cache stay warm between runs)"""
+    global _warm_scraper
+    if _warm_scraper is None:
+        _warm_scraper = ProductionEdJoinScraper()
+    return _warm_scraper
+
+def run_refresh(scraper=None, incremental=None, fresh=False, sqlite=False, sheets=False,
+                progress=None, trigger="api", cancel=None, refresh_dir=REFRESH_DIR, ledger=None):
+    """Run one refresh in this process and publish the snapshot
+    
+    What production_scraper.py does, for long-lived callers (schedulers,
+    the web app) that would otherwise start a new interpreter per run. The
+    process's warm scraper is used unless one is given. The refresh lock is
+    taken, so a call made while another refresh runs waits for that one.
+    Setting cancel (a threading.Event) stops the run after the current page
+    with RefreshCancelled; the checkpoint lets the next run resume.
+    
+    A scraper with an output_dir (every replaying one) keeps the snapshot,
+    progress, metrics and ledger there. A replay takes no lock, leaves the
+    live checkpoint alone and cannot write to SQLite or the Google Sheet.
+    
+    The run's request and stage metrics are written by the pipeline (see
+    scrape_metrics) and summarized in the result. Every run, attached ones
+    included, is recorded in the refresh ledger (see refresh_ledger).
+    
+    Returns {"status": "done" or "attached", "trigger", "total", "role_counts", "samples", "metrics",
+    "fallback"}.
+    """
+    scraper = scraper or get_scraper()
+    if scraper.offline and (sqlite or sheets):
+        raise ValueError("A replayed run cannot write to the production database or Google Sheet")
+    if incremental is None:
+        incremental = SCRAPING_CONFIG.get("incremental", False)
+    snapshot_file = scraper.state_path("edjoin_jobs.json")
+    metrics_dir = scraper.state_path(METRICS_DIR)
+    refresh_dir = scraper.state_path(refresh_dir)
+    progress = progress or RefreshProgress(new_progress_file(refresh_dir))
+    # A ledger opened here is closed here; a caller's ledger stays open for its next run
+    own_ledger = ledger is None
+    if own_ledger:
+        ledger = open_ledger(scraper.state_path("refresh_ledger.db") if scraper.output_dir else None)
+    try:
+        # A ledger error must not fail the refresh or hide the error that ended it
+        entry = None
+        if ledger:
+            try:
+                entry = ledger.start(progress.state["job_id"], trigger)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not record the refresh in the ledger: {e}")
+        
+        def record(status, **outcome):
+            if entry is None:
+                return
+            try:
+                run = ledger.finish(entry, status, **outcome)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not record the refresh in the ledger: {e}")
+                return
+            if run["regression"]:
+                print(f"🐢 Refresh took {run['duration_seconds']}s, over {ledger.factor}x "
+                      f"the usual {run['baseline_seconds']}s")
+        
+        # One refresh at a time: a trigger that arrives mid-run waits for that run instead.
+        # A replay scrapes nothing live, so it neither takes nor waits for the lock.
+        lock = None if scraper.offline else RefreshLock(refresh_dir)
+        attached = lock.run_or_attach(trigger, progress.state["job_id"], progress=progress) if lock else None
+        if attached:
+            meta = read_meta(snapshot_file) or {}
+            total = meta.get("total_positions", 0)
+            progress.finish(total)
+            record(ATTACHED, total=total, role_counts=meta.get("role_counts", {}), attached_to=attached["job_id"])
+            return {"status": "attached", "trigger": attached["trigger"], "total": total,
+                    "role_counts": meta.get("role_counts", {}), "samples": [], "metrics": None, "fallback": False}
+        
+        scraper.pipeline.start_run(progress.state["job_id"], trigger)
+        fallback = False
+        try:
+            # A replayed run must not resume (or clear) the live run's checkpoint
+            checkpoint = ScrapeCheckpoint(path=None if scraper.offline else CHECKPOINT_FILE)
+            if fresh:
+                checkpoint.complete()
+        
+            # Try real scraping, streaming postings into the sinks as they are parsed
+            sinks = make_sinks(sqlite, sheets, snapshot_file)
+            total = drain(scraper.iter_production_scrape(incremental=incremental, snapshot_file=snapshot_file,
+                                                         checkpoint=checkpoint, progress=progress, cancel=cancel),
+                          sinks)
+        
+            # If no real jobs found, use demo data
+            if not total:
+                print("\n🎭 No real data available, using comprehensive demo data...")
+                fallback = True
+                sinks = make_sinks(sqlite, sheets, snapshot_file)
+                total = drain(scraper.run_production_scrape(use_demo=True), sinks)
+            if total:
+                checkpoint.complete()
+        except BaseException as e:
+            error = str(e) or e.__class__.__name__
+            progress.finish(0, error=error)
+            report = scraper.pipeline.publish_metrics(error=error, metrics_dir=metrics_dir)
+            record(CANCELLED if isinstance(e, RefreshCancelled) else FAILED, fallback=fallback, error=error,
+                   metrics=report["summary"])
+            raise
+        finally:
+            if lock:
+                lock.release()
+        progress.finish(total)
+        report = scraper.pipeline.publish_metrics(total, metrics_dir=metrics_dir)
+        record(DONE, total=total, role_counts=sinks[0].role_counts, fallback=fallback, metrics=report["summary"])
+        return {"status": "done", "trigger": trigger, "total": total, "role_counts": sinks[0].role_counts,
+                "samples": sinks[0].samples, "metrics": report["summary"], "fallback": fallback}
+    finally:
+        if own_ledger and ledger:
+            ledger.close()
+
 def main():
     """Main function"""
-    scraper = ProductionEdJoinScraper()
+    arg_parser = argparse.ArgumentParser(description="Production EdJoin.org scraper")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            default=SCRAPING_CONFIG.get("incremental", False),
+                            help="Stop each query at postings already in the last snapshot and keep "
+                                 "those scraped within max_age_days; only a full run drops removed postings sooner")
+    arg_parser.add_argument("--full", dest="incremental", action="store_false",
+                            help="Walk every query to max depth (default)")
+    arg_parser.add_argument("--fresh", action="store_true",
+                            help="Ignore any checkpoint left by an interrupted run")
+    arg_parser.add_argument("--sqlite", action="store_true",
+                            help="Also stream postings into the SQLite database")
+    arg_parser.add_argument("--sheets", action="store_true",
+                            help="Also stream postings into the Google Sheet")
+    arg_parser.add_argument("--parse-workers", type=int, default=None,
+                            help="Parse search pages in this many worker processes (0 = in-process)")
+    arg_parser.add_argument("--progress", metavar="FILE",
+                            help="Write run progress to this JSON file (default: a new one in refresh_jobs/)")
+    arg_parser.add_argument("--trigger", default="manual",
+                            help="What started this run (release, job, scheduler, admin), recorded in the refresh lock")
+    archive = arg_parser.add_mutually_exclusive_group()
+    archive.add_argument("--record", metavar="ARCHIVE",
+                         help="Save every search and detail response to a compressed archive")
+    archive.add_argument("--replay", metavar="ARCHIVE",
+                         help="Serve responses from a recorded archive instead of EdJoin.org")
+    arg_parser.add_argument("--output-dir", metavar="DIR",
+                            help="Keep the snapshot, detail cache, metrics and run history here instead of "
+                                 "the live files (--replay default: a new temp directory)")
+    args = arg_parser.parse_args()
+    if args.replay and (args.sqlite or args.sheets):
+        arg_parser.error("--replay cannot write to the production database or Google Sheet")
+    
+    session = None
+    if args.record:
+        session = RecordingSession(args.record)
+    elif args.replay:
+        session = ReplaySession(args.replay)
+    output_dir = args.output_dir
+    if args.replay and not output_dir:
+        output_dir = tempfile.mkdtemp(prefix="edjoin_replay_")
+    scraper = ProductionEdJoinScraper(parse_workers=args.parse_workers, session=session, output_dir=output_dir)
     
     print("🚀 Production EdJoin.org Scraper")
     print("=" * 50)
@@ -440,34 +715,33 @@ def main():
     print("3. Demo data (fallback)")
     print()
     
-    # Try real scraping
-    jobs = scraper.run_production_scrape(use_demo=False)
+    try:
+        result = run_refresh(scraper, incremental=args.incremental, fresh=args.fresh, sqlite=args.sqlite,
+                             sheets=args.sheets, progress=RefreshProgress(args.progress) if args.progress else None,
+                             trigger=args.trigger)
+    finally:
+        scraper.pipeline.close()
+        scraper.session.close()
+    total = result["total"]
+    if scraper.output_dir:
+        print(f"📁 Run output in {scraper.output_dir}")
     
-    # If no real jobs found, use demo data
-    if not jobs:
-        print("\n🎭 No real data available, using comprehensive demo data...")
-        jobs = scraper.run_production_scrape(use_demo=True)
-    
-    if jobs:
-        scraper.save_to_json(jobs)
-        print(f"\n✅ Scraping completed! Found {len(jobs)} total positions.")
+    if result["status"] == "attached":
+        print(f"✅ Joined the {result['trigger']} refresh already running: {total} positions published")
+    elif total:
+        print(f"\n✅ Scraping completed! Found {total} total positions.")
         
         # Show statistics
-        role_counts = {}
-        for job in jobs:
-            role = job['role']
-            role_counts[role] = role_counts.get(role, 0) + 1
-        
         print("\n📊 Position breakdown:")
-        for role, count in role_counts.items():
+        for role, count in result["role_counts"].items():
             print(f"  {role}: {count} positions")
         
         print("\n📋 Sample positions:")
-        for i, job in enumerate(jobs[:5], 1):
+        for i, job in enumerate(result["samples"], 1):
             print(f"{i}. {job['title']} ({job['role']}) - {job['location']}")
         
-        if len(jobs) > 5:
-            print(f"... and {len(jobs) - 5} more positions")
+        if total > len(result["samples"]):
+            print(f"... and {total - len(result['samples'])} more positions")
     else:
         print("❌ No jobs found.")
 
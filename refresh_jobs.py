@@ -0,0 +1,322 @@
+"""
+Background Job Refresh
+Runs a refresh in a background thread (or production_scraper.py as a separate
+process) and tracks its progress in refresh_jobs/<job_id>.json, which the
+scraper updates after every page. Any web worker can report on any refresh,
+since the state lives on disk.
+
+Only one refresh runs at a time: the running one holds refresh_jobs/refresh.lock
+and every other trigger (release phase, scheduler, scraper job, admin button)
+attaches to it instead of starting a duplicate.
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+REFRESH_DIR = "refresh_jobs"
+LOCK_FILE = "refresh.lock"
+ACTIVE = ("queued", "running", "attached")
+QUEUED_TIMEOUT = 300  # seconds a refresh may stay queued before it counts as lost
+
+
+def new_job_id():
+    return uuid.uuid4().hex[:12]
+
+
+def progress_file(job_id, refresh_dir=REFRESH_DIR):
+    return os.path.join(refresh_dir, f"{job_id}.json")
+
+
+def new_progress_file(refresh_dir=REFRESH_DIR):
+    """Progress file for a run that was not started from the admin page"""
+    os.makedirs(refresh_dir, exist_ok=True)
+    return progress_file(new_job_id(), refresh_dir)
+
+
+def write_state(path, state):
+    """Write a progress file atomically, so readers never see half of it"""
+    state["updated_at"] = datetime.now().isoformat()
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+class RefreshProgress:
+    """Progress of one scrape run, written by the scraping process"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = read_state(path) or {"job_id": os.path.splitext(os.path.basename(path))[0]}
+
+    def save(self):
+        write_state(self.path, self.state)
+
+    def begin(self, roles, max_pages, roles_done=0, postings_found=0):
+        """A run is starting (or resuming with roles and postings already done)"""
+        self.state.update({
+            "status": "running",
+            "pid": os.getpid(),
+            "started_at": self.state.get("started_at") or datetime.now().isoformat(),
+            "roles_total": len(roles),
+            "roles_done": roles_done,
+            "max_pages": max_pages,
+            "pages_done": 0,
+            "role_pages_done": 0,
+            "current_role": None,
+            "postings_found": postings_found
+        })
+        self.save()
+
+    def begin_role(self, role):
+        self.state["current_role"] = role
+        self.state["role_pages_done"] = 0
+        self.save()
+
+    def page_done(self, new_postings):
+        self.state["pages_done"] += 1
+        self.state["role_pages_done"] += 1
+        self.state["postings_found"] += new_postings
+        self.save()
+
+    def role_done(self, extra_postings=0):
+        self.state["roles_done"] += 1
+        self.state["postings_found"] += extra_postings
+        self.save()
+
+    def attach(self, job_id):
+        """This run found another in progress and is waiting on it instead"""
+        self.state.update({
+            "status": "attached",
+            "pid": os.getpid(),
+            "attached_to": job_id,
+            "started_at": self.state.get("started_at") or datetime.now().isoformat()
+        })
+        self.save()
+
+    def finish(self, postings, error=None):
+        self.state.update({
+            "status": "failed" if error else "done",
+            "finished_at": datetime.now().isoformat(),
+            "current_role": None
+        })
+        if error:
+            self.state["error"] = str(error)
+        else:
+            self.state["postings_found"] = postings
+        self.save()
+
+
+def read_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def estimate_eta(state, now=None):
+    """Seconds left, from the time per role so far (the current role counts by its pages)"""
+    if state.get("status") != "running" or not state.get("roles_total"):
+        return None
+    now = now or datetime.now()
+    elapsed = (now - datetime.fromisoformat(state["started_at"])).total_seconds()
+    role_fraction = min(state.get("role_pages_done", 0) / max(state.get("max_pages") or 1, 1), 0.9)
+    done = (state["roles_done"] + (role_fraction if state.get("current_role") else 0)) / state["roles_total"]
+    if done <= 0:
+        return None
+    return round(elapsed * (1 - done) / done)
+
+
+def load_progress(job_id, refresh_dir=REFRESH_DIR):
+    """A refresh's progress with a fresh ETA, or None for an unknown job
+
+    While a refresh is attached to another run, that run's progress is shown.
+    """
+    if not job_id.isalnum():
+        return None
+    state = read_state(progress_file(job_id, refresh_dir))
+    if state and state.get("status") == "attached" and state.get("attached_to"):
+        state = load_progress(state["attached_to"], refresh_dir) or state
+    if state:
+        state["eta_seconds"] = estimate_eta(state)
+    return state
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def is_active(state):
+    """Queued recently, or running (or attached) in a process that is still alive"""
+    if state.get("status") == "queued":
+        submitted = datetime.fromisoformat(state["submitted_at"])
+        return (datetime.now() - submitted).total_seconds() < QUEUED_TIMEOUT
+    if state.get("status") in ("running", "attached"):
+        return pid_alive(state["pid"])
+    return False
+
+
+def active_job(refresh_dir=REFRESH_DIR):
+    """The job ID of a refresh still queued or running, if any"""
+    if not os.path.isdir(refresh_dir):
+        return None
+    for name in os.listdir(refresh_dir):
+        if name.endswith(".json"):
+            state = read_state(os.path.join(refresh_dir, name))
+            if state and is_active(state):
+                return state["job_id"]
+    return None
+
+
+class RefreshLock:
+    """Cross-process single-flight lock around a refresh
+
+    The running refresh holds an exclusive flock on refresh_jobs/refresh.lock
+    (the kernel drops it if the process dies) and writes who it is into the
+    file, so other triggers can see which run to attach to.
+    """
+
+    def __init__(self, refresh_dir=REFRESH_DIR):
+        self.path = os.path.join(refresh_dir, LOCK_FILE)
+        self._file = None
+
+    def acquire(self, trigger, job_id=None):
+        """Take the lock without waiting; False if another refresh holds it"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(self.path, 'a+', encoding='utf-8')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        lock_file.truncate(0)
+        json.dump({"pid": os.getpid(), "trigger": trigger, "job_id": job_id,
+                   "started_at": datetime.now().isoformat()}, lock_file)
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        self._file.truncate(0)
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def holder(self):
+        """The running refresh ({pid, trigger, job_id, started_at}), or None
+
+        Read without locking, so checking never gets in the way of a trigger
+        taking the lock; a holder whose process is gone is ignored.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                holder = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return holder if pid_alive(holder["pid"]) else None
+
+    def wait(self, holder, poll_seconds=2.0):
+        """Block until the given run has finished"""
+        while True:
+            current = self.holder()
+            if not current or (current["pid"], current["started_at"]) != (holder["pid"], holder["started_at"]):
+                return
+            time.sleep(poll_seconds)
+
+    def run_or_attach(self, trigger, job_id=None, poll_seconds=2.0, progress=None):
+        """Take the lock, or wait for the refresh in progress to finish
+
+        Returns None once this process holds the lock (release it when the
+        run is done), or the holder of the run that was waited on. A waiting
+        run's progress points at the run it is waiting on.
+        """
+        while not self.acquire(trigger, job_id):
+            holder = self.holder()
+            if holder is None:
+                # Taken a moment ago and not described yet, or just released
+                time.sleep(0.05)
+                continue
+            print(f"🔒 A refresh is already running ({holder['trigger']}, pid {holder['pid']}), "
+                  f"waiting for it instead of starting another")
+            if progress:
+                progress.attach(holder["job_id"])
+            self.wait(holder, poll_seconds)
+            return holder
+        return None
+
+
+def mark_failed(path, error):
+    """Record a refresh that ended without reporting its result"""
+    state = read_state(path) or {}
+    if state.get("status") in ACTIVE:
+        state.update({
+            "status": "failed",
+            "finished_at": datetime.now().isoformat(),
+            "error": error
+        })
+        write_state(path, state)
+
+
+def watch(process, path, log_file):
+    process.wait()
+    log_file.close()
+    mark_failed(path, f"scraper exited with code {process.returncode}")
+
+
+def run_in_thread(path, refresh_dir):
+    # Imported here: the scraper stack loads on the first refresh, not with the web app
+    from production_scraper import run_refresh
+    try:
+        run_refresh(progress=RefreshProgress(path), trigger="admin", refresh_dir=refresh_dir)
+    except Exception as e:
+        print(f"❌ Background refresh failed: {e}")
+        mark_failed(path, str(e) or e.__class__.__name__)
+
+
+def submit_refresh(args=None, refresh_dir=REFRESH_DIR, script=None):
+    """Start a background refresh; returns (job_id, started)
+
+    Given a script, the refresh runs that as a separate process with args;
+    the web app does this (ADVANCED_CONFIG["admin_refresh_script"]) so a
+    scrape never runs inside a web worker. Without one it runs in a thread
+    of this process with its warm scraper (production_scraper.run_refresh). While another refresh is queued or
+    running its job ID is returned instead, with started=False; that
+    includes refreshes started by the scheduler or a deploy, which hold the
+    refresh lock.
+    """
+    holder = RefreshLock(refresh_dir).holder()
+    running = (holder or {}).get("job_id") or active_job(refresh_dir)
+    if running:
+        return running, False
+
+    os.makedirs(refresh_dir, exist_ok=True)
+    job_id = new_job_id()
+    path = progress_file(job_id, refresh_dir)
+    write_state(path, {"job_id": job_id, "status": "queued", "submitted_at": datetime.now().isoformat()})
+
+    if script is None:
+        threading.Thread(target=run_in_thread, args=(path, refresh_dir), daemon=True,
+                         name=f"refresh-{job_id}").start()
+        return job_id, True
+
+    log_file = open(os.path.join(refresh_dir, f"{job_id}.log"), 'w', encoding='utf-8')
+    process = subprocess.Popen([sys.executable, script, "--progress", path, "--trigger", "admin"] + list(args or []),
+                               stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+    threading.Thread(target=watch, args=(process, path, log_file), daemon=True).start()
+    return job_id, True
@@ -0,0 +1,160 @@
+"""
+Refresh Run Ledger
+Every refresh run (whatever triggered it) as a row in a SQLite file: start,
+end, duration, trigger, outcome, postings and per-role counts, errors, and
+whether it fell back to demo data. A run that takes much longer than the
+median of the runs before it is flagged as a duration regression when it
+finishes. The admin history page (/admin/refresh-history) reads from here.
+
+Only full refreshes (run_refresh) are recorded. The adaptive scheduler's
+query refreshes publish new postings between them but are not runs here:
+they would skew the duration baseline. Their requests and new postings are
+kept per query in query_stats.json (see adaptive_scheduler).
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from refresh_jobs import pid_alive
+from scraper_config import ADVANCED_CONFIG
+
+RUNNING, DONE, FAILED, CANCELLED, ATTACHED = "running", "done", "failed", "cancelled", "attached"
+INTERRUPTED = "interrupted"  # shown for a run whose process died before it finished
+
+
+def median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+class RefreshLedger:
+    """Durable history of refresh runs"""
+
+    def __init__(self, db_path=None, window=None, factor=None, min_runs=None):
+        self.db_path = db_path or ADVANCED_CONFIG.get("refresh_ledger_db", "refresh_ledger.db")
+        self.window = window or ADVANCED_CONFIG.get("regression_window", 10)
+        self.factor = factor or ADVANCED_CONFIG.get("regression_factor", 1.5)
+        self.min_runs = min_runs or ADVANCED_CONFIG.get("regression_min_runs", 3)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                trigger TEXT,
+                pid INTEGER,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                duration_seconds REAL,
+                total_postings INTEGER,
+                role_counts TEXT,
+                fallback INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                attached_to TEXT,
+                metrics TEXT,
+                baseline_seconds REAL,
+                regression INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at)")
+
+    def close(self):
+        self.conn.close()
+
+    def start(self, job_id, trigger):
+        """Record a run as started; returns its row ID"""
+        cursor = self.conn.execute(
+            "INSERT INTO runs (job_id, trigger, pid, status, started_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, trigger, os.getpid(), RUNNING, datetime.now().isoformat())
+        )
+        return cursor.lastrowid
+
+    def finish(self, run_id, status, total=None, role_counts=None, fallback=False, error=None,
+               attached_to=None, metrics=None):
+        """Record how a run ended; returns the row, with its regression flag set"""
+        row = self.conn.execute("SELECT started_at FROM runs WHERE id = ?", (run_id,)).fetchone()
+        finished_at = datetime.now()
+        duration = round((finished_at - datetime.fromisoformat(row["started_at"])).total_seconds(), 3)
+        baseline = self.baseline(before=run_id) if status == DONE and not fallback else None
+        regression = baseline is not None and duration > baseline * self.factor
+        self.conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ?, duration_seconds = ?, total_postings = ?, "
+            "role_counts = ?, fallback = ?, error = ?, attached_to = ?, metrics = ?, baseline_seconds = ?, "
+            "regression = ? WHERE id = ?",
+            (status, finished_at.isoformat(), duration, total, json.dumps(role_counts or {}), int(fallback),
+             error, attached_to, json.dumps(metrics) if metrics else None, baseline, int(regression), run_id)
+        )
+        return self.run(run_id)
+
+    def baseline(self, before=None):
+        """Median duration of the last completed runs (demo fallbacks excluded), or None with too few"""
+        query = "SELECT duration_seconds FROM runs WHERE status = ? AND fallback = 0"
+        params = [DONE]
+        if before is not None:
+            query += " AND id < ?"
+            params.append(before)
+        rows = self.conn.execute(query + " ORDER BY id DESC LIMIT ?", params + [self.window]).fetchall()
+        if len(rows) < self.min_runs:
+            return None
+        return median(row["duration_seconds"] for row in rows)
+
+    def decode(self, row):
+        run = dict(row)
+        run["role_counts"] = json.loads(run["role_counts"] or "{}")
+        run["metrics"] = json.loads(run["metrics"]) if run["metrics"] else None
+        run["fallback"] = bool(run["fallback"])
+        run["regression"] = bool(run["regression"])
+        if run["status"] == RUNNING and not pid_alive(run["pid"]):
+            run["status"] = INTERRUPTED
+        return run
+
+    def run(self, run_id):
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self.decode(row) if row else None
+
+    def runs(self, limit=100):
+        """The latest runs, newest first"""
+        rows = self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self.decode(row) for row in rows]
+
+    def last_success(self):
+        """When the last successful run finished, or None"""
+        row = self.conn.execute("SELECT finished_at FROM runs WHERE status = ? ORDER BY id DESC LIMIT 1",
+                                (DONE,)).fetchone()
+        return row["finished_at"] if row else None
+
+    def summary(self, runs):
+        """Outcome counts, fallback rate, regressions and the current baseline over some runs"""
+        finished = [run for run in runs if run["status"] in (DONE, FAILED, CANCELLED)]
+        statuses = {}
+        for run in runs:
+            statuses[run["status"]] = statuses.get(run["status"], 0) + 1
+        return {
+            "runs": len(runs),
+            "statuses": statuses,
+            "fallback_rate": round(sum(run["fallback"] for run in finished) / len(finished), 3) if finished else None,
+            "regressions": sum(run["regression"] for run in runs),
+            "median_seconds": median(run["duration_seconds"] for run in finished
+                                     if run["status"] == DONE and not run["fallback"]),
+            "baseline_seconds": self.baseline(),
+            "last_success": self.last_success()
+        }
+
+
+def open_ledger(db_path=None):
+    """The ledger at db_path (default: the configured one), or None if it cannot be opened
+
+    A refresh never fails over its history.
+    """
+    try:
+        return RefreshLedger(db_path)
+    except sqlite3.Error as e:
+        print(f"⚠️ Refresh ledger unavailable: {e}")
+        return None
@@ -5,7 +5,6 @@ Multiple approaches for handling candidate resume uploads
 
 import os
 import json
-import requests
 from datetime import datetime
 import uuid
 from google_forms_integration import GoogleFormsSubmitter
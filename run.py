@@ -6,6 +6,7 @@ Main startup script for the Education Jobs Sourcing Tool
 import os
 import sys
 import subprocess
+import threading
 from pathlib import Path
 
 def check_dependencies():
@@ -30,23 +31,24 @@ def create_directories():
     print("✅ Directories created")
 
 def run_scraper():
-    """Run the EdJoin scraper"""
+    """Run the EdJoin scraper in this process"""
+    from production_scraper import RefreshCancelled, run_refresh
+    
     print("🔄 Running EdJoin scraper...")
+    # Stop after 5 minutes; the next run resumes from the checkpoint
+    cancel = threading.Event()
+    timer = threading.Timer(300, cancel.set)
+    timer.start()
     try:
-        result = subprocess.run([sys.executable, 'edjoin_scraper.py'], 
-                              capture_output=True, text=True, timeout=300)
-        if result.returncode == 0:
-            print("✅ Scraper completed successfully")
-            return True
-        else:
-            print(f"⚠️ Scraper completed with warnings: {result.stderr}")
-            return True
-    except subprocess.TimeoutExpired:
+        result = run_refresh(trigger="run", cancel=cancel)
+        print(f"✅ Scraper completed successfully ({result['total']} positions)")
+    except RefreshCancelled:
         print("⚠️ Scraper timed out, but continuing...")
-        return True
     except Exception as e:
         print(f"⚠️ Scraper error: {e}, but continuing...")
-        return True
+    finally:
+        timer.cancel()
+    return True
 
 def start_web_app():
     """Start the Flask web application"""
@@ -4,11 +4,13 @@ Automated scheduler for running the EdJoin scraper
 
 import schedule
 import time
-import subprocess
 import sys
 from datetime import datetime
 import logging
 
+from adaptive_scheduler import AdaptiveScheduler
+from production_scraper import run_refresh
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,21 +22,11 @@ logging.basicConfig(
 )
 
 def run_scraper():
-    """Run the EdJoin scraper"""
+    """Run a full refresh in this process"""
     try:
         logging.info("Starting scheduled scraper run...")
-        result = subprocess.run([sys.executable, 'edjoin_scraper.py'], 
-                              capture_output=True, text=True, timeout=1800)  # 30 min timeout
-        
-        if result.returncode == 0:
-            logging.info("Scraper completed successfully")
-            logging.info(f"Output: {result.stdout}")
-        else:
-            logging.error(f"Scraper failed with return code {result.returncode}")
-            logging.error(f"Error: {result.stderr}")
-            
-    except subprocess.TimeoutExpired:
-        logging.error("Scraper timed out after 30 minutes")
+        result = run_refresh(trigger="scheduler")
+        logging.info(f"Scraper completed successfully: {result['total']} positions")
     except Exception as e:
         logging.error(f"Error running scraper: {e}")
 
@@ -42,16 +34,17 @@ def main():
     """Main scheduler function"""
     logging.info("Starting job scheduler...")
     
-    # Schedule jobs
-    schedule.every().day.at("06:00").do(run_scraper)  # Daily at 6 AM
-    schedule.every().day.at("18:00").do(run_scraper)  # Daily at 6 PM
+    # Refresh each query as often as it turns up new postings, within the daily request budget
+    scheduler = AdaptiveScheduler()
+    minutes = scheduler.config["tick_minutes"]
+    schedule.every(minutes).minutes.do(scheduler.tick)
     
     # Optional: Run immediately on startup for testing
-    # run_scraper()
+    # scheduler.tick()
     
     logging.info("Scheduler started. Jobs scheduled:")
-    logging.info("- Daily at 06:00")
-    logging.info("- Daily at 18:00")
+    logging.info(f"- Adaptive query refresh every {minutes} minutes")
+    logging.info(f"- At most {scheduler.config['daily_request_budget']} search requests per day")
     
     # Keep the scheduler running
     while True:
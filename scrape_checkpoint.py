@@ -0,0 +1,129 @@
+"""
+Scrape Checkpoint
+Persists scrape progress after every role and page so a killed run resumes
+where it stopped instead of starting again from page one
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+CHECKPOINT_FILE = "scrape_checkpoint.json"
+
+
+class ScrapeCheckpoint:
+    """Progress of one scrape run: finished work, partial results and cursor"""
+
+    def __init__(self, path=CHECKPOINT_FILE, max_age_hours=24):
+        self.path = path  # None keeps the checkpoint in memory only
+        self.max_age = timedelta(hours=max_age_hours)
+        self.state = self.new_state({})
+
+    @staticmethod
+    def new_state(options):
+        now = datetime.now().isoformat()
+        return {
+            "options": options,
+            "started_at": now,
+            "updated_at": now,
+            "completed_roles": [],
+            "demo_roles": [],
+            "jobs": [],               # results of completed roles
+            "role": None,             # role in progress
+            "role_jobs": [],          # partial results of the role in progress
+            "role_repeats_before": 0,
+            "completed_queries": [],  # queries finished within the role in progress
+            "cursor": None,           # {"query": ..., "page": last completed page}
+            "seen_keys": None,        # set once a page is recorded; until then the run's seed stands
+            "repeats": 0
+        }
+
+    def load(self):
+        """Load a saved checkpoint, or None if missing, unreadable or stale"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            updated_at = datetime.fromisoformat(state["updated_at"])
+        except (ValueError, KeyError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if datetime.now() - updated_at > self.max_age:
+            print(f"⚠️ Ignoring stale checkpoint from {state['updated_at']}")
+            return None
+        return state
+
+    def start(self, options):
+        """Resume a matching checkpoint if there is one; returns True when resuming"""
+        saved = self.load()
+        if saved and saved.get("options") == options:
+            self.state = saved
+            return True
+        self.state = self.new_state(options)
+        self.save()
+        return False
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        if not self.path:
+            return
+        self.state["updated_at"] = datetime.now().isoformat()
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+    def begin_role(self, role, repeats):
+        """Start a role unless it is the one being resumed"""
+        if self.state["role"] == role:
+            return
+        self.state.update({
+            "role": role,
+            "role_jobs": [],
+            "role_repeats_before": repeats,
+            "completed_queries": [],
+            "cursor": None
+        })
+        self.save()
+
+    def start_page(self, query):
+        """First page still to fetch for a query"""
+        cursor = self.state["cursor"]
+        if cursor and cursor["query"] == query:
+            return cursor["page"] + 1
+        return 1
+
+    def record_page(self, query, page, new_jobs, seen):
+        """Store one fetched page's postings and move the cursor past it"""
+        self.state["role_jobs"].extend(new_jobs)
+        self.state["cursor"] = {"query": query, "page": page}
+        self.state["seen_keys"] = sorted(seen.keys)
+        self.state["repeats"] = seen.repeats
+        self.save()
+
+    def record_query(self, query):
+        self.state["completed_queries"].append(query)
+        self.state["cursor"] = None
+        self.save()
+
+    def finish_role(self, role, jobs, seen, used_demo=False):
+        """Move a role's final results into the completed set"""
+        self.state["jobs"].extend(jobs)
+        self.state["completed_roles"].append(role)
+        if used_demo:
+            self.state["demo_roles"].append(role)
+        self.state.update({
+            "role": None,
+            "role_jobs": [],
+            "completed_queries": [],
+            "cursor": None,
+            "seen_keys": sorted(seen.keys),
+            "repeats": seen.repeats
+        })
+        self.save()
+
+    def complete(self):
+        """The run's results are published - drop the checkpoint"""
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
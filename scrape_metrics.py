@@ -0,0 +1,179 @@
+"""
+Scrape Run Metrics
+Per-request metrics of a scrape run (HTTP latency, status, response bytes,
+retries, parse time, cards found and new postings per search page) plus the
+pipeline's stage timings. Each run is written to scrape_metrics/<run_id>.json;
+the latest run is also kept as latest.json and as Prometheus text in
+latest.prom (for a node_exporter textfile collector, and served at /metrics
+to admins and to a Prometheus scraper sending the METRICS_TOKEN bearer token).
+"""
+
+import json
+import os
+from datetime import datetime
+
+from scraper_config import ADVANCED_CONFIG
+
+METRICS_DIR = ADVANCED_CONFIG.get("metrics_dir", "scrape_metrics")
+LATEST = "latest"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def totals(requests):
+    """Request count, errors, bytes, retries, latency, parse time and cards for some requests"""
+    latencies = sorted(request["latency_ms"] for request in requests)
+    return {
+        "requests": len(requests),
+        "errors": sum(1 for request in requests if request["error"] or request["status"] != 200),
+        "bytes": sum(request["bytes"] for request in requests),
+        "retries": sum(request["retries"] for request in requests),
+        "latency_ms": round(sum(latencies), 2),
+        "latency_ms_p50": percentile(latencies, 0.5),
+        "latency_ms_p95": percentile(latencies, 0.95),
+        "latency_ms_max": latencies[-1] if latencies else None,
+        "parse_ms": round(sum(request["parse_ms"] or 0 for request in requests), 2),
+        "cards": sum(request["cards"] or 0 for request in requests),
+        "new_postings": sum(request["new_postings"] or 0 for request in requests)
+    }
+
+
+class ScrapeMetrics:
+    """Metrics of one run: an entry per search page request, filled in as the page moves down the pipeline"""
+
+    def __init__(self, run_id=None, trigger=None):
+        self.started_at = datetime.now()
+        self.run_id = run_id or self.started_at.strftime("%Y%m%d%H%M%S")
+        self.trigger = trigger
+        self.requests = []
+
+    def request(self, query, role, page, seconds, response=None, error=None):
+        """Record a search page request; parse_ms, cards and new_postings are set later"""
+        entry = {
+            "query": query,
+            "role": role,
+            "page": page,
+            "status": response.status_code if response is not None else None,
+            "latency_ms": round(seconds * 1000, 2),
+            "bytes": len(response.content) if response is not None else 0,
+            "retries": getattr(response if response is not None else error, "retries", 0),
+            "error": str(error) if error else None,
+            "parse_ms": None,
+            "cards": None,
+            "new_postings": None
+        }
+        self.requests.append(entry)
+        return entry
+
+    def report(self, timings=None, total=None, error=None):
+        """The run as a JSON-ready dict"""
+        finished_at = datetime.now()
+        by_query = {}
+        for request in self.requests:
+            by_query.setdefault(request["query"], []).append(request)
+        statuses = {}
+        for request in self.requests:
+            status = str(request["status"] or "error")
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            "run_id": self.run_id,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration_seconds": round((finished_at - self.started_at).total_seconds(), 3),
+            "total_postings": total,
+            "error": str(error) if error else None,
+            "summary": {**totals(self.requests), "statuses": statuses},
+            "queries": {query: totals(requests) for query, requests in by_query.items()},
+            "stages": (timings.report() if timings else {}).get("stages", {}),
+            "requests": self.requests
+        }
+
+
+def write_json(path, data):
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_metrics(report, metrics_dir=METRICS_DIR, keep_runs=None):
+    """Write a run's metrics file, update latest.json and latest.prom, prune old runs; returns the path"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    path = os.path.join(metrics_dir, f"{report['run_id']}.json")
+    write_json(path, report)
+    write_json(os.path.join(metrics_dir, f"{LATEST}.json"), report)
+    prom_file = os.path.join(metrics_dir, f"{LATEST}.prom")
+    with open(f"{prom_file}.tmp", 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(report))
+    os.replace(f"{prom_file}.tmp", prom_file)
+
+    keep_runs = keep_runs or ADVANCED_CONFIG.get("metrics_keep_runs", 50)
+    runs = sorted((entry for entry in os.scandir(metrics_dir)
+                   if entry.name.endswith(".json") and not entry.name.startswith(LATEST)),
+                  key=lambda entry: (entry.stat().st_mtime_ns, entry.name))
+    for entry in runs[:-keep_runs]:
+        os.remove(entry.path)
+    return path
+
+
+def read_latest(metrics_dir=METRICS_DIR):
+    """The latest run's metrics, or None before the first run"""
+    try:
+        with open(os.path.join(metrics_dir, f"{LATEST}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(report):
+    """A run's metrics in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP edjoin_scrape_{name} {help_text}")
+        lines.append(f"# TYPE edjoin_scrape_{name} {kind}")
+        for labels, value in samples:
+            rendered = ",".join(f'{key}="{label(val)}"' for key, val in labels.items())
+            lines.append(f"edjoin_scrape_{name}{{{rendered}}} {value}" if rendered else f"edjoin_scrape_{name} {value}")
+
+    summary = report["summary"]
+    queries = report["queries"]
+    metric("run_timestamp_seconds", "gauge", "When the last run finished",
+           [({}, round(datetime.fromisoformat(report["finished_at"]).timestamp(), 3))])
+    metric("run_duration_seconds", "gauge", "Wall time of the last run", [({}, report["duration_seconds"])])
+    metric("run_success", "gauge", "1 if the last run published a snapshot", [({}, 0 if report["error"] else 1)])
+    metric("run_postings", "gauge", "Postings published by the last run", [({}, report["total_postings"] or 0)])
+    # Every value describes the last run alone (it resets each run), so all are gauges
+    metric("run_requests", "gauge", "Search page requests in the last run by HTTP status",
+           [({"status": status}, count) for status, count in sorted(summary["statuses"].items())])
+    metric("run_request_retries", "gauge", "Retries of search page requests in the last run",
+           [({}, summary["retries"])])
+    metric("run_response_bytes", "gauge", "Search page response bytes in the last run", [({}, summary["bytes"])])
+    metric("run_request_latency_seconds", "gauge", "Search page request latency quantiles in the last run",
+           [({"quantile": "0.5"}, (summary["latency_ms_p50"] or 0) / 1000),
+            ({"quantile": "0.95"}, (summary["latency_ms_p95"] or 0) / 1000)])
+    metric("run_parse_seconds", "gauge", "Time parsing search pages in the last run",
+           [({}, summary["parse_ms"] / 1000)])
+    metric("run_cards", "gauge", "Job cards found on search pages in the last run", [({}, summary["cards"])])
+    metric("run_new_postings", "gauge", "Postings not seen earlier in the last run",
+           [({}, summary["new_postings"])])
+    metric("run_stage_seconds", "gauge", "Time per pipeline stage in the last run",
+           [({"stage": stage}, entry["seconds"]) for stage, entry in report["stages"].items()])
+    metric("run_stage_items", "gauge", "Items through each pipeline stage in the last run",
+           [({"stage": stage}, entry["count"]) for stage, entry in report["stages"].items()])
+    metric("run_query_requests", "gauge", "Search page requests per query in the last run",
+           [({"query": query}, entry["requests"]) for query, entry in queries.items()])
+    metric("run_query_latency_seconds", "gauge", "Request latency per query in the last run",
+           [({"query": query}, entry["latency_ms"] / 1000) for query, entry in queries.items()])
+    metric("run_query_cards", "gauge", "Job cards found per query in the last run",
+           [({"query": query}, entry["cards"]) for query, entry in queries.items()])
+    return "\n".join(lines) + "\n"
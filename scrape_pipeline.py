@@ -0,0 +1,692 @@
+"""
+Streaming Scrape Pipeline
+fetch -> parse -> normalize -> dedupe -> sink, shared by all three scrapers.
+Postings flow one page at a time into pluggable sinks with bounded buffers.
+Parsing can optionally run in a process pool (ParsePool).
+"""
+
+import json
+import os
+import random
+import sqlite3
+import textwrap
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+
+from job_parsers import get_parser
+from posting_index import SeenPostings, posting_key
+from posting_normalizer import content_hash, normalize_posting
+from scrape_metrics import METRICS_DIR, ScrapeMetrics, write_metrics
+from scraper_config import ADVANCED_CONFIG
+from snapshot_meta import build_meta, meta_file, write_meta
+from source_adapters import get_source
+
+GOOGLE_SHEET_NAME = "EdJoin Education Jobs"
+SERVICE_ACCOUNT_FILE = "service_account.json"
+SHEET_HEADERS = ["Role", "Title", "Location", "District", "Date Posted", "URL", "Scraped At"]
+TEXT_FIELDS = ["title", "location", "district", "date_posted"]
+
+
+def normalize_job(job):
+    """Collapse whitespace runs in the text fields of a job record or card"""
+    for field in TEXT_FIELDS:
+        value = job.get(field)
+        if isinstance(value, str):
+            job[field] = " ".join(value.split())
+    return job
+
+
+def decode_page(content, encoding=None):
+    """Page text from raw response bytes"""
+    if isinstance(content, str):
+        return content
+    return content.decode(encoding or "utf-8", errors="replace")
+
+
+_worker_parsers = {}
+
+
+def worker_parser(backend):
+    if backend not in _worker_parsers:
+        _worker_parsers[backend] = get_parser(backend)
+    return _worker_parsers[backend]
+
+
+def parse_page_batch(backend, link_fallback, pages, source):
+    """Process-pool task: (kind, normalized cards, parse seconds) for each (content, encoding) page"""
+    parser = worker_parser(backend)
+    results = []
+    for content, encoding in pages:
+        started = time.perf_counter()
+        kind, cards = source.cards(decode_page(content, encoding), parser, link_fallback)
+        results.append((kind, [normalize_job(card) for card in cards], time.perf_counter() - started))
+    return results
+
+
+class ParsePool:
+    """Parses raw search pages in worker processes, a batch of pages per task"""
+
+    def __init__(self, max_workers=None, batch_size=None, backend="html.parser"):
+        self.max_workers = max_workers or ADVANCED_CONFIG.get("parse_workers") or os.cpu_count() or 1
+        self.batch_size = batch_size or ADVANCED_CONFIG.get("parse_batch_size", 4)
+        self.backend = backend
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0       # submitted tasks not parsed yet
+        self.peak_in_flight = 0
+        self.tasks = 0
+        self.pages = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, pages, link_fallback=True, source=None):
+        """Parse (content, encoding) pages as one task; returns a future per page giving (kind, cards, parse seconds)"""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.tasks += 1
+            self.pages += len(pages)
+        futures = [Future() for _ in pages]
+        task = self.executor.submit(parse_page_batch, self.backend, link_fallback, list(pages),
+                                    source or get_source())
+        task.add_done_callback(lambda task: self._parsed(task, futures))
+        return futures
+
+    def _parsed(self, task, futures):
+        with self._lock:
+            self.in_flight -= 1
+        error = None if task.cancelled() else task.exception()
+        for index, future in enumerate(futures):
+            if future.cancelled():
+                continue  # dropped by ScrapePipeline.plan
+            if task.cancelled():
+                future.cancel()
+            elif error:
+                future.set_exception(error)
+            else:
+                future.set_result(task.result()[index])
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class StageTimings:
+    """Seconds and item counts per pipeline stage, in total and per role"""
+
+    STAGES = ["fetch", "parse", "normalize", "dedupe", "details", "write"]
+
+    def __init__(self):
+        self.stages = {}
+        self.roles = {}
+
+    def add(self, stage, seconds, role=None, count=1):
+        role = role.lower() if role else None  # records carry "Director", queries "director"
+        for totals in [self.stages] + ([self.roles.setdefault(role, {})] if role else []):
+            entry = totals.setdefault(stage, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += seconds
+            entry["count"] += count
+
+    def report(self):
+        """Timings as JSON-ready dicts (seconds rounded to microseconds)"""
+        def rounded(totals):
+            return {stage: {"seconds": round(totals[stage]["seconds"], 6), "count": totals[stage]["count"]}
+                    for stage in self.STAGES if stage in totals}
+        return {
+            "stages": rounded(self.stages),
+            "roles": {role: rounded(totals) for role, totals in self.roles.items()}
+        }
+
+
+class ScrapePipeline:
+    """Generator stages over a scraper's session, parser and extract_job_data
+
+    The scraper provides: session, search_url, parser, request_delay,
+    link_fallback, extract_job_data(card, role) and optionally detail_fetcher
+    and source (a SourceAdapter; EdJoin.org by default).
+
+    With parse_workers > 0 pages are parsed in a ParsePool. While a page
+    parses, the first pages of the queries planned next (see plan) are
+    fetched and submitted batch_size pages per task, one batch per worker, so
+    the workers stay busy and each task's IPC cost is shared by its pages. A
+    query's later pages are only fetched once the page before has been used,
+    so early stopping never costs an extra request; they go one per task.
+    """
+
+    def __init__(self, scraper, timeout=15, parse_workers=None):
+        self.scraper = scraper
+        self.timeout = timeout
+        self.last_status = None
+        self.timings = StageTimings()
+        self.metrics = ScrapeMetrics()
+        self.source = getattr(scraper, "source", None) or get_source()
+        self.source_counts = {}  # pages per source kind: json, embedded, html
+        if parse_workers is None:
+            parse_workers = ADVANCED_CONFIG.get("parse_workers", 0)
+        self.parse_pool = ParsePool(parse_workers, backend=scraper.parser.name) if parse_workers else None
+        self.upcoming = deque()  # (query, role) still to start at page 1, in run order
+        self.ahead = {}          # (query, role) -> its first page, fetched and submitted ahead
+
+    def close(self):
+        """Stop the parse workers, if any"""
+        if self.parse_pool:
+            self.parse_pool.close()
+
+    def start_run(self, run_id=None, trigger=None):
+        """Fresh timings and metrics for a run (a warm scraper is reused across runs)"""
+        self.timings = StageTimings()
+        self.metrics = ScrapeMetrics(run_id, trigger)
+        self.plan([])
+        return self.metrics
+
+    def plan(self, queries):
+        """The (query, role) pairs the run will scrape from page 1, in order
+
+        Only used with a parse pool, to fetch and parse first pages ahead.
+        Pages fetched ahead for an earlier plan are dropped.
+        """
+        self.upcoming = deque(queries)
+        for _, _, future in self.ahead.values():
+            if future:
+                future.cancel()
+        self.ahead = {}
+
+    def publish_metrics(self, total=None, error=None, metrics_dir=METRICS_DIR):
+        """Write the run's metrics file (see scrape_metrics); returns the report"""
+        report = self.metrics.report(self.timings, total, error)
+        path = write_metrics(report, metrics_dir)
+        summary = report["summary"]
+        print(f"📈 {summary['requests']} requests, {summary['bytes']} bytes, {summary['retries']} retries, "
+              f"{summary['cards']} cards - metrics in {path}")
+        return report
+
+    def fetch_page(self, query, page, role=None):
+        """Fetch one search page; returns (response, metrics entry), the response None if the request failed"""
+        scraper = self.scraper
+        print(f"Scraping '{query}' - page {page}...")
+        time.sleep(random.uniform(*scraper.request_delay))
+        started = time.perf_counter()
+        try:
+            response = self.source.fetch(scraper.session, scraper.search_url, query, page, self.timeout)
+        except Exception as e:
+            self.metrics.request(query, role, page, time.perf_counter() - started, error=e)
+            print(f"Error scraping '{query}' page {page}: {e}")
+            return None, None
+        seconds = time.perf_counter() - started
+        self.timings.add("fetch", seconds, role)
+        return response, self.metrics.request(query, role, page, seconds, response)
+
+    def usable(self, response, query, page):
+        """Whether a fetched page can be parsed (records the status for the scrapers' fallbacks)"""
+        if response is None:
+            return False
+        self.last_status = response.status_code
+        if response.status_code != 200:
+            print(f"HTTP {response.status_code} for '{query}' page {page}")
+            return False
+        return True
+
+    def fetch_pages(self, query, max_pages, start_page=1, role=None):
+        """Stage 1: yield (page, response, metrics entry) until a request fails or returns non-200"""
+        for page in range(start_page, max_pages + 1):
+            response, request = self.fetch_page(query, page, role)
+            if not self.usable(response, query, page):
+                return
+            yield page, response, request
+
+    def submit_page(self, query, page, role):
+        """Fetch a page and start parsing it in the pool; returns (response, metrics entry, future)"""
+        response, request = self.fetch_page(query, page, role)
+        future = None
+        if response is not None and response.status_code == 200:
+            future = self.parse_pool.submit([(response.content, response.encoding)], self.scraper.link_fallback,
+                                            self.source)[0]
+        return response, request, future
+
+    def fetch_ahead(self):
+        """Fetch the first pages of upcoming queries while the pool has room, batch_size pages per parse task"""
+        pool = self.parse_pool
+        while self.upcoming and len(self.ahead) < pool.max_workers * pool.batch_size:
+            fetched = []
+            while self.upcoming and len(fetched) < pool.batch_size:
+                query, role = self.upcoming.popleft()
+                fetched.append((query, role, *self.fetch_page(query, 1, role)))
+            ok = [response is not None and response.status_code == 200 for _, _, response, _ in fetched]
+            pages = [(response.content, response.encoding) for (_, _, response, _), good in zip(fetched, ok) if good]
+            futures = iter(pool.submit(pages, self.scraper.link_fallback, self.source) if pages else [])
+            for (query, role, response, request), good in zip(fetched, ok):
+                self.ahead[(query, role)] = (response, request, next(futures) if good else None)
+
+    def take_ahead(self, query, role):
+        """A query is starting: its first page if it was fetched ahead (queries planned before it are dropped)"""
+        if (query, role) in self.upcoming:
+            while self.upcoming.popleft() != (query, role):
+                pass
+        return self.ahead.pop((query, role), None)
+
+    def parse(self, html, role, request=None):
+        """Stage 2: job records for every valid card on a page (parse time and cards go in its metrics entry)"""
+        scraper = self.scraper
+        started = time.perf_counter()
+        kind, cards = self.source.cards(html, scraper.parser, scraper.link_fallback)
+        seconds = time.perf_counter() - started
+        self.timings.add("parse", seconds, role, len(cards))
+        self.source_counts[kind] = self.source_counts.get(kind, 0) + 1
+        if request is not None:
+            request.update(parse_ms=round(seconds * 1000, 2), cards=len(cards))
+        return self.build_records(cards, role)
+
+    def build_records(self, cards, role):
+        """Stage 3: normalized job records from cards"""
+        started = time.perf_counter()
+        jobs = []
+        for card in cards:
+            job = self.scraper.extract_job_data(normalize_job(card), role)
+            if job:
+                jobs.append(normalize_posting(job))
+        self.timings.add("normalize", time.perf_counter() - started, role, len(jobs))
+        return jobs
+
+    def parsed_pages(self, query, role, max_pages, start_page=1):
+        """Yield (page, jobs, metrics entry), parsing in the process pool when there is one"""
+        if not self.parse_pool:
+            for page, response, request in self.fetch_pages(query, max_pages, start_page, role):
+                yield page, self.parse(response.text, role, request), request
+            return
+
+        ahead = self.take_ahead(query, role) if start_page == 1 else None
+        for page in range(start_page, max_pages + 1):
+            response, request, future = ahead or self.submit_page(query, page, role)
+            ahead = None
+            # While this page parses, fetch the next queries' first pages
+            self.fetch_ahead()
+            if not self.usable(response, query, page):
+                return
+            kind, cards, seconds = future.result()
+            self.timings.add("parse", seconds, role, len(cards))
+            self.source_counts[kind] = self.source_counts.get(kind, 0) + 1
+            request.update(parse_ms=round(seconds * 1000, 2), cards=len(cards))
+            yield page, self.build_records(cards, role), request
+
+    def scrape_query(self, query, role=None, seen=None, max_pages=3, start_page=1, on_page=None):
+        """Yield new postings for one query, page by page
+
+        With a SeenPostings index, duplicates are dropped and pagination stops
+        at the first page that yields nothing new. on_page(page, new_jobs) runs
+        before a page's postings are yielded (used for checkpointing).
+        """
+        role = role or query
+        detail_fetcher = getattr(self.scraper, "detail_fetcher", None)
+
+        for page, jobs, request in self.parsed_pages(query, role, max_pages, start_page):
+            if not jobs:
+                request["new_postings"] = 0
+                print(f"No more jobs found for '{query}' on page {page}")
+                break
+
+            started = time.perf_counter()
+            new_jobs = seen.filter_new(jobs) if seen is not None else jobs
+            self.timings.add("dedupe", time.perf_counter() - started, role, len(jobs))
+            request["new_postings"] = len(new_jobs)
+            if new_jobs and detail_fetcher:
+                started = time.perf_counter()
+                detail_fetcher.enrich(new_jobs)
+                self.timings.add("details", time.perf_counter() - started, role, len(new_jobs))
+            if on_page:
+                on_page(page, new_jobs)
+            yield from new_jobs
+
+            if not new_jobs:
+                print(f"All {len(jobs)} jobs on page {page} already seen, stopping '{query}'")
+                break
+            print(f"Found {len(new_jobs)} jobs on page {page}")
+
+    def scrape_roles(self, roles, max_pages=3, seen=None):
+        """Yield new postings for every role, de-duplicated across roles"""
+        seen = SeenPostings() if seen is None else seen
+        self.plan([(role, role) for role in roles])
+        for role in roles:
+            print(f"\n=== Scraping {role.upper()} positions ===")
+            count = 0
+            for job in self.scrape_query(role, role, seen, max_pages):
+                count += 1
+                yield job
+            print(f"Found {count} {role} positions")
+
+
+def drain(jobs, sinks, timings=None):
+    """Stream postings into every sink, then close them; returns the count"""
+    count = 0
+    try:
+        for job in jobs:
+            started = time.perf_counter()
+            job["content_hash"] = content_hash(job)
+            for sink in sinks:
+                sink.write(job)
+            if timings:
+                timings.add("write", time.perf_counter() - started, job.get("role"))
+            count += 1
+    except BaseException:
+        for sink in sinks:
+            try:
+                sink.abort()
+            except Exception as e:
+                print(f"⚠️ Could not abort {sink.__class__.__name__}: {e}")
+        raise
+    # Every sink gets closed (published) even if another one fails; the first failure is raised after
+    started = time.perf_counter()
+    errors = []
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            print(f"❌ Could not close {sink.__class__.__name__}: {e}")
+            errors.append(e)
+    if timings:
+        timings.add("write", time.perf_counter() - started, count=0)
+    if errors:
+        raise errors[0]
+    return count
+
+
+def snapshot_diff_file(filename):
+    """Where a snapshot's change file lives: edjoin_jobs.json -> edjoin_jobs.diff.json"""
+    return f"{os.path.splitext(filename)[0]}.diff.json"
+
+
+def load_snapshot_index(filename):
+    """The published snapshot as {posting_key: job}, empty if there is none"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    index = {}
+    for job in jobs:
+        index.setdefault(posting_key(job), job)
+    return index
+
+
+class JsonSnapshotSink:
+    """Streams a JSON array to <filename>.partial and publishes it atomically on close
+
+    Output matches json.dump(jobs, f, indent=2). An empty run never replaces
+    the published snapshot. With diff=True each published snapshot comes with
+    <name>.diff.json: the postings added, changed (content_hash differs) and
+    removed since the snapshot it replaced. With meta=True it also comes with
+    <name>.meta.json (see snapshot_meta).
+    """
+
+    def __init__(self, filename="edjoin_jobs.json", buffer_size=None, diff=True, meta=True):
+        self.filename = filename
+        self.meta = meta
+        self.started_at = datetime.now()
+        self.partial_file = f"{filename}.partial"
+        self.diff_file = snapshot_diff_file(filename) if diff else None
+        self.buffer_size = buffer_size or ADVANCED_CONFIG.get("sink_buffer_size", 50)
+        self.buffer = []
+        self.count = 0
+        self.role_counts = {}
+        self.source_counts = {}  # live, selenium, demo
+        self.last_update = None
+        self.samples = []  # first few postings, for the run summary
+        self._file = None
+        self.previous = load_snapshot_index(filename) if diff else {}
+        self.current = set()
+        self.added = []
+        self.changed = []
+
+    def write(self, job):
+        self.buffer.append(job)
+        self.count += 1
+        if self.diff_file:
+            self.track_change(job)
+        role = job.get("role", "Unknown")
+        self.role_counts[role] = self.role_counts.get(role, 0) + 1
+        source = job.get("source", "live")
+        self.source_counts[source] = self.source_counts.get(source, 0) + 1
+        if job.get("scraped_at") and (self.last_update is None or job["scraped_at"] > self.last_update):
+            self.last_update = job["scraped_at"]
+        if len(self.samples) < 5:
+            self.samples.append(job)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self._file is None:
+            self._file = open(self.partial_file, 'w', encoding='utf-8')
+            self._file.write("[\n")
+        else:
+            self._file.write(",\n")
+        items = [textwrap.indent(json.dumps(job, indent=2, ensure_ascii=False), "  ") for job in self.buffer]
+        self._file.write(",\n".join(items))
+        self._file.flush()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self._file is None:
+            print(f"⚠️ No postings streamed, keeping the existing {self.filename}")
+            return
+        self._file.write("\n]")
+        self._file.close()
+        self._file = None
+        os.replace(self.partial_file, self.filename)
+        print(f"Saved {self.count} jobs to {self.filename}")
+        if self.diff_file:
+            self.write_diff()
+        if self.meta:
+            meta = build_meta(self.filename, self.count, self.role_counts, self.source_counts, self.started_at,
+                              self.last_update)
+            write_meta(self.filename, meta)
+            print(f"Published generation {meta['generation']} ({meta_file(self.filename)})")
+
+    def track_change(self, job):
+        """Sort a posting into added or changed against the previous snapshot"""
+        key = posting_key(job)
+        if key in self.current:
+            return
+        self.current.add(key)
+        previous = self.previous.get(key)
+        if previous is None:
+            self.added.append(job)
+        elif (previous.get("content_hash") or content_hash(previous)) != (job.get("content_hash") or content_hash(job)):
+            self.changed.append(job)
+
+    def write_diff(self):
+        """Publish what this run added, changed and removed relative to the previous snapshot"""
+        removed = [job for key, job in self.previous.items() if key not in self.current]
+        diff = {
+            "generated_at": datetime.now().isoformat(),
+            "snapshot": self.filename,
+            "previous_count": len(self.previous),
+            "count": len(self.current),
+            "unchanged": len(self.current) - len(self.added) - len(self.changed),
+            "added": self.added,
+            "changed": self.changed,
+            "removed": removed
+        }
+        with open(f"{self.diff_file}.partial", 'w', encoding='utf-8') as f:
+            json.dump(diff, f, indent=2, ensure_ascii=False)
+        os.replace(f"{self.diff_file}.partial", self.diff_file)
+        print(f"Changes since the last snapshot: {len(self.added)} added, {len(self.changed)} changed, "
+              f"{len(removed)} removed ({self.diff_file})")
+
+    def abort(self):
+        """Keep what was streamed in the .partial file, leave the snapshot untouched"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"⚠️ Run aborted, {self.count} streamed postings left in {self.partial_file}")
+
+
+class SQLiteSink:
+    """Upserts postings into a SQLite table in batches"""
+
+    def __init__(self, db_path=None, buffer_size=None):
+        self.db_path = db_path or ADVANCED_CONFIG.get("sqlite_db", "edjoin_jobs.db")
+        self.buffer_size = buffer_size or ADVANCED_CONFIG.get("sink_buffer_size", 50)
+        self.buffer = []
+        self.count = 0
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                posting_key TEXT PRIMARY KEY,
+                role TEXT,
+                title TEXT,
+                url TEXT,
+                location TEXT,
+                district TEXT,
+                date_posted TEXT,
+                scraped_at TEXT,
+                data TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def write(self, job):
+        self.buffer.append((
+            posting_key(job),
+            job.get("role", ""),
+            job.get("title", ""),
+            job.get("url", ""),
+            job.get("location", ""),
+            job.get("district", ""),
+            job.get("date_posted", ""),
+            job.get("scraped_at", ""),
+            json.dumps(job, ensure_ascii=False)
+        ))
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self.buffer
+        )
+        self.conn.commit()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+        print(f"Saved {self.count} jobs to {self.db_path}")
+
+    def abort(self):
+        self.close()
+
+
+class GoogleSheetsSink:
+    """Replaces the Google Sheet contents, appending rows in batches
+
+    Rows go to a staging worksheet that replaces the live one (first in the
+    spreadsheet) on close, so readers never see a half-written sheet. An
+    aborted or empty run drops the staging worksheet and leaves the live one.
+    """
+
+    def __init__(self, sheet_name=GOOGLE_SHEET_NAME, service_account_file=SERVICE_ACCOUNT_FILE, buffer_size=None):
+        self.sheet_name = sheet_name
+        self.service_account_file = service_account_file
+        self.buffer_size = buffer_size or ADVANCED_CONFIG.get("sink_buffer_size", 50)
+        self.buffer = []
+        self.count = 0
+        self.spreadsheet = None
+        self.sheet = None  # the staging worksheet
+        self.ok = True
+
+    def open_spreadsheet(self):
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_file(self.service_account_file)
+        client = gspread.authorize(creds)
+
+        # Try to open existing sheet or create new one
+        try:
+            return client.open(self.sheet_name)
+        except gspread.SpreadsheetNotFound:
+            print(f"Creating new Google Sheet: {self.sheet_name}")
+            return client.create(self.sheet_name)
+
+    def open_sheet(self):
+        try:
+            if self.spreadsheet is None:
+                if not os.path.exists(self.service_account_file):
+                    print(f"Service account file {self.service_account_file} not found. Please add your Google service account credentials.")
+                    self.ok = False
+                    return
+                self.spreadsheet = self.open_spreadsheet()
+
+            # Headers, then the run's rows, in a worksheet of their own
+            self.sheet = self.spreadsheet.add_worksheet(title=f"Staging {datetime.now():%Y-%m-%d %H%M%S}",
+                                                        rows=1, cols=len(SHEET_HEADERS))
+            self.sheet.append_row(SHEET_HEADERS)
+        except Exception as e:
+            print(f"Error uploading to Google Sheets: {e}")
+            self.ok = False
+
+    def write(self, job):
+        if not self.ok:
+            return
+        self.buffer.append([
+            job.get("role", ""),
+            job.get("title", ""),
+            job.get("location", ""),
+            job.get("district", ""),
+            job.get("date_posted", ""),
+            job.get("url", ""),
+            job.get("scraped_at", "")
+        ])
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.ok or not self.buffer:
+            return
+        if self.sheet is None:
+            self.open_sheet()
+            if not self.ok:
+                return
+        try:
+            self.sheet.append_rows(self.buffer)
+            self.buffer = []
+        except Exception as e:
+            print(f"Error uploading to Google Sheets: {e}")
+            self.ok = False
+
+    def close(self):
+        self.flush()
+        if not self.ok or not self.count:
+            self.drop_staging()
+            return
+        live = self.spreadsheet.get_worksheet(0)
+        self.sheet.update_index(0)
+        self.spreadsheet.del_worksheet(live)
+        self.sheet.update_title(live.title)
+        self.sheet = None
+        print(f"✅ Uploaded {self.count} jobs to Google Sheet: {self.sheet_name}")
+
+    def abort(self):
+        """Discard the run's rows; the live worksheet is left as it was"""
+        self.buffer = []
+        self.drop_staging()
+
+    def drop_staging(self):
+        if self.sheet is not None:
+            self.spreadsheet.del_worksheet(self.sheet)
+            self.sheet = None
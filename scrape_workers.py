@@ -0,0 +1,220 @@
+"""
+Distributed Scrape
+Splits a refresh into search page and posting detail tasks on a WorkQueue.
+Worker processes on this machine (the coordinator's, or more started with
+--worker against the same queue file) lease and complete tasks; the
+coordinator seeds the queue and assembles the snapshot from the results.
+The queue is a SQLite file in WAL mode, so every worker must run on the host
+that holds it - not on other machines through a network filesystem.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from datetime import datetime
+
+from posting_details import PostingDetailFetcher
+from posting_index import SeenPostings, posting_id
+from production_scraper import ProductionEdJoinScraper
+from refresh_jobs import RefreshLock
+from scrape_pipeline import JsonSnapshotSink, drain
+from scraper_config import ADVANCED_CONFIG, SCRAPING_CONFIG
+from work_queue import WorkQueue
+
+
+def search_key(query, page):
+    return f"{query}|{page}"
+
+
+def search_task(query, role, page, max_pages):
+    return {"query": query, "role": role, "page": page, "max_pages": max_pages}
+
+
+class ScrapeWorker:
+    """Leases tasks of one run until none are pending or leased
+
+    A search task fetches and parses one results page, queues the next page
+    while pages keep returning postings, and queues a detail task for every
+    posting whose detail page is not cached. A detail task fetches one
+    posting page. Errors release the task for another attempt.
+    """
+
+    def __init__(self, queue, run_id, scraper, worker_id=None, poll_seconds=1.0):
+        self.queue = queue
+        self.run_id = run_id
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{os.uname().nodename}-{os.getpid()}"
+        self.poll_seconds = poll_seconds
+        self.handlers = {"search": self.search, "detail": self.detail}
+
+    def run(self):
+        """Work until the run is drained; returns the number of tasks completed"""
+        completed = 0
+        while True:
+            task = self.queue.lease(self.run_id, self.worker_id)
+            if task is None:
+                if self.queue.is_drained(self.run_id):
+                    return completed
+                time.sleep(self.poll_seconds)  # other workers hold the remaining leases
+                continue
+            try:
+                result = self.handlers[task["kind"]](task["payload"])
+            except Exception as e:
+                print(f"⚠️ {self.worker_id}: {task['kind']} {task['key']} failed "
+                      f"(attempt {task['attempts']}): {e}")
+                self.queue.fail(task, self.worker_id, e)
+                continue
+            if self.queue.complete(task, self.worker_id, result):
+                completed += 1
+
+    def search(self, payload):
+        scraper = self.scraper
+        pipeline = scraper.pipeline
+        query, role, page = payload["query"], payload["role"], payload["page"]
+        print(f"{self.worker_id}: scraping '{query}' - page {page}...")
+
+        time.sleep(random.uniform(*scraper.request_delay))
+        started = time.perf_counter()
+        response = pipeline.source.fetch(scraper.session, scraper.search_url, query, page, pipeline.timeout)
+        pipeline.timings.add("fetch", time.perf_counter() - started, role)
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}")
+        jobs = pipeline.parse(response.text, role)
+
+        if jobs and page < payload["max_pages"]:
+            self.queue.enqueue(self.run_id, "search", search_key(query, page + 1),
+                               search_task(query, role, page + 1, payload["max_pages"]))
+        fetcher = getattr(scraper, "detail_fetcher", None)
+        if fetcher and fetcher.enabled_fields():
+            for job in jobs:
+                if fetcher.needs_fetch(job):
+                    self.queue.enqueue(self.run_id, "detail", posting_id(job["url"]), job)
+        return jobs
+
+    def detail(self, job):
+        fetcher = self.scraper.detail_fetcher
+        return fetcher.stamp(fetcher.fetch_detail(job), job)
+
+
+def default_scraper():
+    return ProductionEdJoinScraper()
+
+
+def worker_process(db_path, run_id, scraper_factory=default_scraper, worker_id=None):
+    """Entry point of a worker process"""
+    queue = WorkQueue(db_path)
+    try:
+        completed = ScrapeWorker(queue, run_id, scraper_factory(), worker_id).run()
+        print(f"✅ {worker_id or 'worker'} completed {completed} tasks")
+    finally:
+        queue.close()
+
+
+def seed(queue, run_id, role_queries, max_pages):
+    """First results page of every query ({role: [queries]}); later pages are queued by the workers"""
+    for role, queries in role_queries.items():
+        for query in queries:
+            queue.enqueue(run_id, "search", search_key(query, 1), search_task(query, role, 1, max_pages))
+
+
+def assemble(queue, run_id, role_queries, detail_fetcher=None):
+    """Postings in role, query then page order, each once, with fetched details applied"""
+    pages = {}
+    for _, payload, jobs in queue.results(run_id, "search"):
+        pages[(payload["query"], payload["page"])] = jobs
+
+    seen = SeenPostings()
+    postings = []
+    for queries in role_queries.values():
+        for query in queries:
+            page = 1
+            while (query, page) in pages:
+                postings.extend(seen.filter_new(pages[(query, page)]))
+                page += 1
+
+    if detail_fetcher:
+        details = queue.results(run_id, "detail")
+        for job_id, _, detail in details:
+            detail_fetcher.cache[job_id] = detail
+        if details:
+            detail_fetcher.save_cache()
+        detail_fetcher.apply_cached(postings)
+    return postings
+
+
+def run_distributed_scrape(roles=None, max_pages=3, workers=None, run_id=None, queue_path=None,
+                           scraper_factory=default_scraper, detail_fetcher=None, sinks=None):
+    """Seed a run, wait for the workers to drain it, and publish the snapshot
+
+    Rerunning with the same run_id resumes: tasks already done are kept.
+    """
+    roles = roles or SCRAPING_CONFIG["target_roles"]
+    workers = ADVANCED_CONFIG.get("scrape_workers", 2) if workers is None else workers
+    run_id = run_id or datetime.now().strftime("run-%Y%m%d-%H%M%S")
+    scraper = scraper_factory()
+    role_queries = {role: scraper.role_queries(role) for role in roles}
+    queue = WorkQueue(queue_path)
+    try:
+        seed(queue, run_id, role_queries, max_pages)
+        print(f"🗂️ Run {run_id}: {workers} workers on {queue.db_path}")
+
+        processes = [multiprocessing.Process(target=worker_process,
+                                             args=(queue.db_path, run_id, scraper_factory, f"worker-{i + 1}"))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        if not queue.is_drained(run_id):
+            # Workers died mid-task; their leases expire and are finished here
+            print(f"⚠️ Run {run_id} not drained ({queue.counts(run_id)}), finishing in the coordinator")
+            ScrapeWorker(queue, run_id, scraper, "coordinator").run()
+
+        for kind, key, error in queue.failures(run_id):
+            print(f"❌ {kind} {key} gave up: {error}")
+
+        postings = assemble(queue, run_id, role_queries, detail_fetcher or PostingDetailFetcher(None))
+        print(f"Assembled {len(postings)} postings from {queue.counts(run_id)}")
+        drain(postings, [JsonSnapshotSink()] if sinks is None else sinks)
+        return postings
+    finally:
+        queue.close()
+
+
+def main():
+    """Main function"""
+    arg_parser = argparse.ArgumentParser(description="Scrape EdJoin.org with worker processes sharing a task queue")
+    arg_parser.add_argument("--run-id", help="Run to start or resume (default: a new timestamped run)")
+    arg_parser.add_argument("--workers", type=int, help="Worker processes on this machine")
+    arg_parser.add_argument("--max-pages", type=int, default=3, help="Result pages per query")
+    arg_parser.add_argument("--queue", help="Queue database (default: ADVANCED_CONFIG['work_queue_db'])")
+    arg_parser.add_argument("--worker", action="store_true",
+                            help="Only work on an existing run (needs --run-id) from this machine; "
+                                 "the coordinator publishes")
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        if not args.run_id:
+            arg_parser.error("--worker needs --run-id")
+        worker_process(args.queue or ADVANCED_CONFIG.get("work_queue_db", "scrape_queue.db"), args.run_id)
+        return
+
+    # The coordinator publishes the snapshot, so it takes the refresh lock like any other refresh
+    lock = RefreshLock()
+    attached = lock.run_or_attach("distributed")
+    if attached:
+        print(f"✅ Joined the {attached['trigger']} refresh already running")
+        return
+    try:
+        postings = run_distributed_scrape(max_pages=args.max_pages, workers=args.workers, run_id=args.run_id,
+                                          queue_path=args.queue)
+    finally:
+        lock.release()
+    print(f"\n✅ Distributed scrape complete: {len(postings)} postings")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,22 @@ SCRAPING_CONFIG = {
         "superintendent": ["superintendent", "superintendent of schools"]
     },
     
+    # Incremental refresh: stop each query at postings already in the last snapshot
+    "incremental": False,
+    
+    # Adaptive refresh schedule (adaptive_scheduler.py): queries that keep
+    # turning up new postings are refreshed more often, within a daily budget
+    "adaptive_schedule": {
+        "daily_request_budget": 300,   # search page requests per rolling 24 hours
+        "tick_minutes": 15,            # how often the scheduler picks queries to refresh
+        "min_interval_hours": 1,       # never refresh a query sooner than this
+        "max_interval_hours": 48,      # always refresh a query at least this often
+        "min_expected_new": 0.5,       # skip queries expected to yield fewer new postings
+        "full_refresh_hours": 72,      # full scrape, which also drops postings taken down
+        "churn_smoothing": 0.3,        # weight of the latest run in the new-postings rate
+        "max_pages": 3                 # pages per query refresh
+    },
+    
     # Job posting age limit (days) - only scrape recent postings
     "max_age_days": 30,
     
@@ -47,12 +63,76 @@ SCRAPING_CONFIG = {
 
 # Advanced Configuration
 ADVANCED_CONFIG = {
-    # Retry failed requests
+    # Retry failed requests (connection errors, timeouts, 429 and 5xx)
     "max_retries": 3,
     
+    # Exponential backoff with full jitter: uniform(0, min(max, base * 2**attempt)) seconds
+    "retry_backoff_base": 1.0,
+    "retry_backoff_max": 30,
+    
+    # Per-host circuit breaker: stop calling a host after this many consecutive
+    # failures, then probe it again after the cool-down
+    "circuit_failure_threshold": 5,
+    "circuit_reset_seconds": 300,
+    
+    # Connection pooling: hosts kept per session and keep-alive connections per
+    # host (at least detail_workers, so concurrent detail fetches reuse sockets)
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    
+    # Send HTTPS requests over HTTP/2 (needs httpx[http2]; falls back to HTTP/1.1)
+    "http2": False,
+    
     # Request timeout
     "request_timeout": 10,
     
+    # JSON search data endpoint on the job board (e.g. "/Home/LoadJobs"); when set,
+    # it is tried first and HTML search pages are the fallback. Structured data
+    # embedded in search pages (JSON-LD, page state) is always used when present.
+    "search_data_path": None,
+    
+    # HTML parser backend: "selectolax", "lxml", "html.parser" or None (fastest installed)
+    "html_parser": None,
+    
+    # Worker processes for parsing search pages (0 = parse in the scraping process).
+    # Queries' first pages, fetched ahead, go parse_batch_size pages per task
+    "parse_workers": 0,
+    "parse_batch_size": 4,
+    
+    # Postings buffered per sink (JSON snapshot, SQLite, Google Sheets) before a write
+    "sink_buffer_size": 50,
+    
+    # SQLite sink database (production_scraper.py --sqlite)
+    "sqlite_db": "edjoin_jobs.db",
+    
+    # Distributed scrape (scrape_workers.py), all worker processes on one host
+    "work_queue_db": "scrape_queue.db",  # SQLite task queue shared by the workers; keep it on a local disk
+    "scrape_workers": 2,                 # worker processes
+    "task_lease_seconds": 120,           # how long a leased task stays claimed before another worker may take it
+    "task_max_attempts": 3,              # attempts before a task fails
+    
+    # Per-run scrape metrics (scrape_metrics.py): directory and runs kept
+    "metrics_dir": "scrape_metrics",
+    "metrics_keep_runs": 50,
+    
+    # Refresh run ledger (refresh_ledger.py): a finished run is flagged as a
+    # duration regression when it takes over regression_factor times the median
+    # of the last regression_window completed runs (with at least regression_min_runs)
+    "refresh_ledger_db": "refresh_ledger.db",
+    "regression_window": 10,
+    "regression_factor": 1.5,
+    "regression_min_runs": 3,
+    
+    # Script the admin refresh button runs as its own process, so a scrape never
+    # ties up a web worker (None: run it in a thread of the web worker)
+    "admin_refresh_script": "production_scraper.py",
+    
+    # Web worker cold start: importing app.py must stay under this budget
+    # (python -X importtime), and these modules load on first use only
+    "app_import_budget_ms": 300,
+    "lazy_modules": ["requests", "bs4", "selenium", "webdriver_manager", "googleapiclient",
+                     "smtplib", "production_scraper", "candidate_matching"],
+    
     # User agent rotation
     "user_agents": [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -60,6 +140,9 @@ ADVANCED_CONFIG = {
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     ],
     
+    # Concurrent workers for posting detail pages (extract_* features below)
+    "detail_workers": 4,
+    
     # Enable/disable features
     "features": {
         "extract_salary": True,
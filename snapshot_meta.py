@@ -0,0 +1,70 @@
+"""
+Snapshot Metadata
+A small sidecar published next to each job snapshot (edjoin_jobs.meta.json):
+generation, publish time, scrape duration, per-role counts and source mix.
+Readers get refresh status from it without loading the job list.
+"""
+
+import json
+import os
+from datetime import datetime
+
+SOURCES = ["live", "selenium", "demo"]
+
+
+def meta_file(filename):
+    """edjoin_jobs.json -> edjoin_jobs.meta.json"""
+    return f"{os.path.splitext(filename)[0]}.meta.json"
+
+
+def read_meta(filename):
+    """The sidecar of a snapshot, or None"""
+    try:
+        with open(meta_file(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_meta(filename, meta):
+    """Publish a snapshot's sidecar atomically"""
+    path = meta_file(filename)
+    with open(f"{path}.partial", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(f"{path}.partial", path)
+
+
+def build_meta(filename, count, role_counts, source_counts, started_at, last_update=None):
+    """Metadata for a snapshot being published; generation follows the previous sidecar's"""
+    previous = read_meta(filename) or {}
+    published_at = datetime.now()
+    return {
+        "generation": previous.get("generation", 0) + 1,
+        "published_at": published_at.isoformat(),
+        "duration_seconds": round((published_at - started_at).total_seconds(), 1),
+        "last_update": last_update,
+        "total_positions": count,
+        "role_counts": role_counts,
+        "sources": source_counts
+    }
+
+
+def meta_from_jobs(jobs):
+    """Metadata computed from a snapshot that was published without a sidecar"""
+    role_counts = {}
+    source_counts = {}
+    for job in jobs:
+        role = job.get("role", "Unknown")
+        role_counts[role] = role_counts.get(role, 0) + 1
+        source = job.get("source", "live")
+        source_counts[source] = source_counts.get(source, 0) + 1
+    timestamps = [job["scraped_at"] for job in jobs if job.get("scraped_at")]
+    return {
+        "generation": None,
+        "published_at": None,
+        "duration_seconds": None,
+        "last_update": max(timestamps) if timestamps else None,
+        "total_positions": len(jobs),
+        "role_counts": role_counts,
+        "sources": source_counts
+    }
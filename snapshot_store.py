@@ -0,0 +1,100 @@
+"""
+Snapshot Store
+Keeps the published job snapshot and its derived indexes in memory. A
+background thread in each web worker watches the snapshot's metadata sidecar
+(written last on every publish, so its change is the publication signal),
+loads the new generation off the request path and swaps it in atomically.
+"""
+
+import os
+import threading
+
+from snapshot_meta import meta_file, meta_from_jobs, read_meta
+
+
+class Snapshot:
+    """One published generation: jobs plus the indexes built from them (read-only)"""
+
+    def __init__(self, jobs, meta=None, source_key=None):
+        self.jobs = jobs
+        self.meta = meta or meta_from_jobs(jobs)
+        self.source_key = source_key
+        self.jobs_by_role = {}
+        for job in jobs:
+            self.jobs_by_role.setdefault(job.get('role', 'Other'), []).append(job)
+        self.by_role_name = {role.lower(): role_jobs for role, role_jobs in self.jobs_by_role.items()}
+
+    def jobs_for_role(self, role):
+        return self.by_role_name.get(role.lower(), [])
+
+
+def publication_key(filename):
+    """What changes when a snapshot is published: the sidecar, or the snapshot if it has none"""
+    for path in (meta_file(filename), filename):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        return (path, stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+class SnapshotStore:
+    """The current Snapshot of a jobs file, reloaded in the background on publish
+
+    locate() returns the jobs file to watch and read_jobs(path) loads it.
+    Requests only read self.snapshot, which is replaced in a single assignment.
+    """
+
+    def __init__(self, locate, read_jobs, poll_seconds=2.0):
+        self.locate = locate
+        self.read_jobs = read_jobs
+        self.poll_seconds = poll_seconds
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._watcher_pid = None
+        self._stopped = threading.Event()
+
+    def current(self):
+        """The snapshot to serve; the first call in a process loads it and starts the watcher"""
+        if self.snapshot is None or self._watcher_pid != os.getpid():
+            with self._lock:
+                if self.snapshot is None:
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        # Serve nothing until the watcher manages a load
+                        print(f"⚠️ Could not load the job snapshot: {e}")
+                        self.snapshot = Snapshot([])
+                self.start_watcher()
+        return self.snapshot
+
+    def reload(self, force=False):
+        """Load the published snapshot if it changed; True if a new one was swapped in"""
+        filename = self.locate()
+        key = publication_key(filename)
+        if self.snapshot is not None and (key is None or (key == self.snapshot.source_key and not force)):
+            return False  # unchanged, or unpublished (keep serving what we have)
+        jobs = self.read_jobs(filename)
+        meta = read_meta(filename) if key and key[0] != filename else None
+        self.snapshot = Snapshot(jobs, meta, key)
+        return True
+
+    def start_watcher(self):
+        """One watcher thread per process (threads do not survive a gunicorn fork)"""
+        if self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        threading.Thread(target=self.watch, daemon=True, name="snapshot-watcher").start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def watch(self):
+        while not self._stopped.wait(self.poll_seconds):
+            try:
+                if self.reload():
+                    print(f"🔄 Swapped in snapshot generation {self.snapshot.meta.get('generation')} "
+                          f"({len(self.snapshot.jobs)} jobs)")
+            except Exception as e:
+                print(f"⚠️ Snapshot reload failed, still serving the previous one: {e}")
@@ -0,0 +1,211 @@
+"""
+Job Board Source Adapters
+How a search results page is fetched and turned into raw job cards. Structured
+JSON (a search data endpoint or state embedded in the page) is used when the
+site provides it; HTML card parsing is the fallback.
+"""
+
+import json
+import re
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+import requests
+
+from scraper_config import ADVANCED_CONFIG
+
+# Candidate keys for each card field in structured records, tried in order
+RECORD_FIELDS = {
+    "title": ["positionTitle", "title", "jobTitle", "name"],
+    "href": ["url", "href", "link", "postingUrl"],
+    "location": ["city", "location", "jobLocation"],
+    "district": ["districtName", "district", "employer", "hiringOrganization"],
+    "date_posted": ["postingDate", "datePosted", "date_posted", "postedDate"]
+}
+ID_FIELDS = ["postingID", "postingId", "jobID", "jobId"]
+POSTING_PATH = "/Home/DistrictJobPosting/{}"
+
+JSON_LD = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+PAGE_STATE = re.compile(r'window\.__(?:INITIAL_STATE|NEXT_DATA|DATA)__\s*=\s*(\{.*?\})\s*;?\s*</script>', re.S)
+ISO_DATE = re.compile(r"^(\d{4}-\d{2}-\d{2})T")
+
+
+def _text_value(value):
+    """Plain text from a structured value (schema.org objects, lists)"""
+    if isinstance(value, dict):
+        address = value.get("address", value)
+        if isinstance(address, dict) and ("addressLocality" in address or "addressRegion" in address):
+            parts = [address.get("addressLocality"), address.get("addressRegion")]
+            return ", ".join(str(part) for part in parts if part)
+        return _text_value(value.get("name", ""))
+    if isinstance(value, list):
+        return _text_value(value[0]) if value else ""
+    return "" if value is None else str(value)
+
+
+def record_to_card(record):
+    """Map a structured posting record to the raw card shape used by the parsers"""
+    card = {"title": None, "href": "", "location": "", "district": "", "date_posted": ""}
+    for field, keys in RECORD_FIELDS.items():
+        for key in keys:
+            if record.get(key):
+                card[field] = _text_value(record[key])
+                break
+
+    if not card["href"]:
+        for key in ID_FIELDS:
+            if record.get(key):
+                card["href"] = POSTING_PATH.format(record[key])
+                break
+
+    match = ISO_DATE.match(card["date_posted"])
+    if match:
+        card["date_posted"] = match.group(1)
+    return card
+
+
+def is_posting_record(value):
+    """A schema.org JobPosting, or a dict with a title and an ID or link"""
+    if not isinstance(value, dict):
+        return False
+    if value.get("@type") == "JobPosting":
+        return True
+    has_title = any(key in value for key in RECORD_FIELDS["title"][:3])
+    return has_title and any(key in value for key in ID_FIELDS + RECORD_FIELDS["href"])
+
+
+def find_records(data):
+    """The first list of posting records anywhere in a JSON document"""
+    if isinstance(data, list):
+        if data and all(is_posting_record(item) for item in data):
+            return data
+        items = data
+    elif isinstance(data, dict):
+        if data.get("@type") == "JobPosting":
+            return [data]
+        items = data.get("@graph") or list(data.values())
+    else:
+        return None
+
+    for item in items:
+        records = find_records(item)
+        if records:
+            return records
+    return None
+
+
+def embedded_records(html):
+    """Posting records embedded in a page (JSON-LD or a page-state script), or None"""
+    records = []
+    for block in JSON_LD.findall(html):
+        try:
+            records.extend(find_records(json.loads(block)) or [])
+        except ValueError:
+            continue
+    if records:
+        return records
+
+    match = PAGE_STATE.search(html)
+    if match:
+        try:
+            return find_records(json.loads(match.group(1)))
+        except ValueError:
+            return None
+    return None
+
+
+class SourceAdapter(ABC):
+    """A job board: fetch a results page, then turn the response into cards
+
+    cards() returns (kind, cards) where kind is "json" (data endpoint),
+    "embedded" (structured data in the page) or "html" (parsed cards), so runs
+    can report their source mix.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch(self, session, search_url, query, page, timeout):
+        """The response for one results page"""
+
+    @abstractmethod
+    def cards(self, text, parser, link_fallback=True):
+        """(kind, cards) for a fetched results page"""
+
+
+class EdJoinAdapter(SourceAdapter):
+    """EdJoin.org search: data endpoint if configured, else the HTML search page"""
+
+    name = "edjoin"
+
+    def __init__(self, data_path=None):
+        self.data_path = data_path if data_path is not None else ADVANCED_CONFIG.get("search_data_path")
+        self.data_available = None  # unknown until the endpoint has been tried once
+
+    @staticmethod
+    def search_params(query, page):
+        return {
+            "keywords": query,
+            "page": page,
+            "sort": "date"
+        }
+
+    def data_url(self, search_url):
+        origin = urlsplit(search_url)
+        return f"{origin.scheme}://{origin.netloc}{self.data_path}"
+
+    def fetch(self, session, search_url, query, page, timeout):
+        """Try the data endpoint (once per run if it fails), then the HTML page"""
+        params = self.search_params(query, page)
+        if self.data_path and self.data_available is not False:
+            try:
+                response = session.get(self.data_url(search_url), params=params, timeout=timeout)
+            except requests.RequestException as e:
+                problem = e.__class__.__name__  # timeout, connection error, open circuit
+            else:
+                if response.status_code == 200 and self.json_records(response.text) is not None:
+                    self.data_available = True
+                    return response
+                problem = f"HTTP {response.status_code}"
+            if not self.data_available:
+                print(f"⚠️ No search data at {self.data_path} ({problem}), using HTML pages")
+                self.data_available = False
+        return session.get(search_url, params=params, timeout=timeout)
+
+    @staticmethod
+    def json_records(text):
+        """Records from a data endpoint response, or None if it is not one"""
+        if not text.lstrip().startswith(("{", "[")):
+            return None
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        records = find_records(data)
+        if records is not None:
+            return records
+        # A data response with no results
+        if data == [] or (isinstance(data, dict) and any(value == [] for value in data.values())):
+            return []
+        return None
+
+    def cards(self, text, parser, link_fallback=True):
+        records = self.json_records(text)
+        if records is not None:
+            return "json", [record_to_card(record) for record in records]
+        records = embedded_records(text)
+        if records:
+            return "embedded", [record_to_card(record) for record in records]
+        return "html", parser.parse_cards(text, link_fallback)
+
+
+SOURCE_ADAPTERS = {
+    "edjoin": EdJoinAdapter
+}
+
+
+def get_source(name="edjoin", **kwargs):
+    """Source adapter by name"""
+    if name not in SOURCE_ADAPTERS:
+        raise ValueError(f"Unknown source '{name}'. Choose from: {', '.join(SOURCE_ADAPTERS)}")
+    return SOURCE_ADAPTERS[name](**kwargs)
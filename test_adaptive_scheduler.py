@@ -0,0 +1,125 @@
+"""
+Test script for the adaptive refresh scheduler
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import adaptive_scheduler
+from adaptive_scheduler import AdaptiveScheduler, QueryStats, run_full_refresh
+from refresh_jobs import RefreshLock
+from test_production_scraper import make_scraper
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def make_scheduler(tmp, **config):
+    stats = QueryStats(os.path.join(tmp, "query_stats.json"))
+    stats.last_full_refresh = (NOW - timedelta(hours=24)).isoformat()
+    return AdaptiveScheduler(make_scraper(), stats, os.path.join(tmp, "edjoin_jobs.json"), config,
+                             full_refresh=lambda: None, lock=RefreshLock(tmp))
+
+
+def test_busy_queries_are_refreshed_first():
+    """Budget goes to the queries expected to have the most new postings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = make_scheduler(tmp)
+        three_hours_ago = (NOW - timedelta(hours=3)).isoformat()
+        for query, role in scheduler.queries():
+            scheduler.stats.entry(query, role).update(rate=0.01, last_run=three_hours_ago)
+        scheduler.stats.entry("dean", "dean").update(rate=2.0)
+        scheduler.stats.entry("principal", "principal").update(rate=0.5, pages=3.0)
+        scheduler.stats.entry("superintendent", "superintendent").update(rate=1.0, last_run=NOW.isoformat())
+
+        # principal expects more new postings than dean per refresh, but costs three pages
+        assert scheduler.plan(NOW, budget_left=10) == [("dean", "dean"), ("principal", "principal")]
+        assert scheduler.plan(NOW, budget_left=2) == [("dean", "dean")]
+
+        # Quiet queries still run once max_interval_hours have passed
+        later = NOW + timedelta(hours=48)
+        assert len(scheduler.plan(later, budget_left=100)) == len(scheduler.queries())
+    print("✅ High-churn queries refreshed first, quiet ones at the max interval")
+
+
+def test_tick_refreshes_within_budget():
+    """A tick spends at most the daily budget and publishes only new postings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = make_scheduler(tmp, daily_request_budget=4)
+
+        summary = scheduler.tick(NOW)
+        assert summary["requests"] == 4 and summary["budget_left"] == 0
+        assert summary["queries"] == ["director", "director of", "executive director"]  # director took 2 pages
+        with open(scheduler.snapshot_file, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == summary["new_postings"] == 6
+
+        # The same saved page again: nothing new, and no budget left until tomorrow
+        assert scheduler.tick(NOW + timedelta(hours=2))["queries"] == []
+        summary = scheduler.tick(NOW + timedelta(hours=25))
+        assert summary["requests"] == 4 and summary["new_postings"] == 0
+        assert "director" not in summary["queries"]  # it found postings, but none since
+
+        stats = QueryStats(scheduler.stats.path)
+        assert stats.queries["director"]["new_postings"] == 6
+        assert stats.queries["director of"]["rate"] == 0
+    print("✅ Tick stayed within the daily request budget")
+
+
+def test_full_refresh_charges_what_it_spent():
+    """Only a completed full refresh resets its clock; the budget is charged the pages it fetched"""
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        scheduler = make_scheduler(tmp, daily_request_budget=100)
+        scheduler.full_refresh = lambda: results.pop(0)
+        scheduler.stats.last_full_refresh = None
+
+        # 13 queries never refreshed may each walk max_pages (3), not 1 page
+        assert scheduler.full_refresh_cost() == 3 * len(scheduler.queries()) == 39
+        scheduler.config["daily_request_budget"] = 38
+        assert scheduler.tick(NOW)["full_refresh"] is False and results == []
+        scheduler.config["daily_request_budget"] = 100
+
+        results.append({"status": "failed", "error": "HTTP 503", "metrics": {"requests": 5}})
+        summary = scheduler.tick(NOW)
+        assert not summary["full_refresh"] and summary["requests"] == 5
+        assert scheduler.stats.last_full_refresh is None
+
+        results.append({"status": "attached", "metrics": None})
+        summary = scheduler.tick(NOW + timedelta(minutes=15))
+        assert not summary["full_refresh"] and summary["requests"] == 0
+        assert scheduler.stats.last_full_refresh is None
+
+        results.append({"status": "done", "metrics": {"requests": 14}})
+        summary = scheduler.tick(NOW + timedelta(minutes=30))
+        assert summary["full_refresh"] and summary["requests"] == 14 and summary["budget_left"] == 81
+        assert scheduler.stats.last_full_refresh == (NOW + timedelta(minutes=30)).isoformat()
+        assert scheduler.stats.spent(NOW + timedelta(hours=1)) == 19
+
+    # A scraper that cannot even be built fails the refresh, not the tick
+    def broken_scraper():
+        raise OSError("no chromedriver")
+
+    get_scraper = adaptive_scheduler.get_scraper
+    adaptive_scheduler.get_scraper = broken_scraper
+    try:
+        assert run_full_refresh() == {"status": "failed", "error": "no chromedriver", "metrics": None}
+    finally:
+        adaptive_scheduler.get_scraper = get_scraper
+    print("✅ Full refresh charged its real requests, clock reset only when done")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing adaptive refresh scheduler")
+    print("=" * 40)
+
+    test_busy_queries_are_refreshed_first()
+    test_tick_refreshes_within_budget()
+    test_full_refresh_charges_what_it_spent()
+
+    print("\n✅ All adaptive scheduler tests completed!")
+
+
+if __name__ == "__main__":
+    main()
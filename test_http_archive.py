@@ -0,0 +1,178 @@
+"""
+Test script for the HTTP record/replay archive
+Records a scrape against a local stand-in for EdJoin.org, then replays it offline
+"""
+
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.adapters import HTTPAdapter
+
+from http_archive import RecordingSession, ReplayMissError, ReplaySession
+from posting_details import PostingDetailFetcher
+from posting_index import posting_key
+from production_scraper import ProductionEdJoinScraper, run_refresh
+from test_production_scraper import SAVED_PAGE, SAVED_POSTING, read_page
+
+
+class SavedSiteHandler(BaseHTTPRequestHandler):
+    """Every search returns the saved results page, every posting the saved posting page"""
+
+    def do_GET(self):
+        self.server.hits += 1
+        if self.path.startswith("/Home/DistrictJobPosting/"):
+            self.server.detail_hits += 1
+            body = read_page(SAVED_POSTING).encode("utf-8")
+        else:
+            body = read_page(SAVED_PAGE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SavedSiteHandler)
+    server.hits = 0
+    server.detail_hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class StandInAdapter(HTTPAdapter):
+    """Sends requests for EdJoin.org (posting links are always canonical) to the stand-in site"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace("https://www.edjoin.org", self.base_url, 1)
+        return super().send(request, **kwargs)
+
+
+def make_scraper(session, base_url, cache_dir, features=None):
+    scraper = ProductionEdJoinScraper(parser="html.parser", session=session, output_dir=cache_dir)
+    scraper.base_url = base_url
+    scraper.search_url = f"{base_url}/search"
+    scraper.request_delay = (0, 0)
+    scraper.scrape_with_selenium = lambda keyword, max_pages=3: []
+    scraper.detail_fetcher = PostingDetailFetcher(session, cache_file=os.path.join(cache_dir, "details.json"),
+                                                  features=features or {})
+    return scraper
+
+
+def test_replayed_run_matches_recorded_run():
+    """A replayed scrape is offline and returns exactly what was recorded"""
+    server, base_url = start_site()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "http_archive.jsonl.gz")
+        session = RecordingSession(archive)
+        try:
+            recorded_jobs = make_scraper(session, base_url, tmp).run_production_scrape(max_pages=2)
+        finally:
+            session.close()
+            server.shutdown()
+        hits = server.hits
+        assert session.recorded == hits > 0
+
+        for _ in range(2):
+            replay = ReplaySession(archive)
+            scraper = make_scraper(replay, base_url, tmp)
+            assert scraper.offline
+            jobs = scraper.run_production_scrape(max_pages=2)
+            assert [posting_key(job) for job in jobs] == [posting_key(job) for job in recorded_jobs]
+            assert not replay.misses
+        assert server.hits == hits
+
+        # Query parameter order does not matter; unrecorded requests fail fast
+        with replay.get(f"{base_url}/search", params={"sort": "date", "page": 1, "keywords": "dean"}) as response:
+            assert response.status_code == 200 and "job" in response.text
+            assert b"".join(response.iter_content(1024)) == response.content
+        try:
+            replay.get(f"{base_url}/search", params={"keywords": "dean", "page": 9, "sort": "date"})
+            raise AssertionError("unrecorded request was answered")
+        except ReplayMissError:
+            pass
+    print(f"✅ {hits} recorded responses replayed offline")
+
+
+def test_replayed_refresh_leaves_live_state_alone():
+    """Detail pages replay too, and a replayed refresh writes only to its own directory"""
+    server, base_url = start_site()
+    features = {"extract_salary": True}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "http_archive.jsonl.gz")
+        session = RecordingSession(archive)
+        session.mount("https://www.edjoin.org", StandInAdapter(base_url))
+        try:
+            recorded_jobs = make_scraper(session, base_url, tmp, features).run_production_scrape(max_pages=2)
+        finally:
+            session.close()
+            server.shutdown()
+        hits, detail_hits = server.hits, server.detail_hits
+        assert detail_hits > 0
+
+        live_dir = os.path.join(tmp, "live")
+        os.makedirs(live_dir)
+        cwd = os.getcwd()
+        os.chdir(live_dir)
+        try:
+            replay = ReplaySession(archive)
+            try:
+                ProductionEdJoinScraper(session=replay)
+                raise AssertionError("a replaying scraper was built without an output directory")
+            except ValueError:
+                pass
+            scraper = ProductionEdJoinScraper(parser="html.parser", session=replay,
+                                              output_dir=os.path.join(tmp, "replay"))
+            scraper.base_url = base_url
+            scraper.search_url = f"{base_url}/search"
+            scraper.scrape_with_selenium = lambda keyword, max_pages=3: []
+            scraper.detail_fetcher.features = features
+            try:
+                run_refresh(scraper, sqlite=True, trigger="test")
+                raise AssertionError("a replay wrote to the production database")
+            except ValueError:
+                pass
+            result = run_refresh(scraper, trigger="test")
+            scraper.pipeline.close()
+        finally:
+            os.chdir(cwd)
+
+        assert result["status"] == "done" and not result["fallback"]
+        assert result["total"] == len(recorded_jobs)
+        assert not replay.misses
+        assert sum(count for key, count in replay.served.items() if "DistrictJobPosting" in key) == detail_hits
+        assert os.listdir(live_dir) == []
+        output = set(os.listdir(scraper.output_dir))
+        assert {"edjoin_jobs.json", "posting_details.json", "scrape_metrics", "refresh_ledger.db"} <= output
+        assert "refresh.lock" not in os.listdir(os.path.join(scraper.output_dir, "refresh_jobs"))
+        with open(os.path.join(scraper.output_dir, "edjoin_jobs.json"), 'r', encoding='utf-8') as f:
+            assert any(job.get("salary") for job in json.load(f))
+        assert server.hits == hits
+    print(f"✅ {detail_hits} detail pages replayed, output only in the replay directory")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing HTTP record/replay archive")
+    print("=" * 40)
+
+    test_replayed_run_matches_recorded_run()
+    test_replayed_refresh_leaves_live_state_alone()
+
+    print("\n✅ All HTTP archive tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Test script for the shared HTTP client
+Runs ResilientSession against a local stand-in server
+"""
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_client import ACCEPT_ENCODING, CircuitBreaker, CircuitOpenError, ResilientSession, get_circuit
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers with the next status from the server's script, then 200"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        if self.path.endswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", "/search")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        statuses = self.server.statuses
+        status = statuses.pop(0) if statuses else 200
+        self.server.hits += 1
+        self.server.clients.add(self.client_address)
+        body = b"ok" if status == 200 else b"unavailable"
+        self.send_response(status)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(statuses):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    server.statuses = list(statuses)
+    server.hits = 0
+    server.clients = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/search"
+
+
+def make_session(max_retries=3):
+    session = ResilientSession(max_retries=max_retries)
+    session.sleep = lambda seconds: None
+    return session
+
+
+def test_transient_errors_are_retried():
+    """Two 503s followed by a 200 succeed without surfacing the errors"""
+    server, url = start_server([503, 503])
+    try:
+        response = make_session().get(url, timeout=5)
+        assert response.status_code == 200
+        assert server.hits == 3
+        assert response.retries == 2
+        assert not get_circuit(url).is_open()
+    finally:
+        server.shutdown()
+    print("✅ Transient 503s retried")
+
+
+def test_retries_are_bounded():
+    """After max_retries the last error response is returned"""
+    server, url = start_server([500] * 10)
+    try:
+        response = make_session(max_retries=2).get(url, timeout=5)
+        assert response.status_code == 500
+        assert server.hits == 3
+    finally:
+        server.shutdown()
+    print("✅ Retries bounded by max_retries")
+
+
+def test_circuit_opens_after_sustained_failures():
+    """A host that keeps failing is not called again until the cool-down ends"""
+    server, url = start_server([503] * 20)
+    try:
+        session = make_session(max_retries=1)
+        breaker = get_circuit(url)
+        for _ in range(breaker.failure_threshold):
+            try:
+                session.get(url, timeout=5)
+            except CircuitOpenError:
+                break
+        assert breaker.is_open()
+
+        hits = server.hits
+        try:
+            session.get(url, timeout=5)
+            raise AssertionError("request sent through an open circuit")
+        except CircuitOpenError as e:
+            assert isinstance(e, requests.RequestException)
+        assert server.hits == hits
+    finally:
+        server.shutdown()
+    print("✅ Circuit opens and short-circuits requests")
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    """After the cool-down only one of two concurrent requests probes the host"""
+    breaker = CircuitBreaker("probe.example", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.1)
+
+    start = threading.Barrier(2)
+    allowed = []
+
+    def ask():
+        start.wait()
+        allowed.append(breaker.allow_request())
+
+    threads = [threading.Thread(target=ask) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(allowed) == [False, True]
+    assert not breaker.allow_request()
+
+    # A failed probe re-opens the circuit, a good one closes it
+    breaker.record_failure()
+    assert breaker.is_open() and not breaker.allow_request()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.allow_request() and breaker.allow_request()
+    print("✅ Half-open circuit sends a single probe")
+
+
+def test_pooled_connections_and_encodings():
+    """Requests reuse one keep-alive connection and compressed bodies are decoded"""
+    server, url = start_server([])
+    try:
+        session = make_session()
+        responses = [session.get(url, timeout=5) for _ in range(5)]
+        assert [response.text for response in responses] == ["ok"] * 5
+        assert len(server.clients) == 1
+
+        advertised = [encoding.strip() for encoding in ACCEPT_ENCODING.split(",")]
+        assert "gzip" in advertised
+        if "br" in advertised:
+            import brotli  # noqa: F401 - only advertised when it can be decoded
+    finally:
+        server.shutdown()
+    print(f"✅ 5 requests over {len(server.clients)} connection, Accept-Encoding: {ACCEPT_ENCODING}")
+
+
+def test_posts_are_not_retried():
+    """A failed form submission is not sent twice"""
+    server, url = start_server([503, 503])
+    try:
+        response = make_session().post(url, data={"name": "test"}, timeout=5)
+        assert response.status_code == 503
+        assert server.hits == 1
+    finally:
+        server.shutdown()
+    print("✅ POST sent once")
+
+
+def test_http2_adapter():
+    """The httpx adapter survives retries and redirects, streams, and honours verify and proxies"""
+    try:
+        from http_client import HTTP2Adapter
+        adapter = HTTP2Adapter()
+    except ImportError:
+        print("⏭️ httpx[http2] not installed, skipping the HTTP/2 adapter test")
+        return
+
+    server, url = start_server([503, 503])
+    try:
+        session = make_session()
+        session.mount("http://", adapter)  # plain HTTP: httpx speaks HTTP/1.1 to the stand-in server
+        response = session.get(url, timeout=5)
+        assert response.text == "ok" and response.retries == 2 and server.hits == 3
+
+        redirected = session.get(url.replace("/search", "/redirect"), timeout=5)
+        assert redirected.text == "ok" and [r.status_code for r in redirected.history] == [302]
+
+        streamed = session.get(url, timeout=5, stream=True)
+        assert b"".join(streamed.iter_content(1)) == b"ok"
+        streamed.close()
+
+        # The stand-in server also answers as a forward proxy
+        proxied = session.get("http://jobs.invalid/search", timeout=5, verify=False,
+                              proxies={"http": url.replace("/search", "")})
+        assert proxied.text == "ok"
+        assert (False, None, url.replace("/search", "")) in adapter.clients
+        clients = len(adapter.clients)
+    finally:
+        session.close()
+        server.shutdown()
+    print(f"✅ HTTP/2 adapter: retries, redirects, streaming and proxies over {clients} clients")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing shared HTTP client")
+    print("=" * 40)
+
+    test_transient_errors_are_retried()
+    test_retries_are_bounded()
+    test_circuit_opens_after_sustained_failures()
+    test_half_open_circuit_lets_one_probe_through()
+    test_pooled_connections_and_encodings()
+    test_posts_are_not_retried()
+    test_http2_adapter()
+
+    print("\n✅ All HTTP client tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Test script for the web app's import-time budget
+Imports app.py in a fresh interpreter, as a booting gunicorn worker does
+"""
+
+import json
+import subprocess
+import sys
+
+from benchmark_startup import flatten, profile_app_boot, profile_import
+from scraper_config import ADVANCED_CONFIG
+
+LIST_MODULES = "import json, sys, app; print(json.dumps(sorted(sys.modules)))"
+
+
+def test_heavy_modules_load_on_first_use():
+    """Importing the app does not pull in the scraper, Selenium, requests or the Google clients"""
+    result = subprocess.run([sys.executable, "-c", LIST_MODULES], capture_output=True, text=True, check=True)
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout.splitlines()[-1])}
+    eager = sorted(set(ADVANCED_CONFIG["lazy_modules"]) & loaded)
+    assert not eager, f"imported at startup: {eager}"
+    print("✅ Heavy modules are imported on first use")
+
+
+def test_app_import_within_budget():
+    """Importing the app stays under the cold start budget (best of three)"""
+    budget = ADVANCED_CONFIG["app_import_budget_ms"]
+    best = min(profile_import("app")["import_ms"] for _ in range(3))
+    assert best <= budget, f"importing app took {best:.0f} ms, budget {budget} ms"
+    print(f"✅ app imports in {best:.0f} ms (budget {budget} ms)")
+
+
+def test_startup_report():
+    """The startup profile has the import tree and the booted app's first requests"""
+    profile = profile_import("app", min_ms=0)
+    assert profile["tree"]["module"] == "app"
+    assert "flask" in {node["module"] for node in flatten(profile["tree"])}
+    assert len(list(flatten(profile["tree"]))) == profile["modules"]
+    assert profile["wall_ms"] >= profile["import_ms"]
+
+    boot = profile_app_boot()
+    assert [request["status"] for request in boot["requests"]] == [200, 200, 200]
+    assert boot["first_request_ms"] == boot["requests"][0]["ms"]
+    assert set(boot["integrations"]) == {"get_candidate_matcher", "get_google_forms_submitter",
+                                         "get_resume_handler"}
+    print(f"✅ Startup report: {profile['modules']} modules, first request {boot['first_request_ms']:.0f} ms")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing import-time budget")
+    print("=" * 40)
+
+    test_heavy_modules_load_on_first_use()
+    test_app_import_within_budget()
+    test_startup_report()
+
+    print("\n✅ All import budget tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Test script for the job-card parser backends
+Checks every installed backend against the legacy html.parser extraction
+"""
+
+import glob
+
+from job_parsers import BeautifulSoupParser, available_backends, get_parser
+from production_scraper import ProductionEdJoinScraper
+
+SAVED_PAGES = sorted(glob.glob("fixtures/search_pages/*.html"))
+
+
+def load_page(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_backends_match_legacy_extraction():
+    """Every backend returns the same cards as html.parser over the full page"""
+    reference = BeautifulSoupParser("html.parser", strain=False)
+    assert SAVED_PAGES, "No saved search pages found"
+
+    for name in available_backends():
+        parser = get_parser(name)
+        for path in SAVED_PAGES:
+            html = load_page(path)
+            for link_fallback in (True, False):
+                expected = reference.parse_cards(html, link_fallback)
+                assert parser.parse_cards(html, link_fallback) == expected, f"{name} differs on {path}"
+        print(f"✅ {name} matches legacy extraction on {len(SAVED_PAGES)} pages")
+
+
+def test_card_cascade():
+    """Card selectors fall back from job divs to .card to <article>"""
+    parser = get_parser("html.parser")
+
+    cards = parser.parse_cards(load_page("fixtures/search_pages/director_page1.html"))
+    assert len(cards) == 8  # footer .card ignored because job-info cards exist
+    assert cards[0]["title"] == "Director of Special Education"
+    assert cards[-1]["title"] is None
+
+    assert len(parser.parse_cards(load_page("fixtures/search_pages/principal_cards.html"))) == 4
+    assert len(parser.parse_cards(load_page("fixtures/search_pages/dean_articles.html"))) == 4
+    assert parser.parse_cards(load_page("fixtures/search_pages/empty_results.html")) == []
+    print("✅ Card selector cascade works")
+
+
+def test_production_scraper_records():
+    """Parsed cards become the same job records for every backend"""
+    html = load_page("fixtures/search_pages/director_page1.html")
+    records = {}
+
+    for name in available_backends():
+        scraper = ProductionEdJoinScraper(parser=name)
+        jobs = []
+        for card in scraper.parser.parse_cards(html):
+            job = scraper.extract_job_data_requests(card, "director")
+            if job:
+                job.pop("scraped_at")
+                jobs.append(job)
+        records[name] = jobs
+
+    baseline = records["html.parser"]
+    assert len(baseline) == 6  # "Dir." is too short, one card has no title
+    assert baseline[0]["url"] == "https://www.edjoin.org/Home/DistrictJobPosting/1984512"
+    for name, jobs in records.items():
+        assert jobs == baseline, f"{name} produced different job records"
+    print(f"✅ Job records identical across {', '.join(records)}")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing job-card parser backends")
+    print("=" * 40)
+
+    test_backends_match_legacy_extraction()
+    test_card_cascade()
+    test_production_scraper_records()
+
+    print("\n✅ All parser tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Test script for ingest-time posting normalization and de-duplication
+"""
+
+from posting_normalizer import (canonical_city, canonical_district, canonical_url, dedupe_postings,
+                                normalize_posting, role_from_title)
+from test_production_scraper import make_scraper
+
+
+def test_canonical_fields():
+    """URL, district and city variants collapse to one form"""
+    canonical = "https://www.edjoin.org/Home/DistrictJobPosting/1984512"
+    for url in ["/Home/DistrictJobPosting/1984512", "http://edjoin.org/Home/DistrictJobPosting/1984512?src=email",
+                "https://WWW.EDJOIN.ORG/Home/DistrictJobPosting/1984512#apply"]:
+        assert canonical_url(url) == canonical, url
+
+    assert canonical_district("San Juan  UnifiedSchool District") == "San Juan Unified School District"
+    assert canonical_district("Fresno USD") == "Fresno Unified School District"
+    assert canonical_district("KERN HIGH SCHOOL DISTRICT") == "Kern High School District"
+    assert canonical_district("District not specified") == "District not specified"
+
+    for location in ["Fresno, CA", "Fresno, California", "FRESNO, CA 93721", "fresno"]:
+        assert canonical_city(location) == "Fresno, CA", location
+    assert canonical_city("Location not specified") == "Location not specified"
+    print("✅ Canonical URL, district and city")
+
+
+def test_role_from_title():
+    """The most specific role phrase in the title wins over the query role"""
+    assert role_from_title("Associate Director of Student Services", "Director") == "Assistant Director"
+    assert role_from_title("Head of School", "Dean") == "Principal"
+    assert role_from_title("Assistant Dean of Students", "Director") == "Dean"
+    assert role_from_title("Coordinator, Fiscal Services", "Director") == "Director"
+    print("✅ Role assigned from the title")
+
+
+def test_same_posting_is_kept_once():
+    """Variants of one posting found by different queries are one record"""
+    first = normalize_posting({"title": "Associate Director of Student Services", "role": "Director",
+                               "url": "/Home/DistrictJobPosting/1990001", "district": "Fresno USD",
+                               "location": "Fresno, California"})
+    second = normalize_posting({"title": "Associate Director of Student Services", "role": "Assistant Director",
+                                "url": "https://www.edjoin.org/Home/DistrictJobPosting/1990001?ref=search",
+                                "district": "Fresno Unified School District", "location": "FRESNO, CA"})
+    assert first == second
+    assert first["posting_id"] == "1990001" and first["role"] == "Assistant Director"
+    assert dedupe_postings([first, second, dict(first)]) == [first]
+
+    jobs = make_scraper().run_production_scrape(max_pages=3)
+    assert all(job["url"].startswith("https://www.edjoin.org/") for job in jobs)
+    assert all("UnifiedSchool" not in job["district"] for job in jobs)
+    print("✅ Each posting kept once")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing posting normalization")
+    print("=" * 40)
+
+    test_canonical_fields()
+    test_role_from_title()
+    test_same_posting_is_kept_once()
+
+    print("\n✅ All posting normalization tests completed!")
+
+
+if __name__ == "__main__":
+    main()
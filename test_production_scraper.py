@@ -0,0 +1,364 @@
+"""
+Test script for the production scraper's pagination logic
+Runs ProductionEdJoinScraper against saved search pages instead of EdJoin.org
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import production_scraper
+from posting_details import PostingDetailFetcher
+from posting_index import posting_key
+from production_scraper import ProductionEdJoinScraper, RefreshCancelled, run_refresh
+from refresh_jobs import RefreshLock, load_progress
+from refresh_ledger import RefreshLedger
+from scrape_checkpoint import ScrapeCheckpoint
+from snapshot_meta import read_meta
+
+SAVED_PAGE = "fixtures/search_pages/director_page1.html"
+SAVED_POSTING = "fixtures/posting_pages/posting.html"
+
+
+class SavedPageResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.encoding = "utf-8"
+        self.status_code = status_code
+
+
+def read_page(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class SavedPageSession:
+    """Stands in for requests.Session: every search returns the same saved page"""
+
+    def __init__(self, path=SAVED_PAGE):
+        self.html = read_page(path)
+        self.posting_html = read_page(SAVED_POSTING)
+        self.headers = {}
+        self.requests = []
+        self.detail_requests = []
+
+    def get(self, url, params=None, timeout=None):
+        if params is None:
+            self.detail_requests.append(url)
+            return SavedPageResponse(self.posting_html)
+        self.requests.append((params["keywords"], params["page"]))
+        return SavedPageResponse(self.html)
+
+
+def make_scraper(cache_dir=None, features=None):
+    scraper = ProductionEdJoinScraper(parser="html.parser")
+    scraper.request_delay = (0, 0)
+    scraper.session = SavedPageSession()
+    scraper.scrape_with_selenium = lambda keyword, max_pages=3: []
+
+    cache_file = os.path.join(cache_dir or tempfile.mkdtemp(), "posting_details.json")
+    scraper.detail_fetcher = PostingDetailFetcher(scraper.session, cache_file=cache_file,
+                                                  features=features or {})
+    scraper.detail_fetcher.request_delay = (0, 0)
+    return scraper
+
+
+def test_overlapping_queries_stop_early():
+    """Queries that only return already-seen postings cost a single page"""
+    scraper = make_scraper()
+    jobs = scraper.run_production_scrape(max_pages=5)
+
+    keys = [posting_key(job) for job in jobs]
+    assert len(keys) == len(set(keys)) == 6
+    assert all(job["role"] == "Director" for job in jobs)
+
+    # "director" reads page 2 and stops; every other query reads one page
+    queries = sum(len(scraper.role_queries(role)) for role in production_scraper.SCRAPING_CONFIG["target_roles"])
+    assert len(scraper.session.requests) == queries + 1
+    print(f"✅ {queries} queries cost {len(scraper.session.requests)} page fetches")
+
+
+def test_incremental_scrape_stops_at_known_postings():
+    """Incremental runs stop on the first known page and keep known postings"""
+    scraper = make_scraper()
+    first_run = scraper.run_production_scrape(max_pages=5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "edjoin_jobs.json")
+        with open(snapshot, 'w', encoding='utf-8') as f:
+            json.dump(first_run, f)
+
+        scraper.session.requests.clear()
+        jobs = scraper.run_production_scrape(incremental=True, snapshot_file=snapshot, max_pages=5)
+
+    assert ("director", 2) not in scraper.session.requests
+    assert all(page == 1 for _, page in scraper.session.requests)
+    assert sorted(map(posting_key, jobs)) == sorted(map(posting_key, first_run))
+    print(f"✅ Incremental run fetched {len(scraper.session.requests)} pages, kept {len(jobs)} postings")
+
+
+def test_incremental_scrape_drops_expired_postings():
+    """Known postings scraped longer than max_age_days ago are not carried over"""
+    scraper = make_scraper()
+    first_run = scraper.run_production_scrape(max_pages=5)
+    max_age_days = production_scraper.SCRAPING_CONFIG["max_age_days"]
+    expired = dict(first_run[0], url="https://www.edjoin.org/Home/DistrictJobPosting/999999",
+                   scraped_at=(datetime.now() - timedelta(days=max_age_days + 1)).isoformat())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "edjoin_jobs.json")
+        with open(snapshot, 'w', encoding='utf-8') as f:
+            json.dump(first_run + [expired], f)
+        jobs = scraper.run_production_scrape(incremental=True, snapshot_file=snapshot, max_pages=5)
+
+    assert posting_key(expired) not in set(map(posting_key, jobs))
+    assert sorted(map(posting_key, jobs)) == sorted(map(posting_key, first_run))
+    print(f"✅ Incremental run dropped a posting past {max_age_days} days")
+
+
+def test_detail_pages_fetched_once():
+    """Detail pages are fetched for new postings only and cached by posting ID"""
+    features = {"extract_salary": True, "extract_requirements": True}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = make_scraper(tmp, features)
+        jobs = scraper.run_production_scrape(max_pages=2)
+
+        linked = [job for job in jobs if "DistrictJobPosting" in job["url"]]
+        assert len(scraper.session.detail_requests) == len(linked) == 4
+        assert linked[0]["salary"] == "$148,210 - $182,044 Annually"
+        assert len(linked[0]["requirements"]) == 3
+        assert "description" not in linked[0]
+
+        # A later run with unchanged postings reuses the cache
+        scraper = make_scraper(tmp, features)
+        jobs = scraper.run_production_scrape(max_pages=2)
+        assert scraper.session.detail_requests == []
+        assert all("salary" in job for job in jobs if "DistrictJobPosting" in job["url"])
+    print("✅ Detail pages fetched once and cached")
+
+
+def on_day(day):
+    """A datetime whose now() is the given day, to stand in for production_scraper.datetime"""
+    class FixedDay(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(day.year, day.month, day.day, 9, 0)
+    return FixedDay
+
+
+def test_dateless_postings_not_refetched_next_day():
+    """A card without a date keeps the same fingerprint from one day to the next"""
+    features = {"extract_salary": True}
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            production_scraper.datetime = on_day(datetime(2026, 3, 2))
+            first = make_scraper(tmp, features).run_production_scrape(max_pages=2)
+            production_scraper.datetime = on_day(datetime(2026, 3, 3))
+            scraper = make_scraper(tmp, features)
+            second = scraper.run_production_scrape(max_pages=2)
+        finally:
+            production_scraper.datetime = datetime
+
+    assert not any(scraper.detail_fetcher.needs_fetch(job) for job in second)
+    assert scraper.session.detail_requests == []
+    dateless = [job for job in second if not job["date_posted"] and "DistrictJobPosting" in job["url"]]
+    assert dateless
+    assert [job["date_posted"] for job in first] == [job["date_posted"] for job in second]
+    print(f"✅ {len(dateless)} dateless postings were not fetched again the next day")
+
+
+class ScraperKilled(BaseException):
+    """Simulates the subprocess timeout killing the scraper mid-run"""
+
+
+def test_checkpoint_resumes_interrupted_run():
+    """A killed run resumes after its last completed page with the same results"""
+    uninterrupted = make_scraper().run_production_scrape(max_pages=5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_file = os.path.join(tmp, "scrape_checkpoint.json")
+        scraper = make_scraper(tmp)
+        session_get = scraper.session.get
+
+        def get_until_killed(url, params=None, timeout=None):
+            if len(scraper.session.requests) == 3:
+                raise ScraperKilled()
+            return session_get(url, params=params, timeout=timeout)
+
+        scraper.session.get = get_until_killed
+        try:
+            scraper.run_production_scrape(max_pages=5, checkpoint=ScrapeCheckpoint(checkpoint_file))
+            raise AssertionError("scraper was not interrupted")
+        except ScraperKilled:
+            pass
+        done = list(scraper.session.requests)
+        assert done == [("director", 1), ("director", 2), ("director of", 1)]
+
+        scraper = make_scraper(tmp)
+        checkpoint = ScrapeCheckpoint(checkpoint_file)
+        jobs = scraper.run_production_scrape(max_pages=5, checkpoint=checkpoint)
+
+        assert scraper.session.requests[0] == ("executive director", 1)
+        assert not set(done) & set(scraper.session.requests)
+        assert sorted(map(posting_key, jobs)) == sorted(map(posting_key, uninterrupted))
+
+        checkpoint.complete()
+        assert not os.path.exists(checkpoint_file)
+    print("✅ Interrupted run resumed from its checkpoint")
+
+
+def test_incremental_resume_keeps_snapshot_seed():
+    """An incremental run killed before its first page still stops at known postings when resumed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "edjoin_jobs.json")
+        with open(snapshot, 'w', encoding='utf-8') as f:
+            json.dump(make_scraper().run_production_scrape(max_pages=5), f)
+        checkpoint_file = os.path.join(tmp, "scrape_checkpoint.json")
+
+        scraper = make_scraper(tmp)
+
+        def killed(url, params=None, timeout=None):
+            raise ScraperKilled()
+
+        scraper.session.get = killed
+        try:
+            scraper.run_production_scrape(incremental=True, snapshot_file=snapshot, max_pages=5,
+                                          checkpoint=ScrapeCheckpoint(checkpoint_file))
+            raise AssertionError("scraper was not interrupted")
+        except ScraperKilled:
+            pass
+
+        scraper = make_scraper(tmp)
+        scraper.run_production_scrape(incremental=True, snapshot_file=snapshot, max_pages=5,
+                                      checkpoint=ScrapeCheckpoint(checkpoint_file))
+    assert all(page == 1 for _, page in scraper.session.requests)
+    print(f"✅ Resumed incremental run fetched {len(scraper.session.requests)} pages")
+
+
+def test_run_refresh_in_process():
+    """run_refresh publishes with a warm scraper, and a cancelled run publishes nothing"""
+    scraper = make_scraper(features={"extract_salary": True})
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            result = run_refresh(scraper, trigger="test")
+            assert result["status"] == "done" and result["total"] > 0
+            assert read_meta("edjoin_jobs.json")["total_positions"] == result["total"]
+            detail_requests = len(scraper.session.detail_requests)
+            assert detail_requests
+
+            # Cancelled before its first page: the snapshot and lock are left as they were
+            cancel = threading.Event()
+            cancel.set()
+            try:
+                run_refresh(scraper, trigger="test", cancel=cancel)
+                raise AssertionError("refresh was not cancelled")
+            except RefreshCancelled:
+                pass
+            assert read_meta("edjoin_jobs.json")["generation"] == 1
+            assert RefreshLock().holder() is None
+
+            # The same scraper again: posting details come from its warm cache
+            again = run_refresh(scraper, trigger="test")
+            assert again["total"] == result["total"]
+            assert len(scraper.session.detail_requests) == detail_requests
+            job_ids = [name[:-5] for name in os.listdir("refresh_jobs") if name.endswith(".json")]
+            statuses = sorted(load_progress(job_id)["status"] for job_id in job_ids)
+            assert statuses == ["done", "done", "failed"]
+            runs = RefreshLedger().runs()
+            assert [run["status"] for run in runs] == ["done", "cancelled", "done"]
+            assert runs[0]["role_counts"] == result["role_counts"] and not runs[0]["fallback"]
+        finally:
+            os.chdir(cwd)
+    print(f"✅ In-process refresh published {result['total']} positions and could be cancelled")
+
+
+class LockedLedger(RefreshLedger):
+    """A ledger whose database is locked by the time a run finishes"""
+
+    def finish(self, run_id, status, **outcome):
+        raise sqlite3.OperationalError("database is locked")
+
+
+class ReadOnlyLedger(RefreshLedger):
+    """A ledger that cannot record a run starting"""
+
+    def start(self, job_id, trigger):
+        raise sqlite3.OperationalError("attempt to write a readonly database")
+
+    def finish(self, run_id, status, **outcome):
+        raise AssertionError("finished a run that was never started")
+
+
+def test_run_refresh_ledger_handling():
+    """run_refresh closes the ledger it opens, and ledger errors never replace the refresh's outcome"""
+    scraper = make_scraper()
+    cwd = os.getcwd()
+    open_ledger = production_scraper.open_ledger
+    opened = []
+
+    def tracked_ledger(db_path=None):
+        opened.append(open_ledger(db_path))
+        return opened[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        production_scraper.open_ledger = tracked_ledger
+        try:
+            assert run_refresh(scraper, trigger="test")["status"] == "done"
+            assert len(opened) == 1
+            try:
+                opened[0].conn.execute("SELECT 1")
+                raise AssertionError("the ledger run_refresh opened was left open")
+            except sqlite3.ProgrammingError:
+                pass
+
+            # A caller's ledger is left open; its errors are reported, not raised
+            ledger = LockedLedger()
+            assert run_refresh(scraper, trigger="test", ledger=ledger)["status"] == "done"
+            cancel = threading.Event()
+            cancel.set()
+            try:
+                run_refresh(scraper, trigger="test", cancel=cancel, ledger=ledger)
+                raise AssertionError("refresh was not cancelled")
+            except RefreshCancelled:
+                pass
+            assert len(opened) == 1
+            assert [run["status"] for run in ledger.runs()] == ["running", "running", "done"]  # never finished
+            ledger.close()
+
+            ledger = ReadOnlyLedger()
+            assert run_refresh(scraper, trigger="test", ledger=ledger)["status"] == "done"
+            ledger.close()
+        finally:
+            production_scraper.open_ledger = open_ledger
+            os.chdir(cwd)
+    print("✅ Refresh ledger closed after use, its errors never hide the refresh's")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing production scraper pagination")
+    print("=" * 40)
+
+    test_overlapping_queries_stop_early()
+    test_incremental_scrape_stops_at_known_postings()
+    test_incremental_scrape_drops_expired_postings()
+    test_detail_pages_fetched_once()
+    test_dateless_postings_not_refetched_next_day()
+    test_checkpoint_resumes_interrupted_run()
+    test_incremental_resume_keeps_snapshot_seed()
+    test_run_refresh_in_process()
+    test_run_refresh_ledger_handling()
+
+    print("\n✅ All production scraper tests completed!")
+
+
+if __name__ == "__main__":
+    main()
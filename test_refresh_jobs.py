@@ -0,0 +1,140 @@
+"""
+Test script for background job refreshes and their progress
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from refresh_jobs import RefreshLock, RefreshProgress, load_progress, submit_refresh
+from test_production_scraper import make_scraper
+
+# Stands in for production_scraper.py: reports a two-role run, slowly
+STUB_SCRAPER = """
+import sys, time
+sys.path.insert(0, {repo!r})
+from refresh_jobs import RefreshProgress
+
+progress = RefreshProgress(sys.argv[sys.argv.index("--progress") + 1])
+progress.begin(["dean", "principal"], max_pages=2)
+for role in ["dean", "principal"]:
+    progress.begin_role(role)
+    time.sleep(0.3)
+    progress.page_done(3)
+    progress.role_done()
+progress.finish(6)
+"""
+
+
+def test_scrape_reports_progress():
+    """Every page and role of a scrape is counted in the progress file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        progress = RefreshProgress(os.path.join(tmp, "abc123.json"))
+        jobs = make_scraper().run_production_scrape(max_pages=3)
+        list(make_scraper().iter_production_scrape(max_pages=3, progress=progress))
+        progress.finish(len(jobs))
+
+        state = load_progress("abc123", tmp)
+        assert state["status"] == "done" and state["job_id"] == "abc123"
+        assert state["roles_done"] == state["roles_total"] == 5
+        assert state["pages_done"] >= 5
+        assert state["postings_found"] == len(jobs)
+        assert state["eta_seconds"] is None
+    print(f"✅ Progress counted {state['pages_done']} pages over {state['roles_total']} roles")
+
+
+def test_refresh_runs_in_the_background():
+    """Submitting returns at once; a second submit joins the running refresh"""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "stub_scraper.py")
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(STUB_SCRAPER.format(repo=os.getcwd()))
+
+        started_at = time.time()
+        job_id, started = submit_refresh(refresh_dir=tmp, script=script)
+        assert started and time.time() - started_at < 0.5
+        assert submit_refresh(refresh_dir=tmp, script=script) == (job_id, False)
+
+        seen_running = False
+        for _ in range(100):
+            state = load_progress(job_id, tmp)
+            if state["status"] == "running" and state["roles_done"] == 1:
+                seen_running = True
+                assert state["eta_seconds"] is not None
+            if state["status"] == "done":
+                break
+            time.sleep(0.05)
+        assert seen_running and state["status"] == "done" and state["postings_found"] == 6
+        assert load_progress("../etc", tmp) is None
+
+        # The previous refresh is finished, so a new one starts
+        next_id, started = submit_refresh(refresh_dir=tmp, script=script)
+        assert started and next_id != job_id
+        while load_progress(next_id, tmp)["status"] != "done":
+            time.sleep(0.05)
+    print("✅ Refresh ran in the background and reported progress")
+
+
+def test_admin_refresh_runs_out_of_process():
+    """The admin button hands the scrape to a separate scraper process"""
+    import app
+    calls = []
+    original = app.submit_refresh
+    app.submit_refresh = lambda **kwargs: calls.append(kwargs) or ("abc123", True)
+    try:
+        client = app.app.test_client()
+        with client.session_transaction() as session:
+            session["admin_logged_in"] = True
+        response = client.post("/admin/refresh-jobs")
+        assert response.status_code == 202 and response.get_json()["job_id"] == "abc123"
+    finally:
+        app.submit_refresh = original
+    script = calls[0]["script"]
+    assert script.endswith("production_scraper.py") and os.path.isfile(script)
+    print("✅ Admin refresh runs production_scraper.py in its own process")
+
+
+def test_concurrent_triggers_share_one_run():
+    """A trigger that arrives mid-run waits for that run instead of starting another"""
+    with tempfile.TemporaryDirectory() as tmp:
+        running = RefreshLock(tmp)
+        assert running.acquire("release", job_id="abc123")
+        RefreshProgress(os.path.join(tmp, "abc123.json")).begin(["dean"], max_pages=1)
+
+        second = RefreshLock(tmp)
+        assert not second.acquire("scheduler")
+        assert second.holder()["trigger"] == "release"
+
+        # The admin button joins the deploy's run rather than spawning a scraper
+        assert submit_refresh(refresh_dir=tmp, script="missing.py") == ("abc123", False)
+
+        threading.Timer(0.3, running.release).start()
+        waiting = RefreshProgress(os.path.join(tmp, "def456.json"))
+        started_at = time.time()
+        attached = second.run_or_attach("scheduler", "def456", poll_seconds=0.05, progress=waiting)
+        assert attached["job_id"] == "abc123" and time.time() - started_at >= 0.25
+        assert load_progress("def456", tmp)["job_id"] == "abc123"
+
+        # Once that run is over the lock is free again
+        assert second.holder() is None
+        assert second.acquire("scheduler")
+        second.release()
+    print("✅ Concurrent triggers attached to the running refresh")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing background job refresh")
+    print("=" * 40)
+
+    test_scrape_reports_progress()
+    test_refresh_runs_in_the_background()
+    test_admin_refresh_runs_out_of_process()
+    test_concurrent_triggers_share_one_run()
+
+    print("\n✅ All job refresh tests completed!")
+
+
+if __name__ == "__main__":
+    main()
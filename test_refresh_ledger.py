@@ -0,0 +1,88 @@
+"""
+Test script for the refresh run ledger and the admin history page
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from refresh_ledger import DONE, FAILED, RefreshLedger
+
+
+def record_run(ledger, seconds, status=DONE, fallback=False, trigger="test"):
+    """A finished run that took the given number of seconds"""
+    run_id = ledger.start(f"job{seconds}", trigger)
+    started_at = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    ledger.conn.execute("UPDATE runs SET started_at = ? WHERE id = ?", (started_at, run_id))
+    return ledger.finish(run_id, status, total=10, role_counts={"dean": 10}, fallback=fallback)
+
+
+def test_slow_run_flagged_as_regression():
+    """A run well over the median of earlier runs is flagged; fallbacks and failures are not the baseline"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = RefreshLedger(os.path.join(tmp, "ledger.db"), window=5, factor=1.5, min_runs=3)
+        assert record_run(ledger, 100)["baseline_seconds"] is None
+        record_run(ledger, 110)
+        record_run(ledger, 5, fallback=True)
+        record_run(ledger, 2, status=FAILED)
+        steady = record_run(ledger, 120)
+        assert steady["baseline_seconds"] is None and not steady["regression"]
+
+        usual = record_run(ledger, 130)
+        assert round(usual["baseline_seconds"]) == 110 and not usual["regression"]
+        slow = record_run(ledger, 400)
+        assert slow["regression"] and round(slow["baseline_seconds"]) == 115
+
+        # A run whose process is gone shows as interrupted
+        lost = ledger.start("lost", "test")
+        ledger.conn.execute("UPDATE runs SET pid = ? WHERE id = ?", (2 ** 22 + 1, lost))
+        runs = ledger.runs()
+        assert runs[0]["status"] == "interrupted"
+
+        summary = ledger.summary(runs)
+        assert summary["runs"] == 8 and summary["regressions"] == 1
+        assert summary["fallback_rate"] == round(1 / 7, 3)
+        assert summary["last_success"] == slow["finished_at"]
+        ledger.close()
+    print(f"✅ {slow['duration_seconds']:.0f}s run flagged against a {slow['baseline_seconds']:.0f}s baseline")
+
+
+def test_admin_history_page():
+    """The history page lists recorded runs for a logged-in admin"""
+    import app
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            ledger = RefreshLedger()
+            for seconds in (60, 70, 65, 200):
+                record_run(ledger, seconds, trigger="release")
+            ledger.close()
+
+            client = app.app.test_client()
+            assert client.get("/admin/refresh-history").status_code == 302
+            with client.session_transaction() as session:
+                session["admin_logged_in"] = True
+            page = client.get("/admin/refresh-history")
+            assert page.status_code == 200
+            assert b"durationChart" in page.data and b"release" in page.data and b"table-danger" in page.data
+            history = client.get("/admin/refresh-history?format=json").get_json()
+            assert history["summary"]["regressions"] == 1 and len(history["runs"]) == 4
+        finally:
+            os.chdir(cwd)
+    print("✅ Admin history page shows 4 runs and 1 regression")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing refresh run ledger")
+    print("=" * 40)
+
+    test_slow_run_flagged_as_regression()
+    test_admin_history_page()
+
+    print("\n✅ All refresh ledger tests completed!")
+
+
+if __name__ == "__main__":
+    main()
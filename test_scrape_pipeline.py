@@ -0,0 +1,385 @@
+"""
+Test script for the streaming scrape pipeline and its sinks
+Runs the scrapers against saved search pages instead of EdJoin.org
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+from benchmark_scraper import run_benchmark, run_speedup
+from edjoin_scraper import EdJoinScraper
+from enhanced_scraper import EnhancedEdJoinScraper
+import production_scraper
+from posting_index import posting_key
+from scrape_metrics import prometheus_text, read_latest, write_metrics
+from scrape_pipeline import (GoogleSheetsSink, JsonSnapshotSink, ParsePool, ScrapePipeline, SQLiteSink, drain,
+                             snapshot_diff_file)
+from snapshot_meta import meta_from_jobs, read_meta
+from test_production_scraper import SavedPageSession, make_scraper, on_day, read_page
+
+
+def saved_page_scraper(scraper_class):
+    scraper = scraper_class(parser="html.parser")
+    scraper.request_delay = (0, 0)
+    scraper.session = SavedPageSession()
+    return scraper
+
+
+def test_scrapers_share_the_pipeline():
+    """All three scrapers stream the same de-duplicated postings"""
+    edjoin_jobs = list(saved_page_scraper(EdJoinScraper).iter_full_scrape(max_pages=3))
+    enhanced_jobs = list(saved_page_scraper(EnhancedEdJoinScraper).iter_full_scrape())
+    production_jobs = make_scraper().run_production_scrape(max_pages=3)
+
+    # EdJoinScraper skips cards without a title element but keeps short titles
+    assert len(edjoin_jobs) == len(enhanced_jobs) == len(production_jobs) == 6
+    assert [posting_key(job) for job in enhanced_jobs] == [posting_key(job) for job in production_jobs]
+    assert len({posting_key(job) for job in edjoin_jobs} & {posting_key(job) for job in enhanced_jobs}) == 5
+    assert all("  " not in job["title"] for job in production_jobs)
+    print("✅ Scrapers stream the same postings through the pipeline")
+
+
+def test_sinks_receive_postings_as_they_stream():
+    """The snapshot matches json.dump output and SQLite upserts every posting"""
+    scraper = make_scraper()
+    jobs = scraper.run_production_scrape(max_pages=3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        db_file = os.path.join(tmp, "edjoin_jobs.db")
+        snapshot = JsonSnapshotSink(snapshot_file, buffer_size=4)
+        database = SQLiteSink(db_file, buffer_size=4)
+
+        def stream():
+            for i, job in enumerate(jobs):
+                # Full buffers are written while the scrape is still running
+                if i == 5:
+                    assert os.path.exists(snapshot.partial_file)
+                    assert not os.path.exists(snapshot_file)
+                yield job
+
+        assert drain(stream(), [snapshot, database]) == len(jobs)
+
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        assert text == json.dumps(jobs, indent=2, ensure_ascii=False)
+        assert snapshot.role_counts == {"Director": len(jobs)}
+
+        conn = sqlite3.connect(db_file)
+        rows = conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        conn.close()
+        assert rows == len(jobs)
+    print("✅ Sinks written incrementally")
+
+
+def test_aborted_run_keeps_published_snapshot():
+    """A run that dies mid-stream never replaces the last snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        with open(snapshot_file, 'w', encoding='utf-8') as f:
+            json.dump([{"title": "Published"}], f)
+
+        def failing_stream():
+            yield {"role": "Dean", "title": "Dean of Students"}
+            raise RuntimeError("scrape failed")
+
+        try:
+            drain(failing_stream(), [JsonSnapshotSink(snapshot_file, buffer_size=1)])
+            raise AssertionError("error was swallowed")
+        except RuntimeError:
+            pass
+
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            assert json.load(f) == [{"title": "Published"}]
+    print("✅ Aborted run left the published snapshot alone")
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows=None, spreadsheet=None):
+        self.title = title
+        self.rows = rows or []
+        self.spreadsheet = spreadsheet
+
+    def append_row(self, row):
+        self.rows.append(row)
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+
+    def update_title(self, title):
+        self.title = title
+
+    def update_index(self, index):
+        self.spreadsheet.worksheets.remove(self)
+        self.spreadsheet.worksheets.insert(index, self)
+
+
+class FakeSpreadsheet:
+    """Stands in for a gspread Spreadsheet: an ordered list of worksheets"""
+
+    def __init__(self, *worksheets):
+        self.worksheets = list(worksheets)
+
+    def add_worksheet(self, title, rows, cols):
+        self.worksheets.append(FakeWorksheet(title, spreadsheet=self))
+        return self.worksheets[-1]
+
+    def get_worksheet(self, index):
+        return self.worksheets[index]
+
+    def del_worksheet(self, worksheet):
+        self.worksheets.remove(worksheet)
+
+
+def sheets_sink(spreadsheet):
+    sink = GoogleSheetsSink(service_account_file=__file__, buffer_size=1)
+    sink.spreadsheet = spreadsheet
+    return sink
+
+
+def test_sheet_replaced_only_by_a_finished_run():
+    """Rows stream into a staging worksheet; the live one is replaced on close and untouched on abort"""
+    published = [["Role"], ["Dean", "Published"]]
+    spreadsheet = FakeSpreadsheet(FakeWorksheet("Jobs", [row[:] for row in published]))
+
+    def failing_stream():
+        yield {"role": "Dean", "title": "Dean of Students"}
+        yield {"role": "Dean", "title": "Dean of Faculty"}
+        raise RuntimeError("scrape failed")
+
+    try:
+        drain(failing_stream(), [sheets_sink(spreadsheet)])
+        raise AssertionError("error was swallowed")
+    except RuntimeError:
+        pass
+    assert [(sheet.title, sheet.rows) for sheet in spreadsheet.worksheets] == [("Jobs", published)]
+
+    # One sink failing to close does not keep the others from publishing
+    class BrokenSink:
+        def write(self, job):
+            pass
+
+        def close(self):
+            raise ValueError("sink broke")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        jobs = [{"role": "Dean", "title": "Dean of Students", "url": "https://example.org/1"}]
+        try:
+            drain(iter(jobs), [BrokenSink(), sheets_sink(spreadsheet), JsonSnapshotSink(snapshot_file)])
+            raise AssertionError("close error was swallowed")
+        except ValueError:
+            pass
+        assert os.path.exists(snapshot_file)
+    assert len(spreadsheet.worksheets) == 1
+    live = spreadsheet.get_worksheet(0)
+    assert live.title == "Jobs" and live.rows[1][:2] == ["Dean", "Dean of Students"] and len(live.rows) == 2
+    print("✅ Sheet replaced by the finished run only, every sink closed")
+
+
+def test_snapshot_diff_tracks_churn():
+    """Each publish writes the postings added, changed and removed since the last one"""
+    jobs = make_scraper().run_production_scrape(max_pages=3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        drain(iter(jobs), [JsonSnapshotSink(snapshot_file)])
+        with open(snapshot_diff_file(snapshot_file), 'r', encoding='utf-8') as f:
+            assert len(json.load(f)["added"]) == len(jobs)
+
+        # Rescraped: new timestamps, one posting edited, one gone, one new
+        rescraped = [{**job, "scraped_at": "2026-10-20T06:00:00"} for job in jobs[1:]]
+        rescraped[0]["location"] = "Clovis, CA"
+        rescraped.append({**jobs[0], "title": "Director of Student Services",
+                          "url": "https://www.edjoin.org/Home/DistrictJobPosting/1999999"})
+        drain(iter(rescraped), [JsonSnapshotSink(snapshot_file)])
+
+        with open(snapshot_diff_file(snapshot_file), 'r', encoding='utf-8') as f:
+            diff = json.load(f)
+        assert [job["url"] for job in diff["added"]] == [rescraped[-1]["url"]]
+        assert [job["location"] for job in diff["changed"]] == ["Clovis, CA"]
+        assert [posting_key(job) for job in diff["removed"]] == [posting_key(jobs[0])]
+        assert diff["unchanged"] == len(jobs) - 2
+        assert all(len(job["content_hash"]) == 16 for job in rescraped)
+    print("✅ Snapshot diff lists only the churn")
+
+
+def test_dateless_postings_unchanged_next_day():
+    """Rescraping the same cards on a later day lists nothing as changed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        try:
+            for day in (datetime(2026, 3, 2), datetime(2026, 3, 3)):
+                production_scraper.datetime = on_day(day)
+                drain(iter(make_scraper().run_production_scrape(max_pages=3)), [JsonSnapshotSink(snapshot_file)])
+        finally:
+            production_scraper.datetime = datetime
+
+        with open(snapshot_diff_file(snapshot_file), 'r', encoding='utf-8') as f:
+            diff = json.load(f)
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+    assert diff["added"] == diff["changed"] == diff["removed"] == []
+    assert diff["unchanged"] == len(jobs)
+    assert any(not job["date_posted"] for job in jobs)
+    print(f"✅ {len(jobs)} postings rescraped a day later, none listed as changed")
+
+
+def test_snapshot_meta_sidecar():
+    """Each publish writes generation, counts and source mix next to the snapshot"""
+    scraper = make_scraper()
+    jobs = scraper.run_production_scrape(max_pages=3)
+    demo = scraper.demo_positions[:2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        for generation in (1, 2):
+            drain(iter(jobs + demo), [JsonSnapshotSink(snapshot_file)])
+            meta = read_meta(snapshot_file)
+            assert meta["generation"] == generation
+        assert meta["sources"] == {"live": len(jobs), "demo": 2}
+        assert meta["total_positions"] == sum(meta["role_counts"].values()) == len(jobs) + 2
+        assert meta["last_update"] == max(job["scraped_at"] for job in jobs + demo)
+        assert meta["duration_seconds"] >= 0
+
+        # A snapshot from before sidecars gives the same counts
+        legacy = meta_from_jobs(jobs + demo)
+        assert legacy["generation"] is None
+        assert {k: legacy[k] for k in ("total_positions", "role_counts", "sources", "last_update")} == \
+            {k: meta[k] for k in ("total_positions", "role_counts", "sources", "last_update")}
+    print("✅ Snapshot metadata published with each generation")
+
+
+def test_parse_pool_matches_in_process_parsing():
+    """Worker processes return the same records as parsing in-process"""
+    scraper = make_scraper()
+    pages = [read_page(path) for path in sorted(glob.glob("fixtures/search_pages/*.html"))] * 3
+
+    pool = ParsePool(max_workers=2, batch_size=2)
+    try:
+        raw_pages = [(html.encode("utf-8"), "utf-8") for html in pages]
+        futures = [future for start in range(0, len(raw_pages), 2)
+                   for future in pool.submit(raw_pages[start:start + 2], scraper.link_fallback)]
+        pooled = [scraper.pipeline.build_records(future.result()[1], "dean") for future in futures]
+    finally:
+        pool.close()
+    assert pool.tasks == len(pages) / 2
+    in_process = [scraper.pipeline.parse(html, "dean") for html in pages]
+
+    strip = lambda jobs: [{k: v for k, v in job.items() if k != "scraped_at"} for job in jobs]
+    assert list(map(strip, pooled)) == list(map(strip, in_process))
+
+    # A whole run through the pool finds the same postings with the same requests,
+    # while the next queries' first pages parse in parallel, several per task
+    in_process = make_scraper()
+    expected = [posting_key(job) for job in in_process.run_production_scrape(max_pages=3)]
+    scraper = make_scraper()
+    scraper.pipeline = ScrapePipeline(scraper, parse_workers=2)
+    try:
+        jobs = scraper.run_production_scrape(max_pages=3)
+    finally:
+        scraper.pipeline.close()
+    assert [posting_key(job) for job in jobs] == expected
+    assert sorted(scraper.session.requests) == sorted(in_process.session.requests)
+    # First pages fetched ahead share tasks
+    pool = scraper.pipeline.parse_pool
+    assert pool.pages > pool.tasks and pool.peak_in_flight > 1
+    print(f"✅ Parse pool matched in-process parsing on {len(pages)} pages")
+
+
+def test_benchmark_reports_stage_timings():
+    """The synthetic benchmark times every stage for every role"""
+    result = run_benchmark(depth=2, iterations=1, parser="html.parser", details=False)
+
+    assert result["postings"] > 0 and result["pages"] > 0
+    assert {"fetch", "parse", "normalize", "dedupe", "write"} <= set(result["stages"])
+    assert set(result["roles"]) == set(production_scraper.SCRAPING_CONFIG["target_roles"])
+    # Postings are written under the role their title names, not the query that found them
+    assert sum(role.get("write", {}).get("count", 0) for role in result["roles"].values()) == result["postings"]
+    json.dumps(result)
+
+    speedup = run_speedup(depth=2, iterations=1, parser="html.parser", parse_workers=2, details=False)
+    assert speedup["parse_pool"]["pages"] == speedup["in_process"]["pages"] == result["pages"]
+    assert speedup["parse_pool"]["parse_tasks_in_flight_max"] > 1 and speedup["speedup"] > 0
+    print(f"✅ Benchmark: {result['pages_per_second']} pages/s, {result['parse_ms_per_card']} ms/card, "
+          f"parse pool speedup {speedup['speedup']}x")
+
+
+def test_run_metrics_per_request():
+    """Every search page request is recorded with its status, bytes, parse time, cards and new postings"""
+    scraper = make_scraper()
+    scraper.pipeline.start_run("run1", "test")
+    jobs = scraper.run_production_scrape(max_pages=3)
+    report = scraper.pipeline.metrics.report(scraper.pipeline.timings, len(jobs))
+
+    page_bytes = len(read_page("fixtures/search_pages/director_page1.html").encode("utf-8"))
+    requests = report["requests"]
+    assert len(requests) == len(scraper.session.requests) == report["stages"]["fetch"]["count"]
+    assert all(request["status"] == 200 and request["bytes"] == page_bytes for request in requests)
+    assert all(request["cards"] and request["parse_ms"] is not None for request in requests)
+    assert report["summary"]["new_postings"] == len(jobs)
+    assert report["queries"]["director"]["requests"] == 2  # the second page had nothing new
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(3):
+            write_metrics({**report, "run_id": f"run{run}"}, tmp, keep_runs=2)
+        assert sorted(os.listdir(tmp)) == ["latest.json", "latest.prom", "run1.json", "run2.json"]
+        assert read_latest(tmp)["run_id"] == "run2"
+
+    text = prometheus_text(report)
+    assert f'edjoin_scrape_run_requests{{status="200"}} {len(requests)}' in text
+    assert f"edjoin_scrape_run_new_postings {len(jobs)}" in text
+    assert 'edjoin_scrape_run_query_cards{query="director"}' in text
+    # Per-run values reset every run, so none may be declared a counter
+    assert "counter" not in text and "_total" not in text
+    print(f"✅ Metrics recorded for {len(requests)} requests")
+
+
+def test_metrics_endpoint_needs_token_or_admin():
+    """/metrics is served to the Prometheus token or a logged-in admin only"""
+    import app
+    client = app.app.test_client()
+    token = app.METRICS_TOKEN
+    app.METRICS_TOKEN = "scrape-secret"
+    try:
+        assert client.get("/metrics").status_code == 302
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 302
+        scraped = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert scraped.status_code == 200 and scraped.mimetype == "text/plain"
+
+        app.METRICS_TOKEN = None  # no token configured: admins only
+        assert client.get("/metrics", headers={"Authorization": "Bearer None"}).status_code == 302
+        with client.session_transaction() as session:
+            session["admin_logged_in"] = True
+        assert client.get("/metrics").status_code == 200
+    finally:
+        app.METRICS_TOKEN = token
+    print("✅ /metrics needs the bearer token or an admin login")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing streaming scrape pipeline")
+    print("=" * 40)
+
+    test_scrapers_share_the_pipeline()
+    test_sinks_receive_postings_as_they_stream()
+    test_aborted_run_keeps_published_snapshot()
+    test_sheet_replaced_only_by_a_finished_run()
+    test_snapshot_diff_tracks_churn()
+    test_dateless_postings_unchanged_next_day()
+    test_snapshot_meta_sidecar()
+    test_parse_pool_matches_in_process_parsing()
+    test_benchmark_reports_stage_timings()
+    test_run_metrics_per_request()
+    test_metrics_endpoint_needs_token_or_admin()
+
+    print("\n✅ All pipeline tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Test script for the work queue and the distributed scrape
+Worker processes scrape saved search pages through a queue in a temp directory
+"""
+
+import functools
+import os
+import tempfile
+import time
+
+from posting_index import posting_id, posting_key
+from scrape_pipeline import JsonSnapshotSink
+from scrape_workers import run_distributed_scrape
+from test_production_scraper import SavedPageResponse, SavedPageSession, make_scraper
+from work_queue import WorkQueue
+
+FEATURES = {"extract_salary": True}
+
+
+class QueryPageSession(SavedPageSession):
+    """Every query gets its own postings: the saved page with query-specific posting IDs"""
+
+    def get(self, url, params=None, timeout=None):
+        response = super().get(url, params, timeout)
+        if params is None:
+            return response
+        prefix = sum(map(ord, params["keywords"]))  # the same in every worker process
+        return SavedPageResponse(response.text.replace("DistrictJobPosting/", f"DistrictJobPosting/{prefix}"))
+
+
+def make_query_scraper(cache_dir, features):
+    scraper = make_scraper(cache_dir, features)
+    scraper.session = scraper.detail_fetcher.session = QueryPageSession()
+    return scraper
+
+
+def test_queue_leases_retries_and_fails():
+    """Tasks are leased once, retried after errors or expired leases, then failed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WorkQueue(os.path.join(tmp, "queue.db"), lease_seconds=0.2, max_attempts=2)
+        assert queue.enqueue("run", "search", "dean|1", {"page": 1})
+        assert not queue.enqueue("run", "search", "dean|1", {"page": 1})
+
+        task = queue.lease("run", "a")
+        assert task["payload"] == {"page": 1} and task["attempts"] == 1
+        assert queue.lease("run", "b") is None
+        assert queue.fail(task, "a", "HTTP 503")
+
+        # Worker "a" takes the retry and stalls; its lease expires and "b" finishes
+        task = queue.lease("run", "a")
+        assert task["attempts"] == 2
+        time.sleep(0.3)
+        assert queue.lease("run", "b") is None  # out of attempts
+        assert not queue.complete(task, "a", ["late"])
+        assert queue.failures("run") == [("search", "dean|1", "lease expired")]
+        assert queue.is_drained("run")
+
+        queue.enqueue("run", "detail", "1984512", {})
+        task = queue.lease("run", "b")
+        assert queue.complete(task, "b", {"salary": "$1"})
+        assert queue.results("run", "detail") == [("1984512", {}, {"salary": "$1"})]
+        queue.close()
+    print("✅ Queue leases, retries and fails tasks")
+
+
+def test_workers_assemble_the_same_snapshot():
+    """Two worker processes produce what the single-process scrape does"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = make_query_scraper(tempfile.mkdtemp(dir=tmp), FEATURES)
+        expected = scraper.run_production_scrape(max_pages=3)
+        queries = {query for query, _ in scraper.session.requests}
+        prefixes = {posting_id(job["url"])[:-7] for job in expected if posting_id(job["url"])}
+        assert len(prefixes) == len(queries)  # every search variation adds postings
+
+        cache_dir = os.path.join(tmp, "workers")
+        os.mkdir(cache_dir)
+        factory = functools.partial(make_query_scraper, cache_dir, FEATURES)
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        queue_file = os.path.join(tmp, "queue.db")
+        jobs = run_distributed_scrape(max_pages=3, workers=2, run_id="test", queue_path=queue_file,
+                                      scraper_factory=factory, detail_fetcher=factory().detail_fetcher,
+                                      sinks=[JsonSnapshotSink(snapshot_file)])
+
+        assert [posting_key(job) for job in jobs] == [posting_key(job) for job in expected]
+        assert [job.get("salary") for job in jobs] == [job.get("salary") for job in expected]
+        assert any(job.get("salary") for job in jobs)
+        assert os.path.exists(snapshot_file)
+
+        queue = WorkQueue(queue_file)
+        counts = queue.counts("test")
+        queue.close()
+        assert set(counts) == {"done"}
+
+        # Resuming a finished run does no new work
+        again = run_distributed_scrape(max_pages=3, workers=1, run_id="test", queue_path=queue_file,
+                                       scraper_factory=factory, detail_fetcher=factory().detail_fetcher, sinks=[])
+        assert [posting_key(job) for job in again] == [posting_key(job) for job in jobs]
+    print(f"✅ Workers assembled {len(jobs)} postings from {counts['done']} tasks")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing distributed scrape")
+    print("=" * 40)
+
+    test_queue_leases_retries_and_fails()
+    test_workers_assemble_the_same_snapshot()
+
+    print("\n✅ All distributed scrape tests completed!")
+
+
+if __name__ == "__main__":
+    main()
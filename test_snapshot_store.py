@@ -0,0 +1,62 @@
+"""
+Test script for the in-memory job snapshot and its background reload
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from scrape_pipeline import JsonSnapshotSink, drain
+from snapshot_store import SnapshotStore
+from test_production_scraper import make_scraper
+
+
+def test_publish_swaps_snapshot_in_background():
+    """Requests never read the file; a publish is picked up by the watcher"""
+    jobs = make_scraper().run_production_scrape(max_pages=3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, "edjoin_jobs.json")
+        drain(iter(jobs[:3]), [JsonSnapshotSink(snapshot_file)])
+
+        reads = []
+
+        def read_jobs(path):
+            reads.append(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        store = SnapshotStore(lambda: snapshot_file, read_jobs, poll_seconds=0.05)
+        first = store.current()
+        assert len(first.jobs) == 3 and first.meta["generation"] == 1
+        for _ in range(20):
+            assert store.current() is first
+        assert len(reads) == 1
+
+        drain(iter(jobs), [JsonSnapshotSink(snapshot_file)])
+        for _ in range(100):
+            if store.current() is not first:
+                break
+            time.sleep(0.02)
+        second = store.current()
+        assert second.meta["generation"] == 2 and len(second.jobs) == len(jobs)
+        assert second.jobs_for_role("director") == second.jobs_by_role["Director"]
+        assert len(first.jobs) == 3  # requests holding the old generation are unaffected
+        assert len(reads) == 2
+        store.stop()
+    print("✅ Published snapshot swapped in without a request-path reload")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing snapshot store")
+    print("=" * 40)
+
+    test_publish_swaps_snapshot_in_background()
+
+    print("\n✅ All snapshot store tests completed!")
+
+
+if __name__ == "__main__":
+    main()
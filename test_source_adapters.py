@@ -0,0 +1,187 @@
+"""
+Test script for the job board source adapters
+Runs the production scraper against a local stand-in for EdJoin.org that can
+serve a JSON search endpoint, JSON-LD search pages or plain HTML
+"""
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from job_parsers import get_parser
+from source_adapters import EdJoinAdapter, SourceAdapter
+from test_http_archive import make_scraper
+from test_production_scraper import SAVED_PAGE, SavedPageResponse, read_page
+
+DATA_PATH = "/Home/LoadJobs"
+
+JSON_LD_PAGE = """<!DOCTYPE html>
+<html><head>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "JobPosting", "title": "Director of Student Services",
+   "url": "/Home/DistrictJobPosting/1990001", "datePosted": "2026-10-01T08:00:00",
+   "hiringOrganization": {"@type": "Organization", "name": "Fresno Unified School District"},
+   "jobLocation": {"@type": "Place", "address": {"addressLocality": "Fresno", "addressRegion": "CA"}}}
+]}
+</script>
+</head><body><div class="search-result"><a class="job-title" href="/x">Stale markup</a></div></body></html>
+"""
+
+
+def fixture_records():
+    """The saved search page's cards as data-endpoint records"""
+    cards = get_parser("html.parser").parse_cards(read_page(SAVED_PAGE))
+    return [{"positionTitle": card["title"], "url": card["href"], "city": card["location"],
+             "districtName": card["district"], "postingDate": card["date_posted"]}
+            for card in cards if card["title"]]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """EdJoin.org stand-in; the server's `mode` picks what search requests get"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+        self.server.paths.append(url.path)
+
+        if url.path == DATA_PATH and self.server.mode == "json":
+            data = {"total": 6, "data": fixture_records() if page == 1 else []}
+            self.reply(200, "application/json", json.dumps(data))
+        elif url.path == DATA_PATH:
+            self.reply(404, "text/html", "<h1>Not Found</h1>")
+        elif self.server.mode == "json-ld":
+            self.reply(200, "text/html", JSON_LD_PAGE if page == 1 else "<html></html>")
+        else:
+            self.reply(200, "text/html", read_page(SAVED_PAGE))
+
+    def reply(self, status, content_type, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def scrape_stand_in(mode, data_path=None):
+    """Run a production scrape against the stand-in; returns (jobs, source_counts, paths)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.mode = mode
+    server.paths = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = make_scraper(None, f"http://127.0.0.1:{server.server_port}", tmp)
+            scraper.pipeline.source = EdJoinAdapter(data_path)
+            jobs = scraper.run_production_scrape(max_pages=2)
+    finally:
+        server.shutdown()
+    return jobs, scraper.pipeline.source_counts, server.paths
+
+
+def strip(jobs):
+    """Records without the run-specific fields (timestamp, stand-in server port)"""
+    return [{**{k: v for k, v in job.items() if k != "scraped_at"}, "url": urlsplit(job["url"]).path}
+            for job in jobs]
+
+
+def test_data_endpoint_fast_path():
+    """Search data JSON gives the same records as parsing the HTML, without the HTML"""
+    html_jobs, html_counts, _ = scrape_stand_in("html")
+    jobs, counts, paths = scrape_stand_in("json", DATA_PATH)
+
+    assert strip(jobs) == strip(html_jobs)
+    assert set(counts) == {"json"} and set(html_counts) == {"html"}
+    assert set(paths) == {DATA_PATH}
+    print(f"✅ {len(jobs)} postings from the data endpoint, {counts['json']} JSON pages")
+
+
+def test_missing_endpoint_falls_back_to_html():
+    """A missing data endpoint is tried once, then HTML pages are parsed"""
+    html_jobs, _, _ = scrape_stand_in("html")
+    jobs, counts, paths = scrape_stand_in("html", DATA_PATH)
+
+    assert strip(jobs) == strip(html_jobs)
+    assert paths.count(DATA_PATH) == 1
+    assert set(counts) == {"html"}
+    print("✅ Fell back to HTML after one endpoint miss")
+
+
+def test_embedded_json_ld_is_preferred():
+    """JobPosting JSON-LD in a search page is used instead of its markup"""
+    jobs, counts, _ = scrape_stand_in("json-ld")
+
+    assert counts.get("embedded", 0) >= 1
+    job = jobs[0]
+    assert job["title"] == "Director of Student Services"
+    assert job["url"].endswith("/Home/DistrictJobPosting/1990001")
+    assert job["location"] == "Fresno, CA"
+    assert job["district"] == "Fresno Unified School District"
+    assert job["date_posted"] == "2026-10-01"
+    assert all(job["title"] != "Stale markup" for job in jobs)
+    print("✅ Embedded JSON-LD used over HTML markup")
+
+
+def test_failing_endpoint_falls_back_to_html():
+    """A data endpoint that times out is dropped for the run; the query gets the HTML page"""
+    class TimingOutSession:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, params=None, timeout=None):
+            self.urls.append(url)
+            if url.endswith("/api/search"):
+                raise requests.Timeout("read timed out")
+            return SavedPageResponse(read_page(SAVED_PAGE))
+
+    session = TimingOutSession()
+    adapter = EdJoinAdapter(data_path="/api/search")
+    for page in (1, 2):
+        response = adapter.fetch(session, "https://www.edjoin.org/search", "dean", page, 10)
+        assert adapter.cards(response.text, get_parser("html.parser"))[0] == "html"
+    assert adapter.data_available is False
+    assert session.urls == ["https://www.edjoin.org/api/search", "https://www.edjoin.org/search",
+                            "https://www.edjoin.org/search"]
+    print("✅ Failing data endpoint fell back to HTML pages")
+
+
+def test_adapter_must_implement_fetch_and_cards():
+    """A source adapter missing fetch() or cards() cannot be created"""
+    class SearchOnly(SourceAdapter):
+        def fetch(self, session, search_url, query, page, timeout):
+            return None
+
+    for adapter in (SourceAdapter, SearchOnly):
+        try:
+            adapter()
+            raise AssertionError(f"{adapter.__name__} was created")
+        except TypeError:
+            pass
+    assert EdJoinAdapter().name == "edjoin"
+    print("✅ Incomplete source adapters rejected")
+
+
+def main():
+    """Run all tests"""
+    print("🧪 Testing source adapters")
+    print("=" * 40)
+
+    test_data_endpoint_fast_path()
+    test_missing_endpoint_falls_back_to_html()
+    test_embedded_json_ld_is_preferred()
+    test_failing_endpoint_falls_back_to_html()
+    test_adapter_must_implement_fetch_and_cards()
+
+    print("\n✅ All source adapter tests completed!")
+
+
+if __name__ == "__main__":
+    main()
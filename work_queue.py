@@ -0,0 +1,136 @@
+"""
+Durable Work Queue
+Scrape tasks in a SQLite file that any number of worker processes on the same
+host lease, retry and complete (WAL mode needs shared memory, so the file
+must not be shared over a network filesystem). Tasks survive crashes: a
+leased task whose worker dies is taken again once its lease expires, and a
+rerun with the same run ID resumes.
+"""
+
+import json
+import sqlite3
+import time
+
+from scraper_config import ADVANCED_CONFIG
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+
+class WorkQueue:
+    """Tasks keyed by (run_id, kind, key), so enqueueing the same task twice is a no-op"""
+
+    def __init__(self, db_path=None, lease_seconds=None, max_attempts=None):
+        self.db_path = db_path or ADVANCED_CONFIG.get("work_queue_db", "scrape_queue.db")
+        self.lease_seconds = lease_seconds or ADVANCED_CONFIG.get("task_lease_seconds", 120)
+        self.max_attempts = max_attempts or ADVANCED_CONFIG.get("task_max_attempts", 3)
+        # Autocommit; writes that must be atomic use BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                UNIQUE (run_id, kind, key)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (run_id, status)")
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, run_id, kind, key, payload):
+        """Add a task unless it already exists; returns True if it was added"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO tasks (run_id, kind, key, payload) VALUES (?, ?, ?, ?)",
+            (run_id, kind, key, json.dumps(payload, ensure_ascii=False))
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, run_id, worker_id):
+        """Claim the oldest available task, or None
+
+        Available means pending, or leased by a worker whose lease has run
+        out. Expired tasks that have used all their attempts are failed.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, error = 'lease expired', lease_owner = NULL "
+                "WHERE run_id = ? AND status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, run_id, LEASED, now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT id, kind, key, payload, attempts FROM tasks "
+                "WHERE run_id = ? AND (status = ? OR (status = ? AND lease_expires < ?)) "
+                "ORDER BY id LIMIT 1",
+                (run_id, PENDING, LEASED, now)
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                    "WHERE id = ?",
+                    (LEASED, worker_id, now + self.lease_seconds, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if not row:
+            return None
+        return {"id": row[0], "kind": row[1], "key": row[2], "payload": json.loads(row[3]), "attempts": row[4] + 1}
+
+    def complete(self, task, worker_id, result=None):
+        """Store a task's result; False if the lease was lost to another worker"""
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = ?, result = ?, error = NULL, lease_owner = NULL "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (DONE, json.dumps(result, ensure_ascii=False), task["id"], LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task, worker_id, error):
+        """Release a task for retry, or fail it once its attempts are used up"""
+        status = FAILED if task["attempts"] >= self.max_attempts else PENDING
+        cursor = self.conn.execute(
+            "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (status, str(error), task["id"], LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def counts(self, run_id):
+        """Tasks per status for a run"""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY status", (run_id,)
+        ).fetchall()
+        return dict(rows)
+
+    def is_drained(self, run_id):
+        """No task of the run is pending or leased"""
+        counts = self.counts(run_id)
+        return not counts.get(PENDING) and not counts.get(LEASED)
+
+    def results(self, run_id, kind):
+        """(key, payload, result) for every completed task of a kind, oldest first"""
+        rows = self.conn.execute(
+            "SELECT key, payload, result FROM tasks WHERE run_id = ? AND kind = ? AND status = ? ORDER BY id",
+            (run_id, kind, DONE)
+        ).fetchall()
+        return [(key, json.loads(payload), json.loads(result)) for key, payload, result in rows]
+
+    def failures(self, run_id):
+        """(kind, key, error) for every failed task of a run"""
+        return self.conn.execute(
+            "SELECT kind, key, error FROM tasks WHERE run_id = ? AND status = ? ORDER BY id", (run_id, FAILED)
+        ).fetchall()